@@ -0,0 +1,359 @@
+#!/usr/bin/env python
+"""Benchmarks of the main SDK operations against a local NSX Manager
+stand-in (:class:`nsxsdk.testing.FakeNSXManager`)
+
+Each scenario runs in its own client process against a fresh server
+holding ``size`` objects of each kind, so that the peak RSS reported is the
+one of the SDK and not of the server. Results are written as JSON, and two
+result files can be compared::
+
+    python benchmarks/bench.py --sizes 10,1000 --output new.json
+    python benchmarks/bench.py --compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from nsxsdk.auth import TokenAuth  # noqa: E402
+from nsxsdk.codec import JSONCodec  # noqa: E402
+from nsxsdk.codec import OrjsonCodec  # noqa: E402
+from nsxsdk.edge import ServiceGateway  # noqa: E402
+from nsxsdk.firewall import FirewallSDK  # noqa: E402
+from nsxsdk.logicalswitches import LogicalSwitchesSDK  # noqa: E402
+from nsxsdk.testing import FakeNSXManager  # noqa: E402
+from nsxsdk.utils import HTTPClient  # noqa: E402
+
+SIZES = (10, 100, 1000, 10000)
+ITERATIONS = 20
+RULES_PER_SECTION = 10
+CODECS = {'json': JSONCodec, 'orjson': OrjsonCodec}
+
+
+def _edge_lookup(context, size):
+    sdk = ServiceGateway(context['client'])
+    name = "esg-%d" % (size - 1)
+
+    def run(iteration):
+        assert sdk.get_edge_id(name) is not None
+    return run
+
+
+def _edge_lookup_stream(context, size):
+    sdk = ServiceGateway(context['client'])
+    name = "esg-%d" % (size - 1)
+
+    def run(iteration):
+        assert sdk.get_edge_id(name, stream=True) is not None
+    return run
+
+
+def _interface_attach(context, size):
+    sdk = ServiceGateway(context['client'])
+
+    def run(iteration):
+        sdk.add_interface("edge-1", "internal",
+                          "172.16.%d.%d" % (iteration // 256, iteration % 256),
+                          "255.255.255.0", "virtualwire-5000")
+    return run
+
+
+def _bgp_peer_add(context, size):
+    sdk = ServiceGateway(context['client'])
+
+    def run(iteration):
+        sdk.add_bgp_peer("edge-1",
+                         "192.168.%d.%d" % (iteration // 256, iteration % 256),
+                         65000 + iteration)
+    return run
+
+
+def _dfw_section_lookup(context, size):
+    sdk = FirewallSDK(context['client'])
+    name = "section-%d" % (max(1, size // RULES_PER_SECTION) - 1)
+
+    def run(iteration):
+        assert sdk.get_firewall_section_id(name) is not None
+    return run
+
+
+def _dfw_section_add(context, size):
+    sdk = FirewallSDK(context['client'])
+
+    def run(iteration):
+        sdk.add_firewall_section("bench-%d" % iteration)
+    return run
+
+
+def _dfw_rule_add(context, size):
+    sdk = FirewallSDK(context['client'])
+
+    def run(iteration):
+        sdk.add_firewall_rule(1000, "10.1.%d.%d" % (iteration // 256,
+                                                    iteration % 256),
+                              "10.2.0.1", "allow")
+    return run
+
+
+def _logical_switch_create(context, size):
+    sdk = LogicalSwitchesSDK(context['client'])
+
+    def run(iteration):
+        tz_id = sdk.get_transport_zone_id("tz-0")
+        sdk.create_logical_switch(tz_id, "bench-%d" % iteration)
+    return run
+
+
+def _logical_switch_bulk_create(context, size):
+    sdk = LogicalSwitchesSDK(context['client'], cache_ttl=60)
+
+    def run(iteration):
+        tz_id = sdk.get_transport_zone_id("tz-0")
+        names = ["bench-%d-%d" % (iteration, index) for index in range(10)]
+        sdk.create_logical_switches(tz_id, names)
+    return run
+
+
+SCENARIOS = {
+    'edge_lookup': _edge_lookup,
+    'edge_lookup_stream': _edge_lookup_stream,
+    'interface_attach': _interface_attach,
+    'bgp_peer_add': _bgp_peer_add,
+    'dfw_section_lookup': _dfw_section_lookup,
+    'dfw_section_add': _dfw_section_add,
+    'dfw_rule_add': _dfw_rule_add,
+    'logical_switch_create': _logical_switch_create,
+    'logical_switch_bulk_create': _logical_switch_bulk_create,
+}
+
+
+def _percentile(values, percent):
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(0, int(round(percent / 100.0 * len(values) + 0.5)) - 1)
+    return values[min(rank, len(values) - 1)]
+
+
+def _peak_rss_kb():
+    """Peak resident set size of the current process in KiB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak //= 1024
+    return peak
+
+
+def run_worker(url, scenario, size, iterations, codec='json',
+               auth='basic'):
+    """Run a scenario against a server and return its measures
+
+    :param str url: Base URL of the server
+    :param str scenario: Name of the scenario
+    :param int size: Inventory size of the server
+    :param int iterations: Number of operations measured
+    :param str codec: Name of the JSON codec of the client
+    :param str auth: Authentication of the client, basic or token
+
+    :return: measures of the scenario
+    :rtype: dict
+
+    """
+    token_auth = TokenAuth() if auth == 'token' else None
+    client = HTTPClient('localhost', 'admin', 'default',
+                        codec=CODECS[codec](), token_auth=token_auth)
+    client.base_url = url
+    totals = {'requests': 0, 'bytes_sent': 0, 'bytes_received': 0}
+
+    def count(method, path, status, req_bytes, resp_bytes, elapsed):
+        totals['requests'] += 1
+        totals['bytes_sent'] += req_bytes or 0
+        totals['bytes_received'] += resp_bytes or 0
+
+    operation = SCENARIOS[scenario]({'client': client}, size)
+    # Untimed first run, opening the connection
+    operation(iterations)
+    client.add_hook('after_response', count)
+
+    latencies = []
+    start = time.time()
+    for iteration in range(iterations):
+        begin = time.time()
+        operation(iteration)
+        latencies.append(time.time() - begin)
+    elapsed = time.time() - start
+
+    return {
+        'scenario': scenario,
+        'size': size,
+        'iterations': iterations,
+        'elapsed': elapsed,
+        'ops_per_sec': iterations / elapsed if elapsed > 0 else None,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+        'requests_per_op': totals['requests'] / float(iterations),
+        'bytes_sent_per_op': totals['bytes_sent'] / float(iterations),
+        'bytes_received_per_op':
+            totals['bytes_received'] / float(iterations),
+        'peak_rss_kb': _peak_rss_kb(),
+    }
+
+
+def run_benchmarks(scenarios, sizes, iterations, latency, codec='json',
+                   auth='basic', auth_latency=0):
+    """Run scenarios at several inventory sizes, each one in a separate
+    process against a fresh server
+
+    :param list scenarios: Names of the scenarios
+    :param list sizes: Inventory sizes
+    :param int iterations: Number of operations measured per scenario
+    :param float latency: Seconds added by the server to every response
+    :param str codec: Name of the JSON codec of the client
+    :param str auth: Authentication of the client, basic or token
+    :param float auth_latency: Seconds added by the server to the requests
+        authenticated with credentials
+
+    :return: measures of each scenario at each size
+    :rtype: list of dict
+
+    """
+    results = []
+    for size in sizes:
+        for scenario in scenarios:
+            manager = FakeNSXManager(
+                edges=size, sections=max(1, size // RULES_PER_SECTION),
+                rules_per_section=RULES_PER_SECTION, virtualwires=size,
+                latency=latency, auth_latency=auth_latency)
+            with manager:
+                output = subprocess.check_output(
+                    [sys.executable, os.path.abspath(__file__), '--worker',
+                     '--url', manager.url, '--scenarios', scenario,
+                     '--sizes', str(size), '--iterations', str(iterations),
+                     '--codec', codec, '--auth', auth])
+            result = json.loads(output.decode('utf-8'))
+            results.append(result)
+            sys.stderr.write(
+                "%-22s %6d  %9.1f ops/s  p50 %8.2f ms  p99 %8.2f ms  "
+                "%6.1f req/op\n" % (scenario, size, result['ops_per_sec'],
+                                    result['p50_ms'], result['p99_ms'],
+                                    result['requests_per_op']))
+    return results
+
+
+def _git_commit():
+    try:
+        with open(os.devnull, 'w') as devnull:
+            output = subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                             cwd=ROOT, stderr=devnull)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('ascii').strip()
+
+
+def compare(baseline_path, current_path):
+    """Print the ops/sec and p99 change of each scenario between two result
+    files
+
+    :param str baseline_path: Results of the reference commit
+    :param str current_path: Results of the commit to evaluate
+
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(current_path) as current_file:
+        current = json.load(current_file)
+    reference = dict(((result['scenario'], result['size']), result)
+                     for result in baseline['results'])
+    print("%-22s %6s  %10s  %10s  %8s" % (
+        'scenario', 'size', 'ops/s', 'p99', 'req/op'))
+    for result in current['results']:
+        before = reference.get((result['scenario'], result['size']))
+        if before is None:
+            continue
+        print("%-22s %6d  %+9.1f%%  %+9.1f%%  %+8.1f" % (
+            result['scenario'], result['size'],
+            100.0 * (result['ops_per_sec'] / before['ops_per_sec'] - 1),
+            100.0 * (result['p99_ms'] / before['p99_ms'] - 1),
+            result['requests_per_op'] - before['requests_per_op']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scenarios', default=','.join(sorted(SCENARIOS)),
+                        help="comma separated scenarios, default all")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                        help="comma separated inventory sizes")
+    parser.add_argument('--iterations', type=int, default=ITERATIONS,
+                        help="operations measured per scenario")
+    parser.add_argument('--codec', choices=sorted(CODECS), default='json',
+                        help="JSON codec of the client")
+    parser.add_argument('--auth', choices=('basic', 'token'),
+                        default='basic', help="authentication of the client")
+    parser.add_argument('--latency', type=float, default=0,
+                        help="seconds added by the server to every response")
+    parser.add_argument('--auth-latency', type=float, default=0,
+                        help="seconds added by the server to the requests "
+                        "authenticated with credentials")
+    parser.add_argument('--output', help="result file, default stdout")
+    parser.add_argument('--compare', nargs=2,
+                        metavar=('BASELINE', 'CURRENT'),
+                        help="compare two result files")
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    scenarios = args.scenarios.split(',')
+    for scenario in scenarios:
+        if scenario not in SCENARIOS:
+            parser.error("unknown scenario %s" % scenario)
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    if args.worker:
+        result = run_worker(args.url, scenarios[0], sizes[0],
+                            args.iterations, args.codec, args.auth)
+        sys.stdout.write(json.dumps(result))
+        return
+
+    document = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'iterations': args.iterations,
+        'latency': args.latency,
+        'codec': args.codec,
+        'auth': args.auth,
+        'auth_latency': args.auth_latency,
+        'results': run_benchmarks(scenarios, sizes, args.iterations,
+                                  args.latency, args.codec, args.auth,
+                                  args.auth_latency),
+    }
+    data = json.dumps(document, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(data + '\n')
+    else:
+        print(data)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,21 @@
 """NSX Python SDK"""
 
+import sys
+
+from . import auth
+from . import codec
 from . import edge
+from . import edgeconfig
+from . import ensure
+from . import exceptions
 from . import utils
 from . import firewall
+from . import fleet
+from . import jobs
+from . import jsonstream
 from . import logicalswitches
+from . import models
+from . import ratelimit
+
+if sys.version_info >= (3, 5):
+    from . import aio
@@ -0,0 +1,547 @@
+#!/usr/bin/env python
+"""Asyncio variants of the NSX SDK
+
+This module requires Python 3.5+ and the optional ``aiohttp`` package. It
+provides the same classes as the blocking modules (``HTTPClient``, ``Edge``,
+``LogicalRouter``, ``ServiceGateway``, ``FirewallSDK`` and
+``LogicalSwitchesSDK``) with awaitable methods, so many NSX calls can be kept
+in flight from a single event loop::
+
+    async with aio.HTTPClient(hostname, login, password) as client:
+        edge = aio.Edge(client)
+        await asyncio.gather(*[edge.configure_ha(edge_id)
+                               for edge_id in edge_ids])
+"""
+
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .codec import JSONCodec
+from .edgeconfig import EDGE_PAGE_SIZE
+from .edgeconfig import EDGE_PATH
+from .edgeconfig import _edge_page_path
+from .edgeconfig import _create_interface_configuration
+from .edgeconfig import _create_logical_router_configuration
+from .edgeconfig import _create_service_gateway_configuration
+from .edgeconfig import _create_global_routing_configuration
+from .edgeconfig import _create_bgp_peer_configuration
+from .edgeconfig import _create_bgp_configuration
+from .edgeconfig import _create_syslog_configuration
+from .edgeconfig import _create_ha_configuration
+from .firewall import DFW_PATH
+from .firewall import _create_section_configuration
+from .firewall import _create_rule_configuration
+from .logicalswitches import LS_PATH
+from .logicalswitches import _create_logical_switch_configuration
+from .utils import page_items
+
+
+class Response(object):
+
+    """Response to an asynchronous HTTP request. The body is read before the
+    connection is released, so it exposes the same attributes as
+    :class:`nsxsdk.utils.Response` used by the SDK, the text and decoded
+    JSON body being computed lazily and only once.
+
+    Attributes:
+        status_code: HTTP status code
+        headers: Case-insensitive response headers
+        content: Raw response body
+        encoding: Response body encoding
+        duration: Seconds between sending the request and reading the
+            whole response
+        codec: JSON codec decoding the body, see :mod:`nsxsdk.codec`
+    """
+
+    def __init__(self, status_code, headers, content, encoding,
+                 duration=None, codec=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.duration = duration
+        self.codec = codec or JSONCodec()
+        self._text = None
+        self._data = None
+        self._decoded = False
+
+    @property
+    def text(self):
+        """Response body decoded as a string"""
+        if self._text is None:
+            self._text = self.content.decode(self.encoding or 'utf-8',
+                                             'replace')
+        return self._text
+
+    @property
+    def data(self):
+        """Response body decoded as JSON, None if the body is empty"""
+        if not self._decoded:
+            self._data = None
+            if self.content.strip():
+                self._data = self.codec.loads(self.content)
+            self._decoded = True
+        return self._data
+
+    def json(self):
+        """Response body decoded as JSON"""
+        return self.data
+
+    @property
+    def etag(self):
+        """ETag header of the response, None if it has none"""
+        return self.headers.get('ETag')
+
+    @property
+    def size(self):
+        """Size of the response body in bytes"""
+        return len(self.content)
+
+
+class HTTPClient(object):
+
+    """Asynchronous HTTPClient, it has the same ``request`` contract as
+    :class:`nsxsdk.utils.HTTPClient` but must be awaited.
+
+    Attributes:
+        base_url: A string representing the base url.
+        login: A string representing login.
+        password: A string representing password
+        limit: Maximum number of simultaneous connections
+        codec: JSON codec serializing request bodies and decoding response
+            bodies, see :mod:`nsxsdk.codec`
+        session: Session parameters for REST API calls, created on first
+            request so the client can be built outside of the event loop
+    """
+
+    def __init__(self, hostname, login, password, limit=100, codec=None):
+        if aiohttp is None:
+            raise ImportError("aiohttp is required to use nsxsdk.aio")
+        self.base_url = "https://" + hostname
+        self.login = login
+        self.password = password
+        self.limit = limit
+        self.codec = codec or JSONCodec()
+        self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _initialize_session(self):
+        """Initialize HTTP session with a basic configuration to consume
+        JSON REST API:
+            - Disable SSL verification
+            - Set HTTP headers to application/json
+            - Set authorization header
+
+        Returns:
+            ClientSession: initialized session
+
+        """
+        connector = aiohttp.TCPConnector(ssl=False, limit=self.limit)
+        return aiohttp.ClientSession(
+            connector=connector,
+            auth=aiohttp.BasicAuth(self.login, self.password),
+            headers={'Accept': 'application/json',
+                     'Content-type': 'application/json'})
+
+    async def request(self, method, path, body=None, headers=None):
+        """Generic method to consume REST API Webservices
+
+        :param method: HTTP method
+        :param path: API resource path
+        :param body: HTTP request body, a JSON document as text or bytes, or
+            an object serialized by the client codec
+        :param headers: Extra headers
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        :raises aiohttp.ClientError: on transport errors
+
+        """
+        if self.session is None:
+            self.session = self._initialize_session()
+        if body is not None and not isinstance(body, (bytes, str)):
+            body = self.codec.dumps(body)
+        url = self.base_url + path
+        start = time.time()
+        async with self.session.request(method, url, data=body,
+                                        headers=headers) as response:
+            content = await response.read()
+            return Response(response.status, response.headers, content,
+                            response.charset, time.time() - start,
+                            self.codec)
+
+    async def close(self):
+        """Close the underlying session and its connections"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class Edge(object):
+
+    """Asynchronous variant of :class:`nsxsdk.edge.Edge`"""
+
+    def __init__(self, http_client):
+        self.http_client = http_client
+
+    async def _is_distributed(self, edge_id):
+        """ Check if edge device is a logical router.
+
+        :param str edge_id: Id of the edge
+
+        :return: True if it is a logical router and False if
+            it is a service gateway.
+        :rtype: bool
+
+        """
+        path = EDGE_PATH + edge_id
+        response = await self.http_client.request("GET", path)
+        data = response.data
+        if data['type'] == "distributedRouter":
+            return True
+        return False
+
+    async def add_interface(self, edge_id, interface_type, ip_addr, netmask,
+                            network_id, mtu=1500):
+        """Attach a new interface to an existing edge device, see
+        :meth:`nsxsdk.edge.Edge.add_interface`.
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        interface_data = _create_interface_configuration(interface_type,
+                                                         ip_addr, netmask,
+                                                         network_id, mtu)
+
+        path = EDGE_PATH + edge_id
+        if await self._is_distributed(edge_id):
+            path = path + "/interfaces/?action=patch"
+        else:
+            path = path + "/vnics/?action=patch"
+
+        return await self.http_client.request("POST", path, interface_data)
+
+    async def delete_edge(self, edge_id):
+        """Delete a NSX Edge
+
+        :param str edge_id: Id of the edge that will be deleted
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = EDGE_PATH + edge_id
+        return await self.http_client.request("DELETE", path)
+
+    async def get_edge_id(self, edge_name, page_size=EDGE_PAGE_SIZE):
+        """Retrieve the ID of a NSX Edge from its name, the edge listing is
+        read one page at a time until the edge is found, see
+        :func:`nsxsdk.utils.page_items`
+
+        :param str edge_name: The name of the edge to get.
+        :param int page_size: Number of edges requested per page
+
+        :return: Id of the edge
+        :rtype: str
+
+        """
+        start_index = 0
+        while start_index is not None:
+            path = _edge_page_path(start_index, page_size)
+            response = await self.http_client.request("GET", path)
+            edges, start_index = page_items(response.data['edgePage'],
+                                            'data')
+            for edge in edges:
+                if edge['name'] == edge_name:
+                    return edge['objectId']
+
+    async def configure_global_routing(self, edge_id, router_id, ecmp=False,
+                                       log=False, log_level="info"):
+        """Set NSX Edge global routing configuration, see
+        :meth:`nsxsdk.edge.Edge.configure_global_routing`.
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = EDGE_PATH + edge_id + "/routing/config/global"
+        global_data = _create_global_routing_configuration(router_id, ecmp,
+                                                           log, log_level)
+        return await self.http_client.request("PUT", path, global_data)
+
+    async def add_bgp_peer(self, edge_id, peer_ip, peer_as, weight=None,
+                           holddown_timer=None, keepalive_timer=None):
+        """Add a bgp remote peer to an existing NSX Edge, see
+        :meth:`nsxsdk.edge.Edge.add_bgp_peer`.
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = EDGE_PATH + edge_id + "/routing/config/bgp"
+        response = await self.http_client.request("GET", path)
+        data = response.data
+        peer_data = _create_bgp_peer_configuration(peer_ip, peer_as, weight,
+                                                   holddown_timer,
+                                                   keepalive_timer)
+        data['bgpNeighbours']['bgpNeighbours'].append(peer_data)
+        return await self.http_client.request("PUT", path, data)
+
+    async def configure_bgp(self, edge_id, local_as, graceful_restart=False,
+                            default_originate=False):
+        """Configure BGP basic parameters, see
+        :meth:`nsxsdk.edge.Edge.configure_bgp`.
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = EDGE_PATH + edge_id + "/routing/config/bgp"
+        bgp_data = _create_bgp_configuration(local_as, graceful_restart,
+                                             default_originate)
+        return await self.http_client.request("PUT", path, bgp_data)
+
+    async def configure_syslog(self, edge_id, ip_address, protocol):
+        """Configure edge to send log to remote syslog, see
+        :meth:`nsxsdk.edge.Edge.configure_syslog`.
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = EDGE_PATH + edge_id + "/syslog/config"
+        syslog_data = _create_syslog_configuration(ip_address, protocol)
+        return await self.http_client.request("PUT", path, syslog_data)
+
+    async def configure_ha(self, edge_id):
+        """Configure NSX Edge in HA mode.
+
+        :param str edge_id: Id of the edge to be reconfigured
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = EDGE_PATH + edge_id + "/highavailability/config"
+        ha_data = _create_ha_configuration()
+        return await self.http_client.request("PUT", path, ha_data)
+
+
+class LogicalRouter(Edge):
+
+    """Asynchronous variant of :class:`nsxsdk.edge.LogicalRouter`"""
+
+    async def create_edge(self, edge_name, datacenter_id, resourcepool_id,
+                          datastore_id, mgmt_portgroup_id, mgmt_ipaddr,
+                          mgmt_netmask, log_level="info", host_id=None,
+                          vmfolder_id=None):
+        """Deploy a NSX Edge Logical Router with a basic configuration, see
+        :meth:`nsxsdk.edge.LogicalRouter.create_edge`.
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = EDGE_PATH
+        edge_data = _create_logical_router_configuration(edge_name,
+                                                         datacenter_id,
+                                                         resourcepool_id,
+                                                         datastore_id,
+                                                         mgmt_portgroup_id,
+                                                         mgmt_ipaddr,
+                                                         mgmt_netmask,
+                                                         log_level,
+                                                         host_id,
+                                                         vmfolder_id)
+        return await self.http_client.request("POST", path, edge_data)
+
+    async def add_interface(self, edge_id, interface_type, ip_addr, netmask,
+                            network_id, mtu=1500):
+        """Attach a new interface to an existing logical router
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        interface_data = _create_interface_configuration(interface_type,
+                                                         ip_addr, netmask,
+                                                         network_id, mtu)
+        path = EDGE_PATH + edge_id + "/interfaces/?action=patch"
+        return await self.http_client.request("POST", path, interface_data)
+
+
+class ServiceGateway(Edge):
+
+    """Asynchronous variant of :class:`nsxsdk.edge.ServiceGateway`"""
+
+    async def create_edge(self, edge_name, appliance_size,
+                          datacenter_id, resourcepool_id,
+                          datastore_id, log_level="info", host_id=None,
+                          vmfolder_id=None):
+        """Deploy a NSX Edge Service Gateway with a basic configuration, see
+        :meth:`nsxsdk.edge.ServiceGateway.create_edge`.
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = EDGE_PATH
+        edge_data = _create_service_gateway_configuration(edge_name,
+                                                          appliance_size,
+                                                          datacenter_id,
+                                                          resourcepool_id,
+                                                          datastore_id,
+                                                          log_level,
+                                                          host_id,
+                                                          vmfolder_id)
+        return await self.http_client.request("POST", path, edge_data)
+
+    async def add_interface(self, edge_id, interface_type, ip_addr, netmask,
+                            network_id, mtu=1500):
+        """Attach a new interface to an existing service gateway
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        interface_data = _create_interface_configuration(interface_type,
+                                                         ip_addr, netmask,
+                                                         network_id, mtu)
+        path = EDGE_PATH + edge_id + "/vnics/?action=patch"
+        return await self.http_client.request("POST", path, interface_data)
+
+
+class FirewallSDK(object):
+
+    """Asynchronous variant of :class:`nsxsdk.firewall.FirewallSDK`"""
+
+    def __init__(self, http_client):
+        self.http_client = http_client
+
+    async def get_firewall_section_id(self, section_name):
+        """Retrieve the ID of a firewall section from its name
+
+        :param str section_name: The name of the firewall section to get.
+
+        :return: Id of the firewall section
+        :rtype: str
+
+        """
+        path = DFW_PATH + "globalroot-0/config"
+        response = await self.http_client.request("GET", path)
+        jsondata = response.data
+        sections = jsondata['layer3Sections']['layer3Sections']
+        for section in sections:
+            if section['name'] == section_name:
+                return section['id']
+
+    async def add_firewall_section(self, section_name):
+        """Create a new layer3 firewall section
+
+        :param str section_name: Name of the new section
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = DFW_PATH + "globalroot-0/config/layer3sections"
+        section_data = _create_section_configuration(section_name)
+        return await self.http_client.request("POST", path, section_data)
+
+    async def delete_firewall_section(self, section_id):
+        """Delete a firewall section
+
+        :param int section_id: Id of the firewall section that will be deleted
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = DFW_PATH + "globalroot-0/config/layer3sections/" + \
+            str(section_id)
+        return await self.http_client.request("DELETE", path)
+
+    async def add_firewall_rule(self, section_id, source_ip,
+                                destination_ip, action):
+        """Add a firewall rule in an existing section, see
+        :meth:`nsxsdk.firewall.FirewallSDK.add_firewall_rule`.
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = DFW_PATH + "globalroot-0/config/layer3sections/" + \
+            str(section_id)
+        response = await self.http_client.request("GET", path)
+        headers = {'If-Match': response.headers['ETag']}
+
+        path = DFW_PATH + "globalroot-0/config/layer3sections/" + \
+            str(section_id) + "/rules"
+        rule_data = _create_rule_configuration(source_ip, destination_ip,
+                                               action)
+        return await self.http_client.request("POST", path, rule_data, headers)
+
+
+class LogicalSwitchesSDK(object):
+
+    """Asynchronous variant of
+    :class:`nsxsdk.logicalswitches.LogicalSwitchesSDK`"""
+
+    def __init__(self, http_client):
+        self.http_client = http_client
+
+    async def get_transport_zone_id(self, tz_name):
+        """Retrieve Id of a transport zone from its name
+
+        :param str tz_name: The name of the transport zone.
+
+        :return: Id of the transport zone
+        :rtype: str
+
+        """
+        path = LS_PATH + "scopes"
+        response = await self.http_client.request("GET", path)
+        jsondata = response.data
+        scopes = jsondata['allScopes']
+        for scope in scopes:
+            if scope['name'] == tz_name:
+                return scope['id']
+
+    async def create_logical_switch(self, tz_id, ls_name, cplane_mode=None,
+                                    tenant_id="default"):
+        """Create a new logical switch in the specified transport zone.
+
+        :param str tz_id: Id of the transport zone
+        :param str ls_name: Logical switch name
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = LS_PATH + "scopes/" + tz_id + "/virtualwires"
+        ls_data = _create_logical_switch_configuration(ls_name, cplane_mode,
+                                                       tenant_id)
+        return await self.http_client.request("POST", path, ls_data)
+
+    async def delete_logical_switch(self, ls_id):
+        """Delete a logical switch
+
+        :param str ls_id: Id of the logical switch that will be deleted
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        """
+        path = LS_PATH + "virtualwires/" + ls_id
+        return await self.http_client.request("DELETE", path)
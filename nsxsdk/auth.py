@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+"""Token based authentication to NSX Manager
+
+By default every request carries the basic credentials of the client,
+which NSX Manager checks again on each call, possibly against vCenter SSO.
+With :class:`TokenAuth` the credentials are only sent to the token
+endpoint, and the requests carry the token it returns::
+
+    client = HTTPClient(hostname, login, password, token_auth=TokenAuth())
+
+The token is refreshed in the background shortly before it expires, so
+that requests never wait for a new one while the current one is valid.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from xml.etree import ElementTree
+
+from .exceptions import AuthenticationFailed
+
+LOG = logging.getLogger(__name__)
+
+TOKEN_PATH = "/api/2.0/services/auth/token"
+TOKEN_LIFETIME = 90 * 60
+TOKEN_REFRESH_MARGIN = 5 * 60
+# Delay before a failed background refresh is attempted again
+TOKEN_REFRESH_RETRY = 30
+# A token expiring sooner than this is not used anymore
+TOKEN_EXPIRY_SLACK = 5
+
+
+def _parse_token(response):
+    """Extract the token and its expiry time from a token response, sent as
+    JSON or as XML by NSX Manager
+
+    :param response: Response of the token endpoint
+
+    :return: token and its expiry time, as a timestamp
+    :rtype: tuple
+
+    """
+    content_type = response.headers.get('Content-Type') or ''
+    try:
+        if 'json' in content_type:
+            data = json.loads(response.content.decode('utf-8'))
+            value, expires_on = data.get('value'), data.get('expiresOn')
+        else:
+            root = ElementTree.fromstring(response.content)
+            value = root.findtext('value')
+            expires_on = root.findtext('expiresOn')
+        # expiresOn is in milliseconds since the epoch
+        expires_at = int(expires_on) / 1000.0
+    except (ValueError, TypeError, AttributeError, SyntaxError):
+        value = None
+    if not value:
+        raise AuthenticationFailed(response.status_code,
+                                   "Invalid token response")
+    return value, expires_at
+
+
+class TokenAuth(object):
+
+    """Thread-safe cache of the authentication token of a client
+
+    A TokenAuth is given to a single :class:`nsxsdk.utils.HTTPClient`, it
+    asks for a token on first use and starts refreshing it in the
+    background ``refresh_margin`` seconds before it expires. When
+    ``cache_path`` is set, the token is also stored in that file, readable
+    by its owner only, so that it survives the process.
+
+    A single thread requests a token at a time, the other ones wait for it
+    and use the token it obtained. Threads holding a valid token never wait
+    for a token request.
+
+    Attributes:
+        lifetime: Lifetime of the tokens requested, in seconds
+        refresh_margin: Seconds before expiry at which the token is
+            refreshed
+        cache_path: File the token is stored in, None to keep it in memory
+            only
+        expires_at: Expiry time of the current token, as a timestamp
+    """
+
+    def __init__(self, lifetime=TOKEN_LIFETIME,
+                 refresh_margin=TOKEN_REFRESH_MARGIN, cache_path=None):
+        """
+        :param int lifetime: Lifetime of the tokens requested in seconds,
+            rounded up to a minute, defaults to 90 minutes.
+        :param int refresh_margin: Seconds before expiry at which the token
+            is refreshed, defaults to 5 minutes. The token is not refreshed
+            before half of its lifetime.
+        :param str cache_path: File the token is stored in, None to keep it
+            in memory only.
+
+        """
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self.cache_path = cache_path
+        self.expires_at = None
+        self._token = None
+        self._refresh_at = None
+        self._refreshing = False
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._request_lock = threading.Lock()
+
+    def authorization(self, http_client):
+        """Return the Authorization header of a request, requesting a token
+        if there is no valid one
+
+        :param http_client: Client sending the request
+        :type http_client: nsxsdk.utils.HTTPClient
+
+        :return: Authorization header value
+        :rtype: str
+
+        :raises AuthenticationFailed: if NSX Manager refused the
+            credentials
+        :raises requests.exceptions.RequestException: if the token endpoint
+            could not be reached
+
+        """
+        authorization = self._current(http_client)
+        if authorization is not None:
+            return authorization
+        with self._request_lock:
+            if not self._loaded:
+                self._load(http_client)
+                self._loaded = True
+            # Another thread may have obtained a token while this one waited
+            authorization = self._current(http_client)
+            if authorization is not None:
+                return authorization
+            token, expires_at = self._request_token(http_client)
+            with self._lock:
+                self._set_token(token, expires_at)
+            self._save(http_client, token, expires_at)
+            return "AUTHTOKEN " + token
+
+    def _current(self, http_client):
+        """Return the Authorization header of the current token, starting
+        its background refresh when it is due
+
+        :return: Authorization header value, None if there is no valid
+            token
+        :rtype: str
+
+        """
+        with self._lock:
+            if not self._loaded or self._token is None or \
+                    time.time() >= self.expires_at - TOKEN_EXPIRY_SLACK:
+                return None
+            if time.time() >= self._refresh_at and not self._refreshing:
+                self._refreshing = True
+                thread = threading.Thread(target=self._refresh,
+                                          args=(http_client,))
+                thread.daemon = True
+                thread.start()
+            return "AUTHTOKEN " + self._token
+
+    def invalidate(self, authorization=None):
+        """Drop the current token, the next request asks for a new one
+
+        :param str authorization: Authorization header rejected by NSX
+            Manager, the token is only dropped if it is still the current
+            one. Defaults to the current token.
+
+        """
+        with self._lock:
+            if self._token is None:
+                return
+            if authorization is None or \
+                    authorization == "AUTHTOKEN " + self._token:
+                self._token = None
+                self.expires_at = None
+
+    def _request_token(self, http_client):
+        """Ask NSX Manager for a new token with the client credentials
+
+        :return: token and its expiry time, as a timestamp
+        :rtype: tuple
+
+        """
+        minutes = max(1, -(-int(self.lifetime) // 60))
+        response = http_client.local_session().request(
+            "POST", http_client.base_url + TOKEN_PATH,
+            params={'expiresInMinutes': minutes},
+            auth=(http_client.login, http_client.password))
+        if response.status_code != 200:
+            raise AuthenticationFailed(response.status_code, response.text)
+        LOG.info("Authentication token obtained for %s", http_client.login)
+        return _parse_token(response)
+
+    def _set_token(self, token, expires_at):
+        """Make a token the current one, called with the lock held"""
+        now = time.time()
+        self._token = token
+        self.expires_at = expires_at
+        self._refresh_at = max(now + (expires_at - now) / 2,
+                               expires_at - self.refresh_margin)
+
+    def _refresh(self, http_client):
+        """Replace the current token, from a background thread"""
+        try:
+            token = self._request_token(http_client)
+        except Exception as exception:
+            LOG.warning("Authentication token refresh failed: %s", exception)
+            with self._lock:
+                self._refreshing = False
+                self._refresh_at = time.time() + TOKEN_REFRESH_RETRY
+            return
+        with self._lock:
+            self._refreshing = False
+            self._set_token(*token)
+        self._save(http_client, *token)
+
+    def _cache_key(self, http_client):
+        return http_client.login + "@" + http_client.base_url
+
+    def _read_cache(self):
+        """Read the tokens stored in the cache file
+
+        :return: tokens and their expiry time indexed by client
+        :rtype: dict
+
+        """
+        try:
+            with open(self.cache_path) as cache_file:
+                return json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _load(self, http_client):
+        """Restore the token of the client from the cache file, if it is
+        still valid"""
+        if self.cache_path is None:
+            return
+        entry = self._read_cache().get(self._cache_key(http_client))
+        if not entry or \
+                entry['expires_at'] - TOKEN_EXPIRY_SLACK <= time.time():
+            return
+        LOG.debug("Authentication token loaded from %s", self.cache_path)
+        with self._lock:
+            self._set_token(entry['token'], entry['expires_at'])
+
+    def _save(self, http_client, token, expires_at):
+        """Store a token in the cache file. The file is written to a
+        temporary file of its own first, then renamed, so that concurrent
+        writers never interleave their writes."""
+        if self.cache_path is None:
+            return
+        tokens = self._read_cache()
+        now = time.time()
+        tokens = dict((key, entry) for key, entry in tokens.items()
+                      if entry.get('expires_at', 0) > now)
+        tokens[self._cache_key(http_client)] = {
+            'token': token, 'expires_at': expires_at}
+        temporary = None
+        try:
+            # Created readable by its owner only
+            fd, temporary = tempfile.mkstemp(
+                dir=os.path.dirname(self.cache_path) or os.curdir,
+                prefix=os.path.basename(self.cache_path) + ".")
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump(tokens, cache_file)
+            getattr(os, 'replace', os.rename)(temporary, self.cache_path)
+        except (IOError, OSError) as exception:
+            LOG.warning("Could not store the authentication token in %s: %s",
+                        self.cache_path, exception)
+            if temporary is not None and os.path.exists(temporary):
+                os.remove(temporary)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""JSON codecs used by the HTTP clients to serialize request bodies and
+decode response bodies
+
+The standard library codec is used by default, :class:`OrjsonCodec`
+requires the optional ``orjson`` package::
+
+    client = HTTPClient(hostname, login, password, codec=best_codec())
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONCodec(object):
+
+    """Codec based on the json module of the standard library"""
+
+    name = 'json'
+
+    def dumps(self, obj):
+        """Serialize an object
+
+        :param obj: Object to serialize
+
+        :return: UTF-8 encoded JSON document
+        :rtype: bytes
+
+        """
+        return json.dumps(obj).encode('utf-8')
+
+    def loads(self, data):
+        """Decode a JSON document
+
+        :param data: UTF-8 encoded JSON document, as bytes or text
+
+        :return: Decoded object
+
+        :raises ValueError: if the document is not valid JSON
+
+        """
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+
+class OrjsonCodec(object):
+
+    """Codec based on the ``orjson`` package, serializing directly to bytes
+    and decoding bytes without an intermediate string"""
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is required to use OrjsonCodec")
+
+    def dumps(self, obj):
+        """Serialize an object, see :meth:`JSONCodec.dumps`"""
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        """Decode a JSON document, see :meth:`JSONCodec.loads`"""
+        return orjson.loads(data)
+
+
+def best_codec():
+    """Return the fastest codec available
+
+    :return: :class:`OrjsonCodec` if orjson is installed, otherwise
+        :class:`JSONCodec`
+
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    return JSONCodec()
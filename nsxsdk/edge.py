@@ -1,60 +1,136 @@
 #!/usr/bin/env python
 """Module VMware NSX Edge"""
 
-import json
+from .edgeconfig import EDGE_PAGE_SIZE
+from .edgeconfig import EDGE_PATH
+from .edgeconfig import _create_bgp_configuration
+from .edgeconfig import _create_bgp_peer_configuration
+from .edgeconfig import _create_global_routing_configuration
+from .edgeconfig import _create_ha_configuration
+from .edgeconfig import _create_interface_configuration
+from .edgeconfig import _create_interfaces_configuration
+from .edgeconfig import _create_logical_router_configuration
+from .edgeconfig import _create_service_gateway_configuration
+from .edgeconfig import _create_syslog_configuration
+from .edgeconfig import _edge_page_path
+from .ensure import EnsureMixin
+from .ensure import _normalize_bgp_peers
+from .jobs import DeploymentJob
+from .jobs import DeploymentPoller
+from .utils import NameIndex
+from .utils import iter_pages
+
+# Settings of a BGP neighbour written by the SDK, and the values NSX Manager
+# uses for the optional ones
+BGP_PEER_KEYS = ('ipAddress', 'remoteAS', 'weight', 'holdDownTimer',
+                 'keepAliveTimer')
+BGP_PEER_DEFAULTS = {'weight': 60, 'holddown_timer': 180,
+                     'keepalive_timer': 60}
+
+
+class Edge(EnsureMixin):
 
-EDGE_PATH = "/api/4.0/edges/"
+    """This class provides some functions to deploy and
+    configure VMware NSX Edge
 
+    When ``cache_ttl`` is set, :meth:`get_edge_id` is served from an
+    in-memory name to id index reloaded every ``cache_ttl`` seconds and
+    kept up to date by :meth:`create_edge` and :meth:`delete_edge`.
 
-def _create_basic_configuration(edge_name, datacenter_id,
-                                resourcepool_id, datastore_id,
-                                log_level, host_id,
-                                vmfolder_id):
-    """Create a basic edge configuration for both logical router
-    and service gateway
+    The ``ensure_*`` methods, see :class:`nsxsdk.ensure.EnsureMixin`,
+    compare the requested configuration with the current one and only write
+    it when they differ.
 
-        :param str edge_name: Name of the edge to be deployed
-        :param str datacenter_id: Id of the datacenter where the edge appliance
-            will be deployed
-        :param str resourcepool_id: Id of the resourcepool where the edge
-            appliance will be deployed
-        :param str datastore_id: Id of the datastore where the edge appliance
-            will be deployed
-        :param str log_level: Edge appliance log level, default is info.
-            Other possible values are emergency, alert, critical, error,
-            warning, notice, debug.
-        :param str host_id: Id of the host where the edge appliance
-            will be deployed
-        :param str vmfolder_id: Id of the folder where the edge appliance
-            will be deployed
-
-        :return: Edge basic configuration
+    The type of the edges seen in listings or fetched once is kept in
+    ``edge_types`` for the lifetime of the object, an edge type can not
+    change.
 
+    ``create_edge`` returns a :class:`nsxsdk.jobs.DeploymentJob` followed
+    by ``poller``, a :class:`nsxsdk.jobs.DeploymentPoller` created on the
+    first deployment. The same poller can be given to several objects so
+    that all their deployments are followed from one thread.
     """
-    edge_data = {}
-    edge_data['datacenterMoid'] = datacenter_id
-    edge_data['name'] = edge_name
-    edge_data['vseLogLevel'] = log_level
 
-    appliance_data = {}
-    appliance_data['resourcePoolId'] = resourcepool_id
-    appliance_data['datastoreId'] = datastore_id
-    if host_id:
-        appliance_data['hostId'] = host_id
-    if vmfolder_id:
-        appliance_data['vmFolderId'] = vmfolder_id
-    edge_data['appliances']['appliances'].append(appliance_data)
-    return edge_data
+    def __init__(self, http_client, cache_ttl=None, poller=None):
+        self.http_client = http_client
+        self.edge_types = {}
+        self.edge_index = None
+        if cache_ttl is not None:
+            self.edge_index = NameIndex(self._load_edge_index, cache_ttl)
+        self.poller = poller
 
+    def _load_edge_index(self):
+        """Build the edge name to id index
 
-class Edge(object):
+        :return: Id of the edges indexed by their names
+        :rtype: dict
 
-    """This class provides some functions to deploy and
-    configure VMware NSX Edge
-    """
+        """
+        return dict((edge['name'], edge['objectId'])
+                    for edge in self.iter_edges())
 
-    def __init__(self, http_client):
-        self.http_client = http_client
+    def _index_created_edge(self, edge_name, edge_type, response):
+        """Add a newly deployed edge to the caches, from the Location header
+        of the creation response.
+
+        :param str edge_name: Name of the deployed edge
+        :param str edge_type: Type of the deployed edge
+        :param requests.Response response: Response to the creation request
+
+        :return: Id of the edge and id of the NSX Manager job, only the
+            one the Location header points to is set
+        :rtype: tuple
+
+        """
+        if response.status_code not in (201, 202):
+            return None, None
+        location = response.headers.get('Location')
+        if location and "/jobs/" in location:
+            if self.edge_index is not None:
+                self.edge_index.invalidate()
+            return None, location.rstrip('/').split('/')[-1]
+        if location:
+            edge_id = location.rstrip('/').split('/')[-1]
+            self.edge_types[edge_id] = edge_type
+            if self.edge_index is not None:
+                self.edge_index.set(edge_name, edge_id)
+            return edge_id, None
+        if self.edge_index is not None:
+            self.edge_index.invalidate()
+        return None, None
+
+    def _track_deployment(self, edge_name, edge_type, response):
+        """Index a newly deployed edge and follow its deployment
+
+        :param str edge_name: Name of the deployed edge
+        :param str edge_type: Type of the deployed edge
+        :param requests.Response response: Response to the creation request
+
+        :return: handle on the deployment
+        :rtype: nsxsdk.jobs.DeploymentJob
+
+        """
+        edge_id, job_id = self._index_created_edge(edge_name, edge_type,
+                                                   response)
+        job = DeploymentJob(edge_name, response, edge_id, job_id)
+        if response.status_code >= 400:
+            job.finish("HTTP %d" % response.status_code)
+        elif job_id is not None:
+            job.status_path = EDGE_PATH + "jobs/" + job_id
+        elif edge_id is not None:
+            job.status_path = EDGE_PATH + edge_id + "/status"
+        else:
+            job.finish("no Location header in the creation response")
+        if not job.done():
+            if self.poller is None:
+                self.poller = DeploymentPoller(self.http_client)
+            self.poller.add(job)
+        return job
+
+    def refresh_edge_index(self):
+        """Reload the edge name to id index from NSX Manager"""
+        if self.edge_index is not None:
+            self.edge_index.refresh()
 
     def _is_distributed(self, edge_id):
         """ Check if edge device is a logical router.
@@ -66,10 +142,14 @@ class Edge(object):
         :rtype: bool
 
         """
-        path = EDGE_PATH + edge_id
-        response = self.http_client.request("GET", path)
-        data = json.loads(response.text)
-        if data['type'] == "distributedRouter":
+        edge_type = self.edge_types.get(edge_id)
+        if edge_type is None:
+            path = EDGE_PATH + edge_id
+            response = self.http_client.request("GET", path)
+            data = response.data
+            edge_type = data['type']
+            self.edge_types[edge_id] = edge_type
+        if edge_type == "distributedRouter":
             return True
         return False
 
@@ -91,18 +171,9 @@ class Edge(object):
         :rtype: requests.Response
 
         """
-        interface_data = {}
-        interface_data['addressGroups'] = {}
-        interface_data['addressGroups']['addressGroups'] = []
-        interface_data['connectedToId'] = network_id
-        interface_data['mtu'] = mtu
-        interface_data['type'] = interface_type
-
-        interface_addressgroup = {}
-        interface_addressgroup['primaryAddress'] = ip_addr
-        interface_addressgroup['netmask'] = netmask
-        interface_data['addressGroups'][
-            'addressGroups'].append(interface_addressgroup)
+        interface_data = _create_interface_configuration(interface_type,
+                                                         ip_addr, netmask,
+                                                         network_id, mtu)
 
         path = EDGE_PATH + edge_id
         if self._is_distributed(edge_id):
@@ -110,10 +181,57 @@ class Edge(object):
         else:
             path = path + "/vnics/?action=patch"
 
-        data = json.dumps(interface_data)
-        response = self.http_client.request("POST", path, data)
+        response = self.http_client.request("POST", path, interface_data)
+        return response
+
+    def _patch_interfaces(self, edge_id, interfaces, distributed):
+        """Attach several interfaces to an edge in a single request
+
+        :param str edge_id: Id of the edge
+        :param list interfaces: Interfaces description, see
+            :meth:`add_interfaces`
+        :param bool distributed: True if the edge is a logical router
+
+        :return: response to the HTTP request
+        :rtype: requests.Response
+
+        """
+        interfaces_data = _create_interfaces_configuration(interfaces,
+                                                           distributed)
+        path = EDGE_PATH + edge_id
+        if distributed:
+            path = path + "/interfaces/?action=patch"
+        else:
+            path = path + "/vnics/?action=patch"
+
+        response = self.http_client.request("POST", path, interfaces_data)
         return response
 
+    def add_interfaces(self, edge_id, interfaces):
+        """Attach several new interfaces to an existing edge device (Service
+        Gateway or Logical Router) in a single request
+
+        Each interface is described by a dict, for example::
+
+            {'interface_type': 'internal',
+             'network_id': 'virtualwire-10',
+             'mtu': 9000,
+             'address_groups': [
+                 {'ip_addr': '10.0.0.1', 'netmask': '255.255.255.0',
+                  'secondary_addresses': ['10.0.0.2', '10.0.0.3']},
+                 {'ip_addr': '10.0.1.1', 'netmask': '255.255.255.0'}]}
+
+        :param str edge_id: Id of the edge
+        :param list interfaces: Interfaces description, mtu (defaults to
+            1500), name and secondary_addresses are optional.
+
+        :return: response to the HTTP request
+        :rtype: requests.Response
+
+        """
+        return self._patch_interfaces(edge_id, interfaces,
+                                      self._is_distributed(edge_id))
+
     def delete_edge(self, edge_id):
         """Delete a NSX Edge
 
@@ -125,24 +243,57 @@ class Edge(object):
         """
         path = EDGE_PATH + edge_id
         response = self.http_client.request("DELETE", path)
+        if response.status_code < 300:
+            self.edge_types.pop(edge_id, None)
+            if self.edge_index is not None:
+                self.edge_index.discard_id(edge_id)
         return response
 
-    def get_edge_id(self, edge_name):
+    def get_edge_id(self, edge_name, stream=False):
         """Retrieve the ID of a NSX Edge from its name
 
         :param str edge_name: The name of the edge to get.
+        :param bool stream: Parse the edge listing incrementally and stop
+            reading it at the first matching edge, ignored when the edge
+            index is enabled.
 
         :return: Id of the edge
         :rtype: str
 
         """
-        path = EDGE_PATH
-        response = self.http_client.request("GET", path)
-        jsondata = json.loads(response.text)
-        edges = jsondata['edgePage']['data']
+        if self.edge_index is not None:
+            return self.edge_index.get(edge_name)
+        edges = self.iter_edges(stream=stream)
         for edge in edges:
             if edge['name'] == edge_name:
+                edges.close()
                 return edge['objectId']
+        return None
+
+    def iter_edges(self, page_size=EDGE_PAGE_SIZE, prefetch=False,
+                   stream=False):
+        """Iterate lazily over all NSX Edges, one page at a time, see
+        :func:`nsxsdk.utils.iter_pages`
+
+        :param int page_size: Number of edges requested per page
+        :param bool prefetch: Fetch the next page in a background thread
+            while the current one is being consumed, defaults to False.
+        :param bool stream: Parse each page incrementally while it is being
+            downloaded, prefetch is ignored in this mode.
+
+        :return: Edge summaries, as returned by NSX Manager
+        :rtype: generator of dict
+
+        """
+        edges = iter_pages(self.http_client, _edge_page_path,
+                           ['edgePage', 'data'], page_size, prefetch, stream)
+        try:
+            for edge in edges:
+                if 'edgeType' in edge:
+                    self.edge_types[edge['objectId']] = edge['edgeType']
+                yield edge
+        finally:
+            edges.close()
 
     def configure_global_routing(self, edge_id, router_id,
                                  ecmp=False, log=False, log_level="info"):
@@ -163,16 +314,9 @@ class Edge(object):
 
         """
         path = EDGE_PATH + edge_id + "/routing/config/global"
-        global_data = {}
-        global_data['routerId'] = router_id
-        if ecmp:
-            global_data['ecmp'] = ecmp
-        if log:
-            global_data['logging'] = {}
-            global_data['logging']['enabled'] = "true"
-            global_data['logging']['logLevel'] = log_level
-        data = json.dumps(global_data)
-        response = self.http_client.request("PUT", path, data)
+        global_data = _create_global_routing_configuration(router_id, ecmp,
+                                                           log, log_level)
+        response = self.http_client.request("PUT", path, global_data)
         return response
 
     def add_bgp_peer(self, edge_id, peer_ip, peer_as, weight=None,
@@ -192,20 +336,133 @@ class Edge(object):
         """
         path = EDGE_PATH + edge_id + "/routing/config/bgp"
         response = self.http_client.request("GET", path)
-        data = json.loads(response.text)
-        peer_data = {}
-        peer_data['ipAddress'] = peer_ip
-        peer_data['remoteAS'] = str(peer_as)
-        if weight is not None:
-            peer_data['weight'] = str(weight)
-        if holddown_timer is not None:
-            peer_data['holdDownTimer'] = str(holddown_timer)
-        if keepalive_timer is not None:
-            peer_data['keepAliveTimer'] = str(keepalive_timer)
+        data = response.data
+        peer_data = _create_bgp_peer_configuration(peer_ip, peer_as, weight,
+                                                   holddown_timer,
+                                                   keepalive_timer)
         data['bgpNeighbours']['bgpNeighbours'].append(peer_data)
-        response = self.http_client.request("PUT", path, json.dumps(data))
+        response = self.http_client.request("PUT", path, data)
+        return response
+
+    def _update_bgp_peers(self, edge_id, update):
+        """Update the BGP neighbours of an edge with a single read-modify-write
+        cycle, the configuration is only written if it changed.
+
+        :param str edge_id: Id of the edge to be reconfigured
+        :param update: Callable receiving the list of configured neighbours
+            and returning the new one
+
+        :return: response to the HTTP request, None if the neighbours were
+            already up to date, the response to the read of the BGP
+            configuration if it failed
+        :rtype: request.Response
+
+        """
+        path = EDGE_PATH + edge_id + "/routing/config/bgp"
+        response = self.http_client.request("GET", path)
+        if response.status_code >= 300:
+            return response
+        data = response.data or {}
+        neighbours = (data.get('bgpNeighbours') or {}).get(
+            'bgpNeighbours') or []
+        current = _normalize_bgp_peers(neighbours)
+        neighbours = update([dict(neighbour) for neighbour in neighbours])
+        if _normalize_bgp_peers(neighbours) == current:
+            return None
+        data['bgpNeighbours'] = {'bgpNeighbours': neighbours}
+        response = self.http_client.request("PUT", path, data)
         return response
 
+    def add_bgp_peers(self, edge_id, peers):
+        """Add or update several bgp remote peers of an existing NSX Edge,
+        with a single read and write of its BGP configuration.
+
+        :param str edge_id: Id of the edge to be reconfigured
+        :param list peers: Peers description, each one is a dict with
+            peer_ip, peer_as and optionally weight, holddown_timer and
+            keepalive_timer keys (see :meth:`add_bgp_peer`). A configured
+            peer with the same IP address is updated.
+
+        :return: response to the HTTP request, None if the peers were
+            already configured
+        :rtype: request.Response
+
+        """
+        peers_data = [_create_bgp_peer_configuration(**peer)
+                      for peer in peers]
+
+        def update(neighbours):
+            by_address = dict((neighbour.get('ipAddress'), neighbour)
+                              for neighbour in neighbours)
+            for peer_data in peers_data:
+                neighbour = by_address.get(peer_data['ipAddress'])
+                if neighbour is None:
+                    neighbours.append(peer_data)
+                    by_address[peer_data['ipAddress']] = peer_data
+                else:
+                    neighbour.update(peer_data)
+            return neighbours
+
+        return self._update_bgp_peers(edge_id, update)
+
+    def remove_bgp_peers(self, edge_id, peer_ips):
+        """Remove several bgp remote peers from an existing NSX Edge, with a
+        single read and write of its BGP configuration.
+
+        :param str edge_id: Id of the edge to be reconfigured
+        :param list peer_ips: IP addresses of the peers to remove
+
+        :return: response to the HTTP request, None if none of the peers
+            was configured
+        :rtype: request.Response
+
+        """
+        peer_ips = set(peer_ips)
+
+        def update(neighbours):
+            return [neighbour for neighbour in neighbours
+                    if neighbour.get('ipAddress') not in peer_ips]
+
+        return self._update_bgp_peers(edge_id, update)
+
+    def set_bgp_peers(self, edge_id, peers):
+        """Set the whole list of bgp remote peers of an existing NSX Edge,
+        peers which are not listed are removed. The settings managed by the
+        SDK are replaced by the requested ones, weight and timers which are
+        not given are set back to their NSX defaults (BGP_PEER_DEFAULTS).
+        Other settings of already configured peers, such as filters, are
+        kept.
+
+        :param str edge_id: Id of the edge to be reconfigured
+        :param list peers: Peers description, see :meth:`add_bgp_peers`
+
+        :return: response to the HTTP request, None if the peers were
+            already configured as requested
+        :rtype: request.Response
+
+        """
+        peers_data = []
+        for peer in peers:
+            settings = dict(BGP_PEER_DEFAULTS)
+            settings.update((key, value) for key, value in peer.items()
+                            if value is not None)
+            peers_data.append(_create_bgp_peer_configuration(**settings))
+
+        def update(neighbours):
+            by_address = dict((neighbour.get('ipAddress'), neighbour)
+                              for neighbour in neighbours)
+            result = []
+            for peer_data in peers_data:
+                neighbour = by_address.get(peer_data['ipAddress'], {})
+                neighbour = dict((key, value)
+                                 for key, value in neighbour.items()
+                                 if key not in BGP_PEER_KEYS)
+                neighbour.update(peer_data)
+                result.append(neighbour)
+            return result
+
+        return self._update_bgp_peers(edge_id, update)
+
     def configure_bgp(self, edge_id, local_as, graceful_restart=False,
                       default_originate=False):
         """Configure BGP basic parameters such as Local AS, graceful restart
@@ -223,15 +480,9 @@ class Edge(object):
 
         """
         path = EDGE_PATH + edge_id + "/routing/config/bgp"
-        bgp_data = {}
-        bgp_data['enabled'] = "true"
-        bgp_data['localAS'] = str(local_as)
-        if graceful_restart:
-            bgp_data['gracefulRestart'] = "true"
-        if default_originate:
-            bgp_data['defaultOriginate'] = "true"
-        data = json.dumps(bgp_data)
-        response = self.http_client.request("PUT", path, data)
+        bgp_data = _create_bgp_configuration(local_as, graceful_restart,
+                                             default_originate)
+        response = self.http_client.request("PUT", path, bgp_data)
         return response
 
     def configure_syslog(self, edge_id, ip_address, protocol):
@@ -246,16 +497,8 @@ class Edge(object):
 
         """
         path = EDGE_PATH + edge_id + "/syslog/config"
-        syslog_data = {}
-        syslog_data['featureType'] = "syslog"
-        syslog_data['enabled'] = "true"
-        syslog_data['protocol'] = protocol
-        syslog_data['serverAddresses'] = {}
-        syslog_data['serverAddresses']['type'] = "IpAddressesDto"
-        syslog_data['serverAddresses']['ipAddress'] = []
-        syslog_data['serverAddresses']['ipAddress'].append(ip_address)
-        data = json.dumps(syslog_data)
-        response = self.http_client.request("PUT", path, data)
+        syslog_data = _create_syslog_configuration(ip_address, protocol)
+        response = self.http_client.request("PUT", path, syslog_data)
         return response
 
     def configure_ha(self, edge_id):
@@ -268,18 +511,15 @@ class Edge(object):
 
         """
         path = EDGE_PATH + edge_id + "/highavailability/config"
-        ha_data = {}
-        ha_data['featureType'] = "highavailability_4.0"
-        ha_data['enabled'] = "true"
-        data = json.dumps(ha_data)
-        response = self.http_client.request("PUT", path, data)
+        ha_data = _create_ha_configuration()
+        response = self.http_client.request("PUT", path, ha_data)
         return response
 
 
 class LogicalRouter(Edge):
 
-    def __init__(self, http_client):
-        Edge.__init__(self, http_client)
+    def __init__(self, http_client, cache_ttl=None, poller=None):
+        Edge.__init__(self, http_client, cache_ttl, poller)
 
     def create_edge(self, edge_name, datacenter_id, resourcepool_id,
                     datastore_id, mgmt_portgroup_id, mgmt_ipaddr,
@@ -306,31 +546,25 @@ class LogicalRouter(Edge):
         :param str vmfolder_id: Id of the folder where the edge appliance
             will be deployed
 
-        :return: response to the HTTP request
-        :rtype: request.Response
+        :return: handle on the deployment, also giving access to the
+            response to the HTTP request
+        :rtype: nsxsdk.jobs.DeploymentJob
 
         """
         path = EDGE_PATH
-        edge_data = _create_basic_configuration(edge_name,
-                                                datacenter_id,
-                                                resourcepool_id,
-                                                datastore_id,
-                                                host_id,
-                                                vmfolder_id,
-                                                log_level)
-        edge_data['type'] = "distributedRouter"
-        edge_data['mgmtInterface'] = {}
-        edge_data['mgmtInterface']['connectedToId'] = mgmt_portgroup_id
-        edge_data['mgmtInterface']['addressGroups'] = {}
-        edge_data['mgmtInterface']['addressGroups']['addressGroups'] = []
-        mgmt_configuration = {}
-        mgmt_configuration['primaryAddress'] = mgmt_ipaddr
-        mgmt_configuration['subnetMask'] = mgmt_netmask
-        edge_data['mgmtInterface']['addressGroups'][
-            'addressGroups'].append(mgmt_configuration)
-        data = json.dumps(edge_data)
-        response = self.http_client.request("POST", path, data)
-        return response
+        edge_data = _create_logical_router_configuration(edge_name,
+                                                         datacenter_id,
+                                                         resourcepool_id,
+                                                         datastore_id,
+                                                         mgmt_portgroup_id,
+                                                         mgmt_ipaddr,
+                                                         mgmt_netmask,
+                                                         log_level,
+                                                         host_id,
+                                                         vmfolder_id)
+        response = self.http_client.request("POST", path, edge_data)
+        return self._track_deployment(edge_name, "distributedRouter",
+                                      response)
 
     def add_interface(self, edge_id, interface_type, ip_addr, netmask,
                       network_id, mtu=1500):
@@ -349,30 +583,33 @@ class LogicalRouter(Edge):
         :rtype: requests.Response
 
         """
-        interface_data = {}
-        interface_data['addressGroups'] = {}
-        interface_data['addressGroups']['addressGroups'] = []
-        interface_data['connectedToId'] = network_id
-        interface_data['mtu'] = mtu
-        interface_data['type'] = interface_type
-
-        interface_addressgroup = {}
-        interface_addressgroup['primaryAddress'] = ip_addr
-        interface_addressgroup['netmask'] = netmask
-        interface_data['addressGroups'][
-            'addressGroups'].append(interface_addressgroup)
+        interface_data = _create_interface_configuration(interface_type,
+                                                         ip_addr, netmask,
+                                                         network_id, mtu)
 
         path = EDGE_PATH + edge_id + "/interfaces/?action=patch"
 
-        data = json.dumps(interface_data)
-        response = self.http_client.request("POST", path, data)
+        response = self.http_client.request("POST", path, interface_data)
         return response
 
+    def add_interfaces(self, edge_id, interfaces):
+        """Attach several new interfaces to an existing logical router in a
+        single request, see :meth:`Edge.add_interfaces`
+
+        :param str edge_id: Id of the edge
+        :param list interfaces: Interfaces description
+
+        :return: response to the HTTP request
+        :rtype: requests.Response
+
+        """
+        return self._patch_interfaces(edge_id, interfaces, True)
+
 
 class ServiceGateway(Edge):
 
-    def __init__(self, http_client):
-        Edge.__init__(self, http_client)
+    def __init__(self, http_client, cache_ttl=None, poller=None):
+        Edge.__init__(self, http_client, cache_ttl, poller)
 
     def create_edge(self, edge_name, appliance_size,
                     datacenter_id, resourcepool_id,
@@ -397,22 +634,23 @@ class ServiceGateway(Edge):
         :param str vmfolder_id: Id of the folder where the edge appliance
             will be deployed
 
-        :return: response to the HTTP request
-        :rtype: request.Response
+        :return: handle on the deployment, also giving access to the
+            response to the HTTP request
+        :rtype: nsxsdk.jobs.DeploymentJob
 
         """
         path = EDGE_PATH
-        edge_data = _create_basic_configuration(edge_name,
-                                                datacenter_id,
-                                                resourcepool_id,
-                                                datastore_id,
-                                                host_id,
-                                                vmfolder_id,
-                                                log_level)
-        edge_data['appliances']['applianceSize'] = appliance_size
-        data = json.dumps(edge_data)
-        response = self.http_client.request("POST", path, data)
-        return response
+        edge_data = _create_service_gateway_configuration(edge_name,
+                                                          appliance_size,
+                                                          datacenter_id,
+                                                          resourcepool_id,
+                                                          datastore_id,
+                                                          log_level,
+                                                          host_id,
+                                                          vmfolder_id)
+        response = self.http_client.request("POST", path, edge_data)
+        return self._track_deployment(edge_name, "gatewayServices",
+                                      response)
 
     def add_interface(self, edge_id, interface_type, ip_addr, netmask,
                       network_id, mtu=1500):
@@ -431,21 +669,24 @@ class ServiceGateway(Edge):
         :rtype: requests.Response
 
         """
-        interface_data = {}
-        interface_data['addressGroups'] = {}
-        interface_data['addressGroups']['addressGroups'] = []
-        interface_data['connectedToId'] = network_id
-        interface_data['mtu'] = mtu
-        interface_data['type'] = interface_type
-
-        interface_addressgroup = {}
-        interface_addressgroup['primaryAddress'] = ip_addr
-        interface_addressgroup['netmask'] = netmask
-        interface_data['addressGroups'][
-            'addressGroups'].append(interface_addressgroup)
+        interface_data = _create_interface_configuration(interface_type,
+                                                         ip_addr, netmask,
+                                                         network_id, mtu)
 
         path = EDGE_PATH + edge_id + "/vnics/?action=patch"
 
-        data = json.dumps(interface_data)
-        response = self.http_client.request("POST", path, data)
+        response = self.http_client.request("POST", path, interface_data)
         return response
+
+    def add_interfaces(self, edge_id, interfaces):
+        """Attach several new interfaces to an existing service gateway in a
+        single request, see :meth:`Edge.add_interfaces`
+
+        :param str edge_id: Id of the edge
+        :param list interfaces: Interfaces description
+
+        :return: response to the HTTP request
+        :rtype: requests.Response
+
+        """
+        return self._patch_interfaces(edge_id, interfaces, False)
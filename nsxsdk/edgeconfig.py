@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+"""Paths and payload builders of the NSX Edge configuration, shared by the
+blocking and asyncio SDKs"""
+
+from . import models
+
+EDGE_PATH = "/api/4.0/edges/"
+EDGE_PAGE_SIZE = 256
+
+
+def _edge_page_path(start_index, page_size):
+    """Build the path of a page of the NSX Edge listing"""
+    return EDGE_PATH + "?startIndex=" + str(start_index) + \
+        "&pageSize=" + str(page_size)
+
+
+def _create_basic_configuration(edge_name, datacenter_id,
+                                resourcepool_id, datastore_id,
+                                log_level, host_id,
+                                vmfolder_id):
+    """Create a basic edge configuration for both logical router
+    and service gateway
+
+        :param str edge_name: Name of the edge to be deployed
+        :param str datacenter_id: Id of the datacenter where the edge appliance
+            will be deployed
+        :param str resourcepool_id: Id of the resourcepool where the edge
+            appliance will be deployed
+        :param str datastore_id: Id of the datastore where the edge appliance
+            will be deployed
+        :param str log_level: Edge appliance log level, default is info.
+            Other possible values are emergency, alert, critical, error,
+            warning, notice, debug.
+        :param str host_id: Id of the host where the edge appliance
+            will be deployed
+        :param str vmfolder_id: Id of the folder where the edge appliance
+            will be deployed
+
+        :return: Edge basic configuration
+
+    """
+    edge_data = {}
+    edge_data['datacenterMoid'] = datacenter_id
+    edge_data['name'] = edge_name
+    edge_data['vseLogLevel'] = log_level
+    edge_data['appliances'] = {'appliances': []}
+
+    appliance_data = {}
+    appliance_data['resourcePoolId'] = resourcepool_id
+    appliance_data['datastoreId'] = datastore_id
+    if host_id:
+        appliance_data['hostId'] = host_id
+    if vmfolder_id:
+        appliance_data['vmFolderId'] = vmfolder_id
+    edge_data['appliances']['appliances'].append(appliance_data)
+    return edge_data
+
+
+def _create_interface_configuration(interface_type, ip_addr, netmask,
+                                    network_id, mtu):
+    """Create an interface configuration to be attached to an edge
+
+        :param str interface_type: Interface type, possible values are internal
+            or uplink.
+        :param str ip_addr: Interface IP address
+        :param str netmask: Interface netmask
+        :param str network_id: Id of the network (dvportgroup-id
+            or virtualwire-id) on which the new interface need to be connected.
+        :param int mtu: Interface MTU
+
+        :return: Interface configuration
+
+    """
+    interface = models.Interface(type=interface_type, network_id=network_id,
+                                 mtu=mtu,
+                                 address_groups=((ip_addr, netmask, None),))
+    return interface.to_nsx()
+
+
+def _create_interfaces_configuration(interfaces, distributed):
+    """Create the configuration of several interfaces to be attached to an
+    edge in a single request
+
+        :param list interfaces: Interfaces description, each one is a dict
+            with interface_type, network_id, address_groups and optionally
+            mtu (defaults to 1500) and name keys. address_groups is a list of
+            dicts with ip_addr, netmask and optionally secondary_addresses
+            keys.
+        :param bool distributed: True if interfaces are attached to a logical
+            router, False for a service gateway.
+
+        :return: Interfaces configuration
+
+    """
+    interfaces_data = []
+    for interface in interfaces:
+        address_groups = tuple(
+            (address_group['ip_addr'], address_group['netmask'],
+             address_group.get('secondary_addresses'))
+            for address_group in interface['address_groups'])
+        interfaces_data.append(models.Interface(
+            name=interface.get('name') or None,
+            type=interface['interface_type'],
+            network_id=interface['network_id'],
+            mtu=interface.get('mtu', 1500),
+            address_groups=address_groups).to_nsx())
+
+    if distributed:
+        return {'interfaces': interfaces_data}
+    return {'vnics': interfaces_data}
+
+
+def _create_logical_router_configuration(edge_name, datacenter_id,
+                                         resourcepool_id, datastore_id,
+                                         mgmt_portgroup_id, mgmt_ipaddr,
+                                         mgmt_netmask, log_level, host_id,
+                                         vmfolder_id):
+    """Create a logical router configuration, see
+    :meth:`nsxsdk.edge.LogicalRouter.create_edge` for parameters description.
+
+        :return: Logical router configuration
+
+    """
+    edge_data = _create_basic_configuration(edge_name,
+                                            datacenter_id,
+                                            resourcepool_id,
+                                            datastore_id,
+                                            log_level,
+                                            host_id,
+                                            vmfolder_id)
+    edge_data['type'] = "distributedRouter"
+    edge_data['mgmtInterface'] = {}
+    edge_data['mgmtInterface']['connectedToId'] = mgmt_portgroup_id
+    edge_data['mgmtInterface']['addressGroups'] = {}
+    edge_data['mgmtInterface']['addressGroups']['addressGroups'] = []
+    mgmt_configuration = {}
+    mgmt_configuration['primaryAddress'] = mgmt_ipaddr
+    mgmt_configuration['subnetMask'] = mgmt_netmask
+    edge_data['mgmtInterface']['addressGroups'][
+        'addressGroups'].append(mgmt_configuration)
+    return edge_data
+
+
+def _create_service_gateway_configuration(edge_name, appliance_size,
+                                          datacenter_id, resourcepool_id,
+                                          datastore_id, log_level, host_id,
+                                          vmfolder_id):
+    """Create a service gateway configuration, see
+    :meth:`nsxsdk.edge.ServiceGateway.create_edge` for parameters description.
+
+        :return: Service gateway configuration
+
+    """
+    edge_data = _create_basic_configuration(edge_name,
+                                            datacenter_id,
+                                            resourcepool_id,
+                                            datastore_id,
+                                            log_level,
+                                            host_id,
+                                            vmfolder_id)
+    edge_data['appliances']['applianceSize'] = appliance_size
+    return edge_data
+
+
+def _create_global_routing_configuration(router_id, ecmp, log, log_level):
+    """Create an edge global routing configuration, see
+    :meth:`nsxsdk.edge.Edge.configure_global_routing` for parameters
+    description.
+
+        :return: Global routing configuration
+
+    """
+    global_data = {}
+    global_data['routerId'] = router_id
+    if ecmp:
+        global_data['ecmp'] = ecmp
+    if log:
+        global_data['logging'] = {}
+        global_data['logging']['enabled'] = "true"
+        global_data['logging']['logLevel'] = log_level
+    return global_data
+
+
+def _create_bgp_peer_configuration(peer_ip, peer_as, weight=None,
+                                   holddown_timer=None, keepalive_timer=None):
+    """Create a BGP neighbour configuration, see
+    :meth:`nsxsdk.edge.Edge.add_bgp_peer` for parameters description.
+
+        :return: BGP neighbour configuration
+
+    """
+    peer = models.BgpNeighbour(ip_address=peer_ip, remote_as=peer_as,
+                               weight=weight, holddown_timer=holddown_timer,
+                               keepalive_timer=keepalive_timer)
+    return peer.to_nsx()
+
+
+def _create_bgp_configuration(local_as, graceful_restart, default_originate):
+    """Create a BGP basic configuration, see
+    :meth:`nsxsdk.edge.Edge.configure_bgp` for parameters description.
+
+        :return: BGP configuration
+
+    """
+    bgp_data = {}
+    bgp_data['enabled'] = "true"
+    bgp_data['localAS'] = str(local_as)
+    if graceful_restart:
+        bgp_data['gracefulRestart'] = "true"
+    if default_originate:
+        bgp_data['defaultOriginate'] = "true"
+    return bgp_data
+
+
+def _create_syslog_configuration(ip_address, protocol):
+    """Create a syslog configuration, see
+    :meth:`nsxsdk.edge.Edge.configure_syslog` for parameters description.
+
+        :return: Syslog configuration
+
+    """
+    syslog_data = {}
+    syslog_data['featureType'] = "syslog"
+    syslog_data['enabled'] = "true"
+    syslog_data['protocol'] = protocol
+    syslog_data['serverAddresses'] = {}
+    syslog_data['serverAddresses']['type'] = "IpAddressesDto"
+    syslog_data['serverAddresses']['ipAddress'] = []
+    syslog_data['serverAddresses']['ipAddress'].append(ip_address)
+    return syslog_data
+
+
+def _create_ha_configuration():
+    """Create a HA configuration
+
+        :return: HA configuration
+
+    """
+    ha_data = {}
+    ha_data['featureType'] = "highavailability_4.0"
+    ha_data['enabled'] = "true"
+    return ha_data
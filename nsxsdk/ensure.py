@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+"""Ensure mode of the NSX Edge features
+
+The configuration of a feature is compared with the requested one and is
+only written when they differ, so that reconciling an edge already
+configured does not reload its configuration.
+"""
+
+from .edgeconfig import EDGE_PATH
+from .edgeconfig import _create_bgp_configuration
+from .edgeconfig import _create_global_routing_configuration
+from .edgeconfig import _create_ha_configuration
+from .edgeconfig import _create_syslog_configuration
+
+# Keys set in payloads which NSX Manager returns with a different value
+_UNCOMPARED_KEYS = ('featureType',)
+
+
+def _normalize_configuration(value):
+    """Normalize a configuration so that values sent as strings and
+    returned by NSX Manager as numbers or booleans compare equal
+
+        :param value: Configuration, or part of it
+
+        :return: Normalized configuration
+
+    """
+    if isinstance(value, dict):
+        return dict((key, _normalize_configuration(item))
+                    for key, item in value.items())
+    if isinstance(value, list):
+        return [_normalize_configuration(item) for item in value]
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return value
+    return str(value)
+
+
+def _normalize_bgp_peers(neighbours):
+    """Normalize BGP neighbours so that they can be compared regardless of
+    their order
+
+        :param list neighbours: BGP neighbours configuration
+
+        :return: Normalized BGP neighbours configuration
+
+    """
+    return sorted(_normalize_configuration(neighbours),
+                  key=lambda neighbour: neighbour.get('ipAddress') or '')
+
+
+def _diff_configuration(current, desired, path=''):
+    """Compute the differences between the current configuration and the
+    desired one. Only the keys of the desired configuration are compared,
+    settings which are not managed by the SDK are ignored.
+
+        :param current: Current configuration, or part of it
+        :param desired: Desired configuration, or part of it
+        :param str path: Path of the compared part, keys being separated
+            by dots
+
+        :return: Changes as (path, current value, desired value) tuples
+        :rtype: list
+
+    """
+    if isinstance(desired, dict) and isinstance(current, dict):
+        changes = []
+        for key in sorted(desired):
+            if key in _UNCOMPARED_KEYS:
+                continue
+            key_path = path + '.' + key if path else key
+            changes.extend(_diff_configuration(current.get(key),
+                                               desired[key], key_path))
+        return changes
+    if _normalize_configuration(current) != \
+            _normalize_configuration(desired):
+        return [(path, current, desired)]
+    return []
+
+
+def _read_configuration(response):
+    """Decode the current configuration of a feature
+
+        :param response: Response to the read request
+
+        :return: Configuration, None if the request failed or its body is
+            not a JSON object
+        :rtype: dict
+
+    """
+    if not 200 <= response.status_code < 300:
+        return None
+    try:
+        data = response.data
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    return data
+
+
+def _merge_configuration(current, desired):
+    """Apply the desired configuration on top of the current one
+
+        :param dict current: Current configuration, modified in place
+        :param dict desired: Desired configuration
+
+        :return: Merged configuration
+
+    """
+    for key, value in desired.items():
+        if isinstance(value, dict) and isinstance(current.get(key), dict):
+            _merge_configuration(current[key], value)
+        else:
+            current[key] = value
+    return current
+
+
+class EnsureMixin(object):
+
+    """``ensure_*`` methods of :class:`nsxsdk.edge.Edge`, the class using it
+    provides ``http_client``"""
+
+    def _ensure_configuration(self, path, desired):
+        """Write a configuration only if it differs from the current one
+
+        :param str path: API resource path of the configuration
+        :param dict desired: Desired configuration
+
+        :return: changes as (path, current value, desired value) tuples
+            under the changes key and the response to the write request,
+            None if nothing changed, under the response key. When the
+            current configuration could not be read, changes is None and
+            response is the response to the read request.
+        :rtype: dict
+
+        """
+        response = self.http_client.request("GET", path)
+        current = _read_configuration(response)
+        if current is None:
+            return {'changes': None, 'response': response}
+        changes = _diff_configuration(current, desired)
+        response = None
+        if changes:
+            data = _merge_configuration(current, desired)
+            response = self.http_client.request("PUT", path, data)
+        return {'changes': changes, 'response': response}
+
+    def ensure_global_routing(self, edge_id, router_id, ecmp=False, log=False,
+                              log_level="info"):
+        """Ensure NSX Edge global routing configuration, it is only written
+        if it differs from the requested one. See
+        :meth:`nsxsdk.edge.Edge.configure_global_routing` for parameters
+        description.
+
+        :return: changes, a list of (path, current value, desired value)
+            tuples, and response, the response to the write request or None
+            if nothing changed. See :meth:`_ensure_configuration` when the
+            configuration could not be read.
+        :rtype: dict
+
+        """
+        path = EDGE_PATH + edge_id + "/routing/config/global"
+        global_data = _create_global_routing_configuration(router_id, ecmp,
+                                                           log, log_level)
+        global_data['ecmp'] = bool(ecmp)
+        global_data.setdefault('logging', {'enabled': "false"})
+        return self._ensure_configuration(path, global_data)
+
+    def ensure_bgp(self, edge_id, local_as, graceful_restart=False,
+                   default_originate=False):
+        """Ensure BGP basic parameters, they are only written if they differ
+        from the requested ones. Configured neighbours are kept. See
+        :meth:`nsxsdk.edge.Edge.configure_bgp` for parameters description.
+
+        :return: changes, a list of (path, current value, desired value)
+            tuples, and response, the response to the write request or None
+            if nothing changed. See :meth:`_ensure_configuration` when the
+            configuration could not be read.
+        :rtype: dict
+
+        """
+        path = EDGE_PATH + edge_id + "/routing/config/bgp"
+        bgp_data = _create_bgp_configuration(local_as, graceful_restart,
+                                             default_originate)
+        bgp_data.setdefault('gracefulRestart', "false")
+        bgp_data.setdefault('defaultOriginate', "false")
+        return self._ensure_configuration(path, bgp_data)
+
+    def ensure_syslog(self, edge_id, ip_address, protocol):
+        """Ensure remote syslog configuration, it is only written if it
+        differs from the requested one. See
+        :meth:`nsxsdk.edge.Edge.configure_syslog` for parameters
+        description.
+
+        :return: changes, a list of (path, current value, desired value)
+            tuples, and response, the response to the write request or None
+            if nothing changed. See :meth:`_ensure_configuration` when the
+            configuration could not be read.
+        :rtype: dict
+
+        """
+        path = EDGE_PATH + edge_id + "/syslog/config"
+        syslog_data = _create_syslog_configuration(ip_address, protocol)
+        return self._ensure_configuration(path, syslog_data)
+
+    def ensure_ha(self, edge_id):
+        """Ensure NSX Edge HA mode is enabled, the configuration is only
+        written if HA is disabled.
+
+        :param str edge_id: Id of the edge to be reconfigured
+
+        :return: changes, a list of (path, current value, desired value)
+            tuples, and response, the response to the write request or None
+            if nothing changed. See :meth:`_ensure_configuration` when the
+            configuration could not be read.
+        :rtype: dict
+
+        """
+        path = EDGE_PATH + edge_id + "/highavailability/config"
+        ha_data = _create_ha_configuration()
+        return self._ensure_configuration(path, ha_data)
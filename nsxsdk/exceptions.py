@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Exceptions raised by the NSX SDK"""
+
+
+class NSXError(Exception):
+
+    """Base class of the errors raised by the SDK"""
+
+
+class TransportError(NSXError):
+
+    """NSX Manager could not be reached or the connection was lost
+
+    Attributes:
+        method: HTTP method of the failed request
+        path: API resource path of the failed request
+        cause: Underlying requests exception
+        attempts: Number of attempts made before giving up
+    """
+
+    def __init__(self, method, path, cause, attempts=1):
+        NSXError.__init__(self, "%s %s failed: %s" % (method, path, cause))
+        self.method = method
+        self.path = path
+        self.cause = cause
+        self.attempts = attempts
+
+
+class ConnectionFailed(TransportError):
+
+    """The connection to NSX Manager could not be established or was
+    closed before a response was received"""
+
+
+class RequestTimeout(TransportError):
+
+    """NSX Manager did not answer in time"""
+
+
+class DeploymentFailed(NSXError):
+
+    """An edge deployment failed
+
+    Attributes:
+        job: :class:`nsxsdk.jobs.DeploymentJob` of the deployment
+    """
+
+    def __init__(self, job, message):
+        NSXError.__init__(self, "Deployment of %s failed: %s" %
+                          (job.edge_name, message))
+        self.job = job
+
+
+class DeploymentTimeout(NSXError):
+
+    """Edge deployments did not complete in time"""
+
+
+class AuthenticationFailed(NSXError):
+
+    """NSX Manager refused to issue an authentication token
+
+    Attributes:
+        status_code: Status code of the token response
+    """
+
+    def __init__(self, status_code, message):
+        NSXError.__init__(self, "Authentication failed (%s): %s" %
+                          (status_code, message))
+        self.status_code = status_code
+
+
+class UnexpectedResponse(NSXError):
+
+    """NSX Manager answered with a response the SDK can not use
+
+    Attributes:
+        response: :class:`nsxsdk.utils.Response` received
+        status_code: Status code of the response
+    """
+
+    def __init__(self, response, message):
+        NSXError.__init__(self, "Unexpected response (%s): %s" %
+                          (response.status_code, message))
+        self.response = response
+        self.status_code = response.status_code
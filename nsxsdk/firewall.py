@@ -1,36 +1,232 @@
 #!/usr/bin/env python
 """Module VMware NSX Distributed Firewall"""
 
-import json
+import copy
+import time
+
+from . import models
+from .exceptions import UnexpectedResponse
+from .jsonstream import iter_response_items
+from .utils import Counters
+from .utils import backoff_delay
 
 DFW_PATH = "/api/4.0/firewall/"
+CONFLICT_ATTEMPTS = 10
+CONFLICT_BACKOFF = 0.1
+CONFLICT_BACKOFF_MAX = 5
+
+
+def _create_section_configuration(section_name):
+    """Create a layer3 firewall section configuration
+
+        :param str section_name: Name of the section
+
+        :return: Firewall section configuration
+
+    """
+    return models.FirewallSection(name=section_name, rules=[]).to_nsx()
+
+
+def _create_rule_configuration(source_ip, destination_ip, action):
+    """Create a layer3 firewall rule configuration
+
+        :param str source_ip: Source IP address
+        :param str destination_ip: Destination IP address
+        :param str action: Firewall rule's action ("allow", "deny" or "reject")
+
+        :return: Firewall rule configuration
+
+    """
+    rule = models.FirewallRule(
+        action=action, type="LAYER3",
+        sources=(("Ipv4Address", source_ip, None),), sources_excluded=False,
+        destinations=(("Ipv4Address", destination_ip, None),),
+        destinations_excluded=False, services=(),
+        applied_to=(("DISTRIBUTED_FIREWALL", "DISTRIBUTED_FIREWALL",
+                     "DISTRIBUTED_FIREWALL"),))
+    return rule.to_nsx()
 
 
 class FirewallSDK(object):
 
     """This class provides some functions to configure
     the distributed firewall
+
+    When ``cache_config`` is True, the last distributed firewall
+    configuration is kept in memory with its ETag and only downloaded
+    again when it changed on NSX Manager.
+
+    Writes to a section are guarded by its ETag. When another client
+    modified the section in between (412 Precondition Failed), the section
+    is read again and the pending change applied on top of it, up to
+    ``conflict_attempts`` times with a jittered exponential backoff starting
+    at ``conflict_backoff`` seconds.
     """
 
-    def __init__(self, http_client):
+    def __init__(self, http_client, cache_config=False,
+                 conflict_attempts=CONFLICT_ATTEMPTS,
+                 conflict_backoff=CONFLICT_BACKOFF):
         self.http_client = http_client
+        self.cache_config = cache_config
+        self.conflict_attempts = conflict_attempts
+        self.conflict_backoff = conflict_backoff
+        self.counters = Counters('conflicts', 'retries')
+        self._config_cache = None
+
+    def conflict_stats(self):
+        """Return the number of write conflicts met and of retries made
+
+        :return: conflicts and retries counters
+        :rtype: dict
+
+        """
+        return self.counters.snapshot()
+
+    def _write_section(self, section_id, write, section=None):
+        """Run an ETag guarded write on a section, reading the section again
+        and retrying the write on conflicts
+
+        :param int section_id: Id of the section
+        :param write: Callable receiving the response to the read of the
+            section, returning the response to the conditional write request
+        :param section: Response to a read of the section already made, the
+            section is read first when None
+
+        :return: response to the last write request, or to the read of the
+            section when it failed
+        :rtype: requests.Response
+
+        :raises UnexpectedResponse: if the section was read without an ETag
+
+        """
+        path = DFW_PATH + "globalroot-0/config/layer3sections/" + \
+            str(section_id)
+        attempt = 0
+        while True:
+            if section is None:
+                section = self.http_client.request("GET", path)
+            if section.status_code >= 300:
+                return section
+            if not section.etag:
+                raise UnexpectedResponse(section, "section read without ETag")
+            response = write(section)
+            if response.status_code != 412:
+                return response
+            self.counters.increment('conflicts')
+            attempt += 1
+            if attempt >= self.conflict_attempts:
+                return response
+            self.counters.increment('retries')
+            time.sleep(backoff_delay(attempt, self.conflict_backoff,
+                                     CONFLICT_BACKOFF_MAX))
+            section = None
+
+    def update_firewall_section(self, section_id, mutation):
+        """Modify a section with a read-modify-write cycle, the section is
+        read again and the mutation applied again on conflicts
+
+        :param int section_id: Id of the section
+        :param mutation: Callable modifying in place the section
+            configuration it receives
+
+        :return: response to the HTTP request
+        :rtype: requests.Response
+
+        """
+        path = DFW_PATH + "globalroot-0/config/layer3sections/" + \
+            str(section_id)
+
+        def write(section):
+            section_data = section.data
+            mutation(section_data)
+            return self.http_client.request("PUT", path, section_data,
+                                            {'If-Match': section.etag})
+
+        return self._write_section(section_id, write)
+
+    def get_firewall_config(self):
+        """Retrieve the distributed firewall configuration
+
+        With ``cache_config``, a copy of the cached configuration is
+        returned, so that changes made to it do not alter the cache.
+
+        :return: Distributed firewall configuration
+        :rtype: dict
+
+        """
+        jsondata = self._get_firewall_config()
+        if self.cache_config:
+            return copy.deepcopy(jsondata)
+        return jsondata
 
-    def get_firewall_section_id(self, section_name):
+    def _get_firewall_config(self):
+        """Retrieve the distributed firewall configuration, revalidating
+        the cached one when ``cache_config`` is True
+
+        :return: Distributed firewall configuration, shared with the cache
+            and not to be modified
+        :rtype: dict
+
+        """
+        path = DFW_PATH + "globalroot-0/config"
+        cached = self._config_cache
+        headers = None
+        if self.cache_config and cached is not None:
+            headers = {'If-None-Match': cached[0]}
+        response = self.http_client.request("GET", path, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            return cached[1]
+
+        jsondata = response.data
+        etag = response.headers.get('ETag')
+        if self.cache_config and etag:
+            self._config_cache = (etag, jsondata)
+        return jsondata
+
+    def get_firewall_section_id(self, section_name, stream=False):
         """Retrieve the ID of a firewall section from its name
 
         :param str section_name: The name of the firewall section to get.
+        :param bool stream: Parse the configuration incrementally and stop
+            reading it at the first matching section, instead of downloading
+            and decoding it as a whole. The configuration cache is bypassed.
 
         :return: Id of the firewall section
         :rtype: str
 
         """
-        path = DFW_PATH + "globalroot-0/config"
-        response = self.http_client.request("GET", path)
-        jsondata = json.loads(response.text)
+        if stream:
+            path = DFW_PATH + "globalroot-0/config"
+            response = self.http_client.request("GET", path, stream=True)
+            sections = iter_response_items(
+                response, ['layer3Sections', 'layer3Sections'])
+            for section in sections:
+                if section['name'] == section_name:
+                    sections.close()
+                    return section['id']
+            return None
+
+        jsondata = self._get_firewall_config()
         sections = jsondata['layer3Sections']['layer3Sections']
         for section in sections:
             if section['name'] == section_name:
                 return section['id']
+        return None
+
+    def get_firewall_sections(self):
+        """Retrieve the layer3 sections of the distributed firewall as
+        models. The configuration is parsed incrementally, one section at a
+        time, so that the whole JSON document is never held in memory.
+
+        :return: Firewall sections
+        :rtype: list of nsxsdk.models.FirewallSection
+
+        """
+        path = DFW_PATH + "globalroot-0/config"
+        response = self.http_client.request("GET", path, stream=True)
+        return [models.FirewallSection.from_nsx(section)
+                for section in iter_response_items(
+                    response, ['layer3Sections', 'layer3Sections'])]
 
     def add_firewall_section(self, section_name):
         """Retrieve the ID of a firewall section from its name
@@ -42,11 +238,8 @@ class FirewallSDK(object):
 
         """
         path = DFW_PATH + "globalroot-0/config/layer3sections"
-        section_data = {}
-        section_data['name'] = section_name
-        section_data['rules'] = []
-        data = json.dumps(section_data)
-        response = self.http_client.request("POST", path, data)
+        section_data = _create_section_configuration(section_name)
+        response = self.http_client.request("POST", path, section_data)
         return response
 
     def delete_firewall_section(self, section_id):
@@ -76,45 +269,42 @@ class FirewallSDK(object):
         :rtype: requests.Response
 
         """
-        path = DFW_PATH + "globalroot-0/config/layer3sections/" + \
-            str(section_id)
-        response = self.http_client.request("GET", path)
-        headers = {'If-Match': response.headers['ETag']}
-
         path = DFW_PATH + "globalroot-0/config/layer3sections/" + \
             str(section_id) + "/rules"
-        rule_data = {}
-        rule_data['action'] = action
-        rule_data['appliedToList'] = {}
-        rule_data['appliedToList']['appliedToList'] = []
-        rule_data['sources'] = {}
-        rule_data['sources']['sourceList'] = []
-        rule_data['sources']['excluded'] = "false"
-        rule_data['destinations'] = {}
-        rule_data['destinations']['excluded'] = "false"
-        rule_data['destinations']['destinationList'] = []
-        rule_data['services'] = {}
-        rule_data['services']['serviceList'] = []
-        rule_data['type'] = "LAYER3"
-
-        appliedto_data = {}
-        appliedto_data['name'] = "DISTRIBUTED_FIREWALL"
-        appliedto_data['value'] = "DISTRIBUTED_FIREWALL"
-        appliedto_data['type'] = "DISTRIBUTED_FIREWALL"
-        rule_data['appliedToList']['appliedToList'].append(appliedto_data)
-
-        source_data = {}
-        source_data['value'] = source_ip
-        source_data['type'] = "Ipv4Address"
-        source_data['isValid'] = "true"
-        rule_data['sources']['sourceList'].append(source_data)
-
-        destination_data = {}
-        destination_data['value'] = destination_ip
-        destination_data['type'] = "Ipv4Address"
-        destination_data['isValid'] = "true"
-        rule_data['destinations']['destinationList'].append(destination_data)
-
-        data = json.dumps(rule_data)
-        response = self.http_client.request("POST", path, data, headers)
-        return response
+        rule_data = _create_rule_configuration(source_ip, destination_ip,
+                                               action)
+        # Serialized once for all the attempts
+        data = self.http_client.codec.dumps(rule_data)
+
+        def write(section):
+            headers = {'If-Match': section.etag}
+            return self.http_client.request("POST", path, data, headers)
+
+        return self._write_section(section_id, write)
+
+    def add_firewall_rules(self, section_id, rules, replace=False):
+        """Add many firewall rules in an existing section with a single
+        conditional PUT of the whole section, instead of one GET and one
+        POST per rule. The rules endpoint only accepts one rule per
+        request, so the rules are not split in several requests: each one
+        would have to send the whole section again.
+
+        :param int section_id: Id of the section
+        :param list rules: Rules description, each one is a dict with
+            source_ip, destination_ip and action keys (see
+            :meth:`add_firewall_rule`).
+        :param bool replace: Replace the rules of the section instead of
+            appending new ones, defaults to False.
+
+        :return: response to the HTTP request
+        :rtype: requests.Response
+
+        """
+        rules_data = [_create_rule_configuration(**rule) for rule in rules]
+
+        def mutation(section_data):
+            if replace:
+                section_data['rules'] = []
+            section_data['rules'].extend(rules_data)
+
+        return self.update_firewall_section(section_id, mutation)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""Module running NSX Edge operations across many edges"""
+
+import time
+
+from .utils import map_concurrently
+
+FLEET_CONCURRENCY = 10
+
+
+class EdgeResult(object):
+
+    """Outcome of an operation on one edge
+
+    Attributes:
+        edge: Id or name of the edge, as given to :meth:`Fleet.run`
+        edge_id: Id of the edge, None if its name could not be resolved
+        result: Value returned by the operation
+        exception: Exception raised by the operation, None on success
+        elapsed: Duration of the operation in seconds
+    """
+
+    def __init__(self, edge, edge_id=None, result=None, exception=None,
+                 elapsed=0):
+        self.edge = edge
+        self.edge_id = edge_id
+        self.result = result
+        self.exception = exception
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self):
+        """True if the operation raised no exception and its HTTP response,
+        if any, is not an error"""
+        if self.exception is not None:
+            return False
+        status_code = getattr(self.result, 'status_code', None)
+        return status_code is None or status_code < 400
+
+
+class FleetResult(object):
+
+    """Outcome of an operation run across many edges
+
+    Attributes:
+        results: :class:`EdgeResult` of each edge, in the input order
+        elapsed: Duration of the whole run in seconds
+    """
+
+    def __init__(self, results, elapsed):
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self):
+        """Results of the edges on which the operation succeeded"""
+        return [result for result in self.results if result.succeeded]
+
+    @property
+    def failed(self):
+        """Results of the edges on which the operation failed"""
+        return [result for result in self.results if not result.succeeded]
+
+    def stats(self):
+        """Return overall statistics of the run
+
+        :return: total, succeeded and failed number of edges, elapsed time
+            in seconds and throughput in edges per second
+        :rtype: dict
+
+        """
+        succeeded = len(self.succeeded)
+        throughput = 0
+        if self.elapsed > 0:
+            throughput = len(self.results) / float(self.elapsed)
+        return {'total': len(self.results),
+                'succeeded': succeeded,
+                'failed': len(self.results) - succeeded,
+                'elapsed': self.elapsed,
+                'throughput': throughput}
+
+
+class Fleet(object):
+
+    """This class runs the same Edge operation on many edges from a pool of
+    worker threads, see :func:`nsxsdk.utils.map_concurrently`. Exceptions
+    raised by the operation are caught and recorded in the result of their
+    edge, so a failure on an edge does not cancel the others.
+    """
+
+    def __init__(self, edge, concurrency=FLEET_CONCURRENCY):
+        """
+        :param edge: :class:`nsxsdk.edge.Edge` (or subclass) used to run
+            the operations
+        :param int concurrency: Maximum number of operations in flight
+
+        """
+        self.edge = edge
+        self.concurrency = concurrency
+
+    def _resolve_names(self, names):
+        """Resolve edge names to their ids, with a single listing of the
+        edges when the edge index is not enabled
+
+        :param list names: Names of the edges
+
+        :return: Ids of the edges indexed by their names, edges which do
+            not exist are missing
+        :rtype: dict
+
+        """
+        if self.edge.edge_index is not None:
+            return dict((name, self.edge.edge_index.get(name))
+                        for name in names)
+        missing = set(names)
+        edge_ids = {}
+        edges = self.edge.iter_edges()
+        for edge in edges:
+            if edge['name'] in missing:
+                missing.discard(edge['name'])
+                edge_ids[edge['name']] = edge['objectId']
+                if not missing:
+                    edges.close()
+                    break
+        return edge_ids
+
+    def run(self, edges, operation, *args, **kwargs):
+        """Run an operation on many edges
+
+        Extra arguments are passed to the operation after the edge id, for
+        example::
+
+            fleet.run(edge_ids, 'configure_syslog', '10.0.0.1', 'udp')
+
+        :param list edges: Ids of the edges, or their names if by_name is
+            True
+        :param operation: Name of an Edge method, or a callable, receiving
+            the edge id as first argument
+        :param bool by_name: Keyword only, edges are given by name and
+            resolved once before the operations are started, through the
+            edge index if it is enabled or a single listing of the edges
+            otherwise, defaults to False.
+        :param progress: Keyword only, callable receiving the number of
+            edges done, the total number of edges and the
+            :class:`EdgeResult` of the last one, called from the thread
+            running :meth:`run`.
+
+        :return: results of the operation on each edge
+        :rtype: FleetResult
+
+        """
+        by_name = kwargs.pop('by_name', False)
+        progress = kwargs.pop('progress', None)
+        if not callable(operation):
+            operation = getattr(self.edge, operation)
+        start = time.time()
+        edge_ids = self._resolve_names(edges) if by_name else None
+
+        def run_one(edge):
+            result = EdgeResult(edge)
+            begin = time.time()
+            try:
+                if by_name:
+                    result.edge_id = edge_ids.get(edge)
+                    if result.edge_id is None:
+                        raise LookupError("Edge %s not found" % edge)
+                else:
+                    result.edge_id = edge
+                result.result = operation(result.edge_id, *args, **kwargs)
+            except Exception as exception:
+                result.exception = exception
+            result.elapsed = time.time() - begin
+            return result
+
+        results = map_concurrently(run_one, edges, self.concurrency,
+                                   progress)
+        return FleetResult(results, time.time() - start)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+"""Module tracking NSX Edge deployments"""
+
+import logging
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from .exceptions import DeploymentFailed
+from .exceptions import DeploymentTimeout
+
+LOG = logging.getLogger(__name__)
+
+POLL_INTERVAL = 2
+POLL_INTERVAL_MAX = 30
+POLL_BACKOFF = 1.5
+DEPLOY_TIMEOUT = 1800
+JOB_STATUSES_COMPLETED = ('COMPLETED',)
+JOB_STATUSES_FAILED = ('FAILED', 'ROLLBACK', 'TIMEOUT', 'CANCELED')
+EDGE_STATUSES_READY = ('GREEN', 'YELLOW')
+
+
+class DeploymentJob(object):
+
+    """Handle on an edge deployment returned by ``create_edge``
+
+    The response to the creation request can still be used through the
+    handle, e.g. ``job.status_code`` or ``job.headers``.
+
+    Attributes:
+        edge_name: Name of the deployed edge
+        response: Response to the creation request
+        edge_id: Id of the deployed edge, once known
+        job_id: Id of the NSX Manager job, when the deployment is
+            asynchronous on NSX Manager side
+        status_path: API resource path polled to follow the deployment
+        status: Last edge or job status read
+        exception: :class:`DeploymentFailed` if the deployment failed,
+            :class:`DeploymentTimeout` if it was given up on
+    """
+
+    def __init__(self, edge_name, response, edge_id=None, job_id=None,
+                 status_path=None):
+        self.edge_name = edge_name
+        self.response = response
+        self.edge_id = edge_id
+        self.job_id = job_id
+        self.status_path = status_path
+        self.status = None
+        self.exception = None
+        self.interval = POLL_INTERVAL
+        self.next_poll = 0
+        self.deadline = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def __getattr__(self, name):
+        if name == 'response':
+            raise AttributeError(name)
+        return getattr(self.response, name)
+
+    def done(self):
+        """Tell if the deployment is over, successful or not
+
+        :rtype: bool
+
+        """
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """Wait for the deployment to be over
+
+        :param float timeout: Maximum time to wait in seconds, None to wait
+            forever
+
+        :return: True if the deployment is over
+        :rtype: bool
+
+        """
+        self._event.wait(timeout)
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """Wait for the deployment to be over and return the edge id
+
+        :param float timeout: Maximum time to wait in seconds, None to wait
+            forever
+
+        :return: Id of the deployed edge
+        :rtype: str
+
+        :raises DeploymentFailed: if the deployment failed
+        :raises DeploymentTimeout: if the deployment is still running, or
+            was given up on by the poller
+
+        """
+        if not self.wait(timeout):
+            raise DeploymentTimeout("Deployment of %s still running" %
+                                    self.edge_name)
+        if self.exception is not None:
+            raise self.exception
+        return self.edge_id
+
+    def add_done_callback(self, callback):
+        """Call a function with the job once the deployment is over, right
+        away if it already is
+
+        :param callback: Callable receiving the job
+
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def finish(self, message=None, exception=None):
+        """Mark the deployment as over
+
+        :param str message: Failure reason, None if the deployment
+            succeeded
+        :param NSXError exception: Error raised by :meth:`result`, defaults
+            to a :class:`DeploymentFailed` with the failure reason
+
+        """
+        if exception is None and message is not None:
+            exception = DeploymentFailed(self, message)
+        self.exception = exception
+        with self._lock:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+class DeploymentPoller(object):
+
+    """Follow many edge deployments from a single background thread
+
+    Each deployment is polled with its own interval, starting at
+    ``interval`` seconds and growing up to ``max_interval`` while its status
+    does not change. A deployment still pending ``timeout`` seconds after
+    it was added is given up on, it fails with :class:`DeploymentTimeout`.
+    The thread stops when no deployment is pending.
+    """
+
+    def __init__(self, http_client, interval=POLL_INTERVAL,
+                 max_interval=POLL_INTERVAL_MAX, timeout=DEPLOY_TIMEOUT):
+        self.http_client = http_client
+        self.interval = interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self._jobs = []
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def add(self, job):
+        """Start following a deployment
+
+        :param DeploymentJob job: Deployment to follow
+
+        """
+        with self._condition:
+            job.interval = self.interval
+            job.next_poll = time.time() + self.interval
+            if self.timeout is not None:
+                job.deadline = time.time() + self.timeout
+            self._jobs.append(job)
+            self._condition.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    self._jobs = [job for job in self._jobs
+                                  if not job.done()]
+                    if not self._jobs:
+                        self._thread = None
+                        return
+                    now = time.time()
+                    expired = [job for job in self._jobs
+                               if job.deadline is not None and
+                               job.deadline <= now]
+                    due = [job for job in self._jobs
+                           if job.next_poll <= now and job not in expired]
+                    if not due and not expired:
+                        self._condition.wait(
+                            min(_wake_time(job) for job in self._jobs) - now)
+                        continue
+                for job in expired:
+                    try:
+                        job.finish(exception=DeploymentTimeout(
+                            "Deployment of %s did not complete in %ss" %
+                            (job.edge_name, self.timeout)))
+                    except Exception:
+                        LOG.exception("Giving up on deployment of %s failed",
+                                      job.edge_name)
+                for job in due:
+                    try:
+                        self._poll(job)
+                    except Exception:
+                        LOG.exception("Polling deployment of %s failed",
+                                      job.edge_name)
+                        job.next_poll = time.time() + job.interval
+        finally:
+            with self._condition:
+                # Stopped by an unexpected error, the next add() starts a
+                # new thread
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _poll(self, job):
+        """Read the status of a deployment once and schedule the next poll.
+        A failed request or a status response which can not be read counts
+        as a poll returning the previous status.
+
+        :param DeploymentJob job: Deployment to poll
+
+        """
+        try:
+            response = self.http_client.request("GET", job.status_path)
+            status = job.status
+            if response.status_code < 400:
+                data = response.data
+                if job.job_id is not None:
+                    status = data.get('status')
+                    for item in data.get('result') or []:
+                        if item.get('key') == 'edgeId':
+                            job.edge_id = item.get('value')
+                else:
+                    status = data.get('edgeStatus')
+        except Exception as exception:
+            LOG.warning("Polling deployment of %s failed: %s",
+                        job.edge_name, exception)
+            status = job.status
+        else:
+            if job.job_id is not None:
+                if status in JOB_STATUSES_COMPLETED:
+                    job.status = status
+                    job.finish()
+                    return
+                if status in JOB_STATUSES_FAILED:
+                    job.status = status
+                    job.finish(status)
+                    return
+            elif status in EDGE_STATUSES_READY:
+                job.status = status
+                job.finish()
+                return
+
+        if status == job.status:
+            job.interval = min(self.max_interval,
+                               job.interval * POLL_BACKOFF)
+        else:
+            job.interval = self.interval
+        job.status = status
+        job.next_poll = time.time() + job.interval
+
+
+def _wake_time(job):
+    """Time of the next poll of a deployment, or of its deadline if
+    earlier"""
+    if job.deadline is None:
+        return job.next_poll
+    return min(job.next_poll, job.deadline)
+
+
+def as_completed(jobs, timeout=None):
+    """Iterate over deployments as they complete
+
+    :param list jobs: :class:`DeploymentJob` to wait for
+    :param float timeout: Maximum time to wait in seconds for all of them,
+        None to wait forever
+
+    :return: Deployments, in completion order
+    :rtype: generator of DeploymentJob
+
+    :raises DeploymentTimeout: if some deployments did not complete in time
+
+    """
+    finished = queue.Queue()
+    for job in jobs:
+        job.add_done_callback(finished.put)
+    deadline = None
+    if timeout is not None:
+        deadline = time.time() + timeout
+    for _ in range(len(jobs)):
+        remaining = None
+        if deadline is not None:
+            remaining = max(0, deadline - time.time())
+        try:
+            yield finished.get(timeout=remaining)
+        except queue.Empty:
+            raise DeploymentTimeout("Deployments still running")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+"""Incremental JSON parsing of large NSX Manager responses
+
+Only the items of the array reached through a path of object keys are
+kept, they are decoded one at a time while everything else is skipped
+piece by piece. Memory is bounded by the size of the largest item instead
+of the size of the whole document, and the caller can stop reading as soon
+as it found what it was looking for.
+"""
+
+import codecs
+import json
+import re
+
+STREAM_CHUNK_SIZE = 64 * 1024
+SKIP_DEPTH = 3
+
+_WHITESPACE = re.compile(r'\s*')
+_DECODER = json.JSONDecoder()
+_NUMBER_CHARS = '0123456789+-.eE'
+
+
+class _JSONStream(object):
+
+    """Buffer over an iterable of JSON text or UTF-8 bytes chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = u''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Append the next chunk to the buffer, dropping consumed text
+
+        :return: False at the end of the stream
+        :rtype: bool
+
+        """
+        if self.eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.eof = True
+            chunk = self._decoder.decode(b'', True)
+        else:
+            if isinstance(chunk, bytes):
+                chunk = self._decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char):
+        """Consume the next non-whitespace character
+
+        :param str char: Expected character
+
+        :raises ValueError: if the next character is not the expected one
+
+        """
+        if self.peek() != char:
+            raise ValueError("Expecting %r in JSON stream" % char)
+        self.pos += 1
+
+    def decode(self):
+        """Decode the next JSON value
+
+        :return: Decoded value
+
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                # Read at least as much as already buffered before trying
+                # again, so decoding a large value stays linear.
+                target = 2 * (len(self.buffer) - self.pos)
+                if not self.fill():
+                    raise
+                while len(self.buffer) < target and self.fill():
+                    pass
+                continue
+            # A number or a literal may continue in the next chunk
+            if (end == len(self.buffer) or
+                    self.buffer[end] in _NUMBER_CHARS) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def skip(self, depth=SKIP_DEPTH):
+        """Skip the next JSON value. Containers are walked down to ``depth``
+        levels, deeper values are decoded and dropped one at a time.
+
+        :param int depth: Number of container levels to walk
+
+        """
+        char = self.peek()
+        if depth == 0 or char not in '{[':
+            self.decode()
+            return
+        closing = '}' if char == '{' else ']'
+        self.pos += 1
+        if self.peek() == closing:
+            self.pos += 1
+            return
+        while True:
+            if char == '{':
+                self.decode()
+                self.expect(':')
+            self.skip(depth - 1)
+            if self.peek() == closing:
+                self.pos += 1
+                return
+            self.expect(',')
+
+
+def iter_json_items(chunks, path, siblings=None):
+    """Iterate over the items of an array nested in a JSON document
+
+    :param chunks: Iterable of JSON text or UTF-8 bytes chunks
+    :param list path: Keys of the objects leading to the array, e.g.
+        ``['layer3Sections', 'layer3Sections']``
+    :param dict siblings: Keys of the object holding the array whose values
+        are decoded into this dict, e.g. ``{'pagingInfo': None}``. The rest
+        of the object is read once the array is exhausted, so that the keys
+        following the array are decoded as well.
+
+    :return: Decoded items of the array, nothing if the path does not exist
+    :rtype: generator
+
+    :raises ValueError: if the document is not valid JSON
+
+    """
+    stream = _JSONStream(chunks)
+    last = len(path) - 1
+    for level, key in enumerate(path):
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            name = stream.decode()
+            stream.expect(':')
+            if name == key:
+                break
+            _skip_member(stream, name, siblings if level == last else None)
+            if stream.peek() == '}':
+                return
+            stream.expect(',')
+
+    if stream.peek() != '[':
+        stream.skip()
+    else:
+        stream.expect('[')
+        if stream.peek() != ']':
+            while True:
+                yield stream.decode()
+                if stream.peek() == ']':
+                    break
+                stream.expect(',')
+        stream.expect(']')
+    if siblings is None:
+        return
+    while stream.peek() == ',':
+        stream.expect(',')
+        name = stream.decode()
+        stream.expect(':')
+        _skip_member(stream, name, siblings)
+    stream.expect('}')
+
+
+def _skip_member(stream, name, siblings):
+    """Skip the value of an object member, or decode it into siblings when
+    its name is one of their keys"""
+    if siblings is not None and name in siblings:
+        siblings[name] = stream.decode()
+    else:
+        stream.skip()
+
+
+def iter_response_items(response, path, siblings=None):
+    """Iterate over the items of an array nested in the body of a streamed
+    response, see :func:`iter_json_items`. The response is closed once the
+    iteration stops, releasing its connection.
+
+    :param requests.Response response: Response requested with stream=True
+    :param list path: Keys of the objects leading to the array
+    :param dict siblings: Keys of the object holding the array to decode
+
+    :return: Decoded items of the array
+    :rtype: generator
+
+    """
+    try:
+        for item in iter_json_items(
+                response.iter_content(STREAM_CHUNK_SIZE), path, siblings):
+            yield item
+    finally:
+        response.close()
@@ -1,36 +1,140 @@
 #!/usr/bin/env python
 """Module VMware NSX Logical Switches"""
 
-import json
+from . import models
+from .jsonstream import iter_response_items
+from .utils import NameIndex
+from .utils import iter_pages
+from .utils import map_concurrently
 
 LS_PATH = "/api/2.0/vdn/"
+LS_CONCURRENCY = 10
+LS_PAGE_SIZE = 256
+
+
+def _create_logical_switch_configuration(ls_name, cplane_mode, tenant_id):
+    """Create a logical switch configuration
+
+        :param str ls_name: Logical switch name
+        :param str cplane_mode: Control plane mode, defaults to the
+            transport zone one when None.
+        :param str tenant_id: Tenant Id
+
+        :return: Logical switch configuration
+
+    """
+    ls = models.VirtualWire(name=ls_name, tenant_id=tenant_id,
+                            control_plane_mode=cplane_mode or None)
+    return ls.to_nsx()
+
+
+class LogicalSwitchResult(object):
+
+    """Outcome of the creation of one logical switch
+
+    Attributes:
+        name: Name of the logical switch
+        ls_id: Id of the new logical switch, None if it was not created
+        response: Response to the creation request, None if it was not sent
+        exception: Exception raised by the creation, None on success
+    """
+
+    def __init__(self, name, ls_id=None, response=None, exception=None):
+        self.name = name
+        self.ls_id = ls_id
+        self.response = response
+        self.exception = exception
+
+    @property
+    def succeeded(self):
+        """True if the logical switch was created"""
+        return self.ls_id is not None
 
 
 class LogicalSwitchesSDK(object):
 
     """This class provides some functions to configure
     logical switches
+
+    When ``cache_ttl`` is set, :meth:`get_transport_zone_id` and
+    :meth:`get_logical_switch_id` are served from in-memory name to id
+    indexes reloaded every ``cache_ttl`` seconds. The logical switch index
+    is kept up to date by :meth:`create_logical_switch` and
+    :meth:`delete_logical_switch`.
     """
 
-    def __init__(self, http_client):
+    def __init__(self, http_client, cache_ttl=None):
         self.http_client = http_client
+        self.scope_index = None
+        self.ls_index = None
+        if cache_ttl is not None:
+            self.scope_index = NameIndex(self._load_scope_index, cache_ttl)
+            self.ls_index = NameIndex(self._load_ls_index, cache_ttl)
+
+    def _load_scope_index(self):
+        """Build the transport zone name to id index
+
+        :return: Id of the transport zones indexed by their names
+        :rtype: dict
+
+        """
+        response = self.http_client.request("GET", LS_PATH + "scopes")
+        jsondata = response.data
+        return dict((scope['name'], scope['id'])
+                    for scope in jsondata['allScopes'])
+
+    def _load_ls_index(self):
+        """Build the logical switch index
+
+        :return: Id of the logical switches indexed by their name and
+            tenant id
+        :rtype: dict
+
+        """
+        return dict(((ls['name'], ls.get('tenantId')), ls['objectId'])
+                    for ls in self.iter_logical_switches())
+
+    def refresh_scope_index(self):
+        """Reload the transport zone name to id index from NSX Manager"""
+        if self.scope_index is not None:
+            self.scope_index.refresh()
 
-    def get_transport_zone_id(self, tz_name):
+    def refresh_ls_index(self):
+        """Reload the logical switch index from NSX Manager"""
+        if self.ls_index is not None:
+            self.ls_index.refresh()
+
+    def get_transport_zone_id(self, tz_name, stream=False):
         """Retrieve Id of a transport zone from its name
 
         :param str tz_name: The name of the transport zone.
+        :param bool stream: Parse the response incrementally and stop
+            reading it at the first matching transport zone, ignored when
+            the transport zone index is enabled.
 
         :return: Id of the transport zone
         :rtype: str
 
         """
+        if self.scope_index is not None:
+            return self.scope_index.get(tz_name)
         path = LS_PATH + "scopes"
+        if stream:
+            response = self.http_client.request("GET", path, stream=True)
+            scopes = iter_response_items(response, ['allScopes'])
+            for scope in scopes:
+                if scope['name'] == tz_name:
+                    scopes.close()
+                    return scope['id']
+            return None
+
         response = self.http_client.request("GET", path)
-        jsondata = json.loads(response.text)
+        jsondata = response.data
         scopes = jsondata['allScopes']
         for scope in scopes:
             if scope['name'] == tz_name:
                 return scope['id']
+        return None
 
     def create_logical_switch(self, tz_id, ls_name, cplane_mode=None,
                               tenant_id="default"):
@@ -44,15 +148,51 @@ class LogicalSwitchesSDK(object):
 
         """
         path = LS_PATH + "scopes/" + tz_id + "/virtualwires"
-        ls_data = {}
-        ls_data['name'] = ls_name
-        ls_data['tenantId'] = tenant_id
-        if cplane_mode:
-            ls_data['controlPlaneMode'] = cplane_mode
-        data = json.dumps(ls_data)
-        response = self.http_client.request("POST", path, data)
+        ls_data = _create_logical_switch_configuration(ls_name, cplane_mode,
+                                                       tenant_id)
+        response = self.http_client.request("POST", path, ls_data)
+        if self.ls_index is not None:
+            if response.status_code == 201 and response.text.strip():
+                self.ls_index.set((ls_name, tenant_id),
+                                  response.text.strip())
+            else:
+                self.ls_index.invalidate()
         return response
 
+    def create_logical_switches(self, tz_id, names, cplane_mode=None,
+                                tenant_id="default",
+                                concurrency=LS_CONCURRENCY):
+        """Create many logical switches in the specified transport zone,
+        with up to ``concurrency`` creation requests in flight, see
+        :func:`nsxsdk.utils.map_concurrently`. Exceptions raised by a
+        creation are caught and recorded in the result of its logical
+        switch, so a failure does not cancel the other creations.
+
+        :param str tz_id: Id of the transport zone
+        :param list names: Logical switch names
+        :param str cplane_mode: Control plane mode, defaults to the
+            transport zone one.
+        :param str tenant_id: Tenant Id
+        :param int concurrency: Maximum number of requests in flight
+
+        :return: results of the creations, in the order of names
+        :rtype: list of LogicalSwitchResult
+
+        """
+        def create(name):
+            result = LogicalSwitchResult(name)
+            try:
+                result.response = self.create_logical_switch(
+                    tz_id, name, cplane_mode, tenant_id)
+            except Exception as exception:
+                result.exception = exception
+            else:
+                if result.response.status_code < 300:
+                    result.ls_id = result.response.text.strip()
+            return result
+
+        return map_concurrently(create, names, concurrency)
+
     def delete_logical_switch(self, ls_id):
         """Delete a logical switch
 
@@ -64,4 +204,57 @@ class LogicalSwitchesSDK(object):
         """
         path = LS_PATH + "virtualwires/" + ls_id
         response = self.http_client.request("DELETE", path)
+        if self.ls_index is not None and response.status_code < 300:
+            self.ls_index.discard_id(ls_id)
         return response
+
+    def get_logical_switch_id(self, ls_name, tenant_id="default"):
+        """Retrieve the Id of a logical switch from its name and tenant
+
+        Lookups are served from the logical switch index when it is
+        enabled, otherwise all the logical switches are listed until the
+        matching one is found.
+
+        :param str ls_name: Logical switch name
+        :param str tenant_id: Tenant Id
+
+        :return: Id of the logical switch, None if it does not exist
+        :rtype: str
+
+        """
+        if self.ls_index is not None:
+            return self.ls_index.get((ls_name, tenant_id))
+        switches = self.iter_logical_switches()
+        for ls in switches:
+            if ls['name'] == ls_name and ls.get('tenantId') == tenant_id:
+                switches.close()
+                return ls['objectId']
+        return None
+
+    def iter_logical_switches(self, tz_id=None, page_size=LS_PAGE_SIZE,
+                              prefetch=False, stream=False):
+        """Iterate lazily over logical switches, one page at a time, see
+        :func:`nsxsdk.utils.iter_pages`
+
+        :param str tz_id: Id of the transport zone to list the logical
+            switches of, None for all of them
+        :param int page_size: Number of logical switches requested per page
+        :param bool prefetch: Fetch the next page in a background thread
+            while the current one is being consumed, defaults to False.
+        :param bool stream: Parse each page incrementally while it is being
+            downloaded, prefetch is ignored in this mode.
+
+        :return: Logical switches, as returned by NSX Manager
+        :rtype: generator of dict
+
+        """
+        path = LS_PATH + "virtualwires"
+        if tz_id is not None:
+            path = LS_PATH + "scopes/" + tz_id + "/virtualwires"
+
+        def page_path(start_index, size):
+            return path + "?startindex=" + str(start_index) + \
+                "&pagesize=" + str(size)
+
+        return iter_pages(self.http_client, page_path, ['dataPage', 'data'],
+                          page_size, prefetch, stream)
@@ -0,0 +1,473 @@
+#!/usr/bin/env python
+"""Compact model objects of the NSX configuration
+
+The models only keep the attributes listed in their ``__slots__``, which
+makes them much lighter than the nested dicts returned by NSX Manager when
+large inventories are kept in memory. They are converted from and to the
+NSX JSON shape with ``from_nsx`` and ``to_nsx``; keys which are not modelled
+are dropped by ``from_nsx``, except for firewall rules which keep them to
+write them back.
+
+Object references (rule sources, destinations, services and applied to
+list) are kept as ``(type, value, name)`` tuples, with interned types.
+"""
+
+import sys
+
+try:
+    _intern = sys.intern
+except AttributeError:
+    _intern = intern  # noqa: F821 pylint: disable=undefined-variable
+
+
+def _intern_str(value):
+    """Intern a str value, other values are returned unchanged"""
+    if isinstance(value, str):
+        return _intern(value)
+    return value
+
+
+def _nsx_bool(value):
+    """Convert a boolean to the string NSX Manager expects"""
+    return "true" if value else "false"
+
+
+def _parse_bool(value):
+    """Convert a boolean sent by NSX Manager, as a boolean or a string"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() == "true"
+
+
+def _pack_references(entries):
+    """Convert a list of NSX object references to (type, value, name)
+    tuples, references which are not plain (type, value) pairs are kept
+    as dicts"""
+    references = []
+    for entry in entries or []:
+        if 'value' in entry and 'type' in entry:
+            references.append((_intern_str(entry['type']), entry['value'],
+                               entry.get('name')))
+        else:
+            references.append(entry)
+    return tuple(references)
+
+
+def _unpack_references(references, valid=False):
+    """Convert (type, value, name) tuples back to NSX object references
+
+        :param tuple references: References to convert
+        :param bool valid: Flag the references as valid, as expected in
+            rule sources and destinations
+
+    """
+    entries = []
+    for reference in references or ():
+        if isinstance(reference, dict):
+            entries.append(dict(reference))
+            continue
+        entry_type, value, name = reference
+        entry = {'type': entry_type, 'value': value}
+        if name is not None:
+            entry['name'] = name
+        if valid:
+            entry['isValid'] = "true"
+        entries.append(entry)
+    return entries
+
+
+class Model(object):
+
+    """Base class of the models: attributes are the ``__slots__`` of the
+    class, given as keyword arguments and None by default"""
+
+    __slots__ = ()
+
+    def __init__(self, **kwargs):
+        for slot in self.__slots__:
+            setattr(self, slot, kwargs.pop(slot, None))
+        if kwargs:
+            raise TypeError("Unexpected attributes: %s" %
+                            ", ".join(sorted(kwargs)))
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot)
+                   for slot in self.__slots__)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, ", ".join(
+            "%s=%r" % (slot, getattr(self, slot))
+            for slot in self.__slots__
+            if getattr(self, slot) is not None))
+
+
+# The attributes of the models are their __slots__, set by Model.__init__,
+# which pylint cannot infer
+# pylint: disable=no-member
+
+
+class Edge(Model):
+
+    """NSX Edge, from its summary in the edge listing or its details
+
+    Attributes:
+        id: Id of the edge
+        name: Name of the edge
+        type: distributedRouter or gatewayServices
+        status: Edge status, GREEN, YELLOW, RED or GREY
+        state: Deployment state
+        datacenter_id: Id of the datacenter of the edge
+        tenant: Tenant of the edge
+        appliance_size: Size of the edge appliances
+    """
+
+    __slots__ = ('id', 'name', 'type', 'status', 'state', 'datacenter_id',
+                 'tenant', 'appliance_size')
+
+    @classmethod
+    def from_nsx(cls, data):
+        """Create an edge from its NSX representation
+
+        :param dict data: Edge summary or details
+
+        :rtype: Edge
+
+        """
+        appliances = data.get('appliancesSummary') or \
+            data.get('appliances') or {}
+        return cls(id=data.get('objectId') or data.get('id'),
+                   name=data.get('name'),
+                   type=_intern_str(data.get('edgeType') or
+                                    data.get('type')),
+                   status=_intern_str(data.get('edgeStatus')),
+                   state=_intern_str(data.get('state')),
+                   datacenter_id=data.get('datacenterMoid'),
+                   tenant=data.get('tenant') or data.get('tenantId'),
+                   appliance_size=_intern_str(
+                       appliances.get('applianceSize')))
+
+    def to_nsx(self):
+        """Return the NSX representation of the edge
+
+        :rtype: dict
+
+        """
+        data = {}
+        for key, value in (('id', self.id), ('name', self.name),
+                           ('type', self.type),
+                           ('datacenterMoid', self.datacenter_id),
+                           ('tenant', self.tenant)):
+            if value is not None:
+                data[key] = value
+        if self.appliance_size is not None:
+            data['appliances'] = {'applianceSize': self.appliance_size}
+        return data
+
+
+class Interface(Model):
+
+    """Interface of a logical router, or vnic of a service gateway
+
+    Attributes:
+        index: Index of the interface on the edge
+        name: Name of the interface
+        type: internal or uplink
+        network_id: Id of the network the interface is connected to
+        mtu: MTU of the interface
+        is_connected: True if the interface is connected
+        address_groups: (primary address, netmask, secondary addresses)
+            tuples
+    """
+
+    __slots__ = ('index', 'name', 'type', 'network_id', 'mtu',
+                 'is_connected', 'address_groups')
+
+    @classmethod
+    def from_nsx(cls, data):
+        """Create an interface from its NSX representation
+
+        :param dict data: Interface or vnic configuration
+
+        :rtype: Interface
+
+        """
+        address_groups = []
+        groups = (data.get('addressGroups') or {}).get('addressGroups')
+        for group in groups or []:
+            secondary = (group.get('secondaryAddresses') or {}).get(
+                'ipAddress')
+            address_groups.append((
+                group.get('primaryAddress'),
+                group.get('netmask') or group.get('subnetMask'),
+                tuple(secondary) if secondary else None))
+        return cls(index=data.get('index'), name=data.get('name'),
+                   type=_intern_str(data.get('type')),
+                   network_id=data.get('connectedToId'),
+                   mtu=data.get('mtu'),
+                   is_connected=_parse_bool(data.get('isConnected')),
+                   address_groups=tuple(address_groups))
+
+    def to_nsx(self):
+        """Return the NSX representation of the interface
+
+        :rtype: dict
+
+        """
+        groups = []
+        for primary, netmask, secondary in self.address_groups or ():
+            group = {'primaryAddress': primary, 'netmask': netmask}
+            if secondary:
+                group['secondaryAddresses'] = {'ipAddress': list(secondary)}
+            groups.append(group)
+        data = {'addressGroups': {'addressGroups': groups},
+                'connectedToId': self.network_id,
+                'mtu': self.mtu,
+                'type': self.type}
+        if self.index is not None:
+            data['index'] = self.index
+        if self.name is not None:
+            data['name'] = self.name
+        if self.is_connected is not None:
+            data['isConnected'] = _nsx_bool(self.is_connected)
+        return data
+
+
+class BgpNeighbour(Model):
+
+    """BGP neighbour of an edge
+
+    Attributes:
+        ip_address: IP address of the neighbour
+        remote_as: AS number of the neighbour
+        weight: Weight of the routes learned from the neighbour
+        holddown_timer: Hold down timer of the session
+        keepalive_timer: Keep alive timer of the session
+    """
+
+    __slots__ = ('ip_address', 'remote_as', 'weight', 'holddown_timer',
+                 'keepalive_timer')
+
+    @classmethod
+    def from_nsx(cls, data):
+        """Create a BGP neighbour from its NSX representation
+
+        :param dict data: BGP neighbour configuration
+
+        :rtype: BgpNeighbour
+
+        """
+        return cls(ip_address=data.get('ipAddress'),
+                   remote_as=data.get('remoteAS'),
+                   weight=data.get('weight'),
+                   holddown_timer=data.get('holdDownTimer'),
+                   keepalive_timer=data.get('keepAliveTimer'))
+
+    def to_nsx(self):
+        """Return the NSX representation of the BGP neighbour
+
+        :rtype: dict
+
+        """
+        data = {'ipAddress': self.ip_address,
+                'remoteAS': str(self.remote_as)}
+        for key, value in (('weight', self.weight),
+                           ('holdDownTimer', self.holddown_timer),
+                           ('keepAliveTimer', self.keepalive_timer)):
+            if value is not None:
+                data[key] = str(value)
+        return data
+
+
+class FirewallRule(Model):
+
+    """Layer3 distributed firewall rule
+
+    Attributes:
+        id: Id of the rule
+        name: Name of the rule
+        action: allow, deny or reject
+        type: Rule type, LAYER3
+        disabled: True if the rule is disabled
+        logged: True if the rule is logged
+        sources: Source references
+        sources_excluded: True if the rule matches all but the sources
+        destinations: Destination references
+        destinations_excluded: True if the rule matches all but the
+            destinations
+        services: Service references
+        applied_to: Applied to references
+        extra: Keys of the NSX representation which are not modelled, such
+            as direction, packetType or notes, None if there are none
+    """
+
+    __slots__ = ('id', 'name', 'action', 'type', 'disabled', 'logged',
+                 'sources', 'sources_excluded', 'destinations',
+                 'destinations_excluded', 'services', 'applied_to', 'extra')
+
+    _MODELLED_KEYS = frozenset(('id', 'name', 'action', 'type', 'disabled',
+                                'logged', 'sources', 'destinations',
+                                'services', 'appliedToList'))
+
+    @classmethod
+    def from_nsx(cls, data):
+        """Create a rule from its NSX representation
+
+        :param dict data: Rule configuration
+
+        :rtype: FirewallRule
+
+        """
+        sources = data.get('sources') or {}
+        destinations = data.get('destinations') or {}
+        extra = dict((key, value) for key, value in data.items()
+                     if key not in cls._MODELLED_KEYS)
+        return cls(id=data.get('id'), name=data.get('name'),
+                   action=_intern_str(data.get('action')),
+                   type=_intern_str(data.get('type')),
+                   disabled=_parse_bool(data.get('disabled')),
+                   logged=_parse_bool(data.get('logged')),
+                   sources=_pack_references(sources.get('sourceList')),
+                   sources_excluded=_parse_bool(sources.get('excluded')),
+                   destinations=_pack_references(
+                       destinations.get('destinationList')),
+                   destinations_excluded=_parse_bool(
+                       destinations.get('excluded')),
+                   services=_pack_references(
+                       (data.get('services') or {}).get('serviceList')),
+                   applied_to=_pack_references(
+                       (data.get('appliedToList') or {}).get(
+                           'appliedToList')),
+                   extra=extra or None)
+
+    def to_nsx(self):
+        """Return the NSX representation of the rule
+
+        :rtype: dict
+
+        """
+        data = dict(self.extra or {})
+        data.update({
+            'action': self.action,
+            'appliedToList': {
+                'appliedToList': _unpack_references(self.applied_to)},
+            'sources': {
+                'sourceList': _unpack_references(self.sources, True),
+                'excluded': _nsx_bool(self.sources_excluded)},
+            'destinations': {
+                'destinationList': _unpack_references(self.destinations,
+                                                      True),
+                'excluded': _nsx_bool(self.destinations_excluded)},
+            'services': {'serviceList': _unpack_references(self.services)},
+            'type': self.type or "LAYER3",
+        })
+        for key, value in (('id', self.id), ('name', self.name)):
+            if value is not None:
+                data[key] = value
+        for key, value in (('disabled', self.disabled),
+                           ('logged', self.logged)):
+            if value is not None:
+                data[key] = _nsx_bool(value)
+        return data
+
+
+class FirewallSection(Model):
+
+    """Layer3 distributed firewall section
+
+    Attributes:
+        id: Id of the section
+        name: Name of the section
+        generation_number: Generation number of the section
+        rules: :class:`FirewallRule` of the section
+    """
+
+    __slots__ = ('id', 'name', 'generation_number', 'rules')
+
+    @classmethod
+    def from_nsx(cls, data):
+        """Create a section from its NSX representation
+
+        :param dict data: Section configuration
+
+        :rtype: FirewallSection
+
+        """
+        return cls(id=data.get('id'), name=data.get('name'),
+                   generation_number=data.get('generationNumber'),
+                   rules=[FirewallRule.from_nsx(rule)
+                          for rule in data.get('rules') or []])
+
+    def to_nsx(self):
+        """Return the NSX representation of the section
+
+        :rtype: dict
+
+        """
+        data = {'name': self.name,
+                'rules': [rule.to_nsx() for rule in self.rules or []]}
+        if self.id is not None:
+            data['id'] = self.id
+        if self.generation_number is not None:
+            data['generationNumber'] = self.generation_number
+        return data
+
+
+class VirtualWire(Model):
+
+    """Logical switch
+
+    Attributes:
+        id: Id of the logical switch
+        name: Name of the logical switch
+        tenant_id: Tenant of the logical switch
+        scope_id: Id of the transport zone of the logical switch
+        control_plane_mode: Control plane mode of the logical switch
+        description: Description of the logical switch
+    """
+
+    __slots__ = ('id', 'name', 'tenant_id', 'scope_id',
+                 'control_plane_mode', 'description')
+
+    @classmethod
+    def from_nsx(cls, data):
+        """Create a logical switch from its NSX representation
+
+        :param dict data: Virtualwire
+
+        :rtype: VirtualWire
+
+        """
+        return cls(id=data.get('objectId'), name=data.get('name'),
+                   tenant_id=data.get('tenantId'),
+                   scope_id=data.get('vdnScopeId'),
+                   control_plane_mode=_intern_str(
+                       data.get('controlPlaneMode')),
+                   description=data.get('description'))
+
+    def to_nsx(self):
+        """Return the NSX representation of the logical switch
+
+        :rtype: dict
+
+        """
+        data = {}
+        for key, value in (('objectId', self.id), ('name', self.name),
+                           ('description', self.description),
+                           ('tenantId', self.tenant_id),
+                           ('vdnScopeId', self.scope_id),
+                           ('controlPlaneMode', self.control_plane_mode)):
+            if value is not None:
+                data[key] = value
+        return data
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+"""Client side pacing of the requests sent to NSX Manager"""
+
+import threading
+import time
+
+# Status codes returned by NSX Manager when it throttles a client
+THROTTLE_STATUS_CODES = (429, 503)
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class TokenBucket(object):
+
+    """Thread-safe token bucket allowing ``rate`` requests per second on
+    average and bursts of up to ``burst`` requests
+
+    Attributes:
+        rate: Number of tokens added per second
+        burst: Maximum number of tokens stored
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, rate))
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.time()
+
+    def _refill(self):
+        now = time.time()
+        self._tokens = min(self.burst,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self):
+        """Take a token, waiting for one to be available"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, delay):
+        """Hand out no token for the next ``delay`` seconds
+
+        :param float delay: Pause duration in seconds
+
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -delay * self.rate)
+
+
+class AIMDLimiter(object):
+
+    """Thread-safe concurrency limit which is increased additively while
+    requests succeed and decreased multiplicatively on congestion
+
+    Attributes:
+        limit: Current number of requests allowed in flight
+        minimum: Lowest limit
+        maximum: Highest limit, None for no limit
+        backoff: Factor applied to the limit on congestion
+    """
+
+    def __init__(self, initial, minimum=1, maximum=None, backoff=0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self._in_flight = 0
+        self._last_decrease = 0
+        self._condition = threading.Condition()
+
+    @property
+    def in_flight(self):
+        """Number of requests in flight"""
+        return self._in_flight
+
+    def acquire(self):
+        """Wait for the number of requests in flight to be under the limit
+
+        :return: start time of the request, to give back to :meth:`release`
+        :rtype: float
+
+        """
+        with self._condition:
+            while self._in_flight >= max(int(self.limit), 1):
+                self._condition.wait()
+            self._in_flight += 1
+        return time.time()
+
+    def release(self, start, congested):
+        """Report the end of a request
+
+        :param float start: Value returned by :meth:`acquire`
+        :param bool congested: True if the request showed NSX Manager is
+            overloaded. The limit is only decreased once for all the
+            requests started before a previous decrease.
+
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if congested:
+                if start >= self._last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._last_decrease = time.time()
+            else:
+                self.limit += 1.0 / self.limit
+                if self.maximum is not None:
+                    self.limit = min(self.maximum, self.limit)
+            self._condition.notify_all()
+
+
+class RateController(object):
+
+    """Pacing of one class of requests: an optional token bucket limiting
+    the request rate and an optional AIMD concurrency limit backing off on
+    429/503 responses, transport errors and latency spikes.
+
+    Attributes:
+        bucket: :class:`TokenBucket`, None when the rate is not limited
+        limiter: :class:`AIMDLimiter`, None when the concurrency is not
+            limited
+        latency_threshold: Response time in seconds above which a request
+            is considered congested, None to ignore latency
+    """
+
+    def __init__(self, rate=None, burst=None, concurrency=None,
+                 min_concurrency=1, max_concurrency=None,
+                 latency_threshold=None):
+        """
+        :param float rate: Maximum number of requests per second
+        :param int burst: Number of requests which can be sent at once
+            above the rate, defaults to the rate.
+        :param int concurrency: Initial number of requests in flight
+        :param int min_concurrency: Lowest concurrency limit
+        :param int max_concurrency: Highest concurrency limit
+        :param float latency_threshold: Response time in seconds above which
+            the concurrency limit is decreased
+
+        """
+        self.bucket = None
+        if rate:
+            self.bucket = TokenBucket(rate, burst)
+        self.limiter = None
+        if concurrency:
+            self.limiter = AIMDLimiter(concurrency, min_concurrency,
+                                       max_concurrency)
+        self.latency_threshold = latency_threshold
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Wait until a request can be sent
+
+        :return: start time of the request, to give back to :meth:`release`
+        :rtype: float
+
+        """
+        if self.bucket is not None:
+            self.bucket.take()
+        if self.limiter is not None:
+            return self.limiter.acquire()
+        return time.time()
+
+    def release(self, start, status_code, retry_after=None):
+        """Report the end of a request
+
+        :param float start: Value returned by :meth:`acquire`
+        :param int status_code: Status code of the response, None on
+            transport errors
+        :param str retry_after: Retry-After header of the response
+
+        """
+        throttled = status_code is None or \
+            status_code in THROTTLE_STATUS_CODES
+        if throttled:
+            with self._lock:
+                self.throttled += 1
+            if retry_after and retry_after.isdigit() and \
+                    self.bucket is not None:
+                self.bucket.pause(int(retry_after))
+        if self.limiter is not None:
+            slow = self.latency_threshold is not None and \
+                time.time() - start > self.latency_threshold
+            self.limiter.release(start, throttled or slow)
+
+    def stats(self):
+        """Return the state of the controller
+
+        :return: concurrency limit, requests in flight and number of
+            throttled requests
+        :rtype: dict
+
+        """
+        stats = {'throttled': self.throttled}
+        if self.limiter is not None:
+            stats['concurrency_limit'] = self.limiter.limit
+            stats['in_flight'] = self.limiter.in_flight
+        return stats
+
+
+def method_class(method):
+    """Classify an HTTP method
+
+    :param str method: HTTP method
+
+    :return: read or write
+    :rtype: str
+
+    """
+    if method.upper() in READ_METHODS:
+        return 'read'
+    return 'write'
@@ -0,0 +1,698 @@
+#!/usr/bin/env python
+"""Local stand-in for NSX Manager
+
+:class:`FakeNSXManager` serves the subset of the NSX Manager REST API used by
+the SDK over plain HTTP on localhost, from an in-memory inventory. It is
+meant to exercise the SDK without a real NSX Manager and to measure its
+performance reproducibly::
+
+    with FakeNSXManager(edges=1000, latency=0.005) as manager:
+        sdk = Edge(manager.client())
+        sdk.get_edge_id('esg-999')
+        print(manager.stats())
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+
+try:
+    from http.server import BaseHTTPRequestHandler
+    from http.server import HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs
+    from urllib.parse import urlparse
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from BaseHTTPServer import HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs
+    from urlparse import urlparse
+
+from .utils import HTTPClient
+
+EDGE_PAGE_SIZE_MAX = 1024
+VIRTUALWIRE_PAGE_SIZE_MAX = 1024
+DEFAULT_PAGE_SIZE = 256
+
+_ROUTES = [
+    ('GET', r'/api/4\.0/edges/?', '_list_edges'),
+    ('POST', r'/api/4\.0/edges/?', '_create_edge'),
+    ('GET', r'/api/4\.0/edges/(?P<edge>[^/]+)/?', '_get_edge'),
+    ('DELETE', r'/api/4\.0/edges/(?P<edge>[^/]+)/?', '_delete_edge'),
+    ('GET', r'/api/4\.0/edges/(?P<edge>[^/]+)/status/?', '_get_edge_status'),
+    ('POST', r'/api/4\.0/edges/(?P<edge>[^/]+)/(?P<kind>interfaces|vnics)/?',
+     '_patch_interfaces'),
+    ('GET', r'/api/4\.0/edges/(?P<edge>[^/]+)/(?P<feature>'
+     r'routing/config/global|routing/config/bgp|syslog/config|'
+     r'highavailability/config)/?', '_get_feature'),
+    ('PUT', r'/api/4\.0/edges/(?P<edge>[^/]+)/(?P<feature>'
+     r'routing/config/global|routing/config/bgp|syslog/config|'
+     r'highavailability/config)/?', '_put_feature'),
+    ('GET', r'/api/4\.0/firewall/globalroot-0/config/?', '_get_dfw_config'),
+    ('POST', r'/api/4\.0/firewall/globalroot-0/config/layer3sections/?',
+     '_create_section'),
+    ('GET', r'/api/4\.0/firewall/globalroot-0/config/layer3sections/'
+     r'(?P<section>\d+)/?', '_get_section'),
+    ('PUT', r'/api/4\.0/firewall/globalroot-0/config/layer3sections/'
+     r'(?P<section>\d+)/?', '_put_section'),
+    ('DELETE', r'/api/4\.0/firewall/globalroot-0/config/layer3sections/'
+     r'(?P<section>\d+)/?', '_delete_section'),
+    ('POST', r'/api/4\.0/firewall/globalroot-0/config/layer3sections/'
+     r'(?P<section>\d+)/rules/?', '_create_rule'),
+    ('POST', r'/api/2\.0/services/auth/token/?', '_create_token'),
+    ('GET', r'/api/2\.0/vdn/scopes/?', '_list_scopes'),
+    ('GET', r'/api/2\.0/vdn/scopes/(?P<scope>[^/]+)/virtualwires/?',
+     '_list_virtualwires'),
+    ('POST', r'/api/2\.0/vdn/scopes/(?P<scope>[^/]+)/virtualwires/?',
+     '_create_virtualwire'),
+    ('GET', r'/api/2\.0/vdn/virtualwires/?', '_list_virtualwires'),
+    ('DELETE', r'/api/2\.0/vdn/virtualwires/(?P<virtualwire>[^/]+)/?',
+     '_delete_virtualwire'),
+]
+_ROUTES = [(method, re.compile(pattern + '$'), name)
+           for method, pattern, name in _ROUTES]
+
+# Default configuration of the edge features, in the flat shape NSX
+# Manager returns and the SDK writes back
+_FEATURES = {
+    'routing/config/global': {'ecmp': False,
+                              'logging': {'enabled': False,
+                                          'logLevel': "info"}},
+    'routing/config/bgp': {'enabled': False, 'gracefulRestart': False,
+                           'defaultOriginate': False,
+                           'bgpNeighbours': {'bgpNeighbours': []}},
+    'syslog/config': {'featureType': "syslog", 'enabled': False,
+                      'serverAddresses': {'ipAddress': []}},
+    'highavailability/config': {'featureType': "highavailability_4.0",
+                                'enabled': False},
+}
+
+
+def _create_rule(rule_id, index):
+    """Create a layer3 rule of the initial inventory
+
+        :param int rule_id: Id of the rule
+        :param int index: Index used to derive its addresses
+
+        :return: Firewall rule configuration
+
+    """
+    return {
+        'id': rule_id,
+        'name': "rule-%d" % rule_id,
+        'action': "allow",
+        'type': "LAYER3",
+        'sources': {'excluded': "false", 'sourceList': [
+            {'type': "Ipv4Address", 'isValid': "true",
+             'value': "10.%d.%d.1" % (index // 256 % 256, index % 256)}]},
+        'destinations': {'excluded': "false", 'destinationList': [
+            {'type': "Ipv4Address", 'isValid': "true",
+             'value': "10.%d.%d.2" % (index // 256 % 256, index % 256)}]},
+        'appliedToList': {'appliedToList': [
+            {'name': "DISTRIBUTED_FIREWALL", 'type': "DISTRIBUTED_FIREWALL",
+             'value': "DISTRIBUTED_FIREWALL"}]},
+        'services': {'serviceList': []},
+    }
+
+
+def _page_parameters(query, page_size_max):
+    """Read the pagination parameters of a listing request, NSX Manager
+    spells them startIndex/pageSize or startindex/pagesize depending on the
+    API.
+
+        :param dict query: Query string parameters, lower cased names
+        :param int page_size_max: Largest page served
+
+        :return: start index and page size
+        :rtype: tuple
+
+    """
+    start_index = int(query.get('startindex', 0))
+    page_size = int(query.get('pagesize', DEFAULT_PAGE_SIZE))
+    return start_index, max(1, min(page_size, page_size_max))
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    """Request handler dispatching to :class:`FakeNSXManager`"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, do not let Nagle's
+    # algorithm hold the body back until the client acknowledges them
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, data, headers = self.server.manager.handle(
+            self.command, self.path, body, self.headers)
+        content_type = 'application/json'
+        if data is None:
+            payload = b''
+        elif isinstance(data, bytes):
+            payload = data
+            content_type = 'text/plain'
+        else:
+            payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(payload)
+        self.server.manager.record_sent(len(payload))
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _handle
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeNSXManager(object):
+
+    """In-memory NSX Manager served over HTTP on localhost
+
+    Attributes:
+        edges: Edges indexed by id, with their configuration under
+            ``features``
+        sections: Layer3 firewall sections indexed by id
+        scopes: Transport zones indexed by id
+        virtualwires: Logical switches indexed by id
+        latency: Seconds added to every response
+        auth_latency: Seconds added to the requests authenticated with
+            credentials, as spent by NSX Manager to check them
+        tokens: Expiry time of the authentication tokens issued, indexed by
+            token
+        max_rate: Requests accepted per second, the others are answered
+            with 429, None for no limit
+        deploy_polls: Number of status reads for which a new edge is
+            reported as still deploying
+    """
+
+    def __init__(self, edges=0, sections=0, rules_per_section=0, scopes=1,
+                 virtualwires=0, latency=0, auth_latency=0, max_rate=None,
+                 deploy_polls=0,
+                 edge_page_size_max=EDGE_PAGE_SIZE_MAX,
+                 virtualwire_page_size_max=VIRTUALWIRE_PAGE_SIZE_MAX,
+                 host='127.0.0.1', port=0):
+        """
+        :param int edges: Number of service gateways of the inventory,
+            named esg-0, esg-1, ...
+        :param int sections: Number of firewall sections of the inventory,
+            named section-0, section-1, ...
+        :param int rules_per_section: Number of rules in each section
+        :param int scopes: Number of transport zones, named tz-0, tz-1, ...
+        :param int virtualwires: Number of logical switches of the
+            inventory, spread over the transport zones and named ls-0,
+            ls-1, ...
+        :param float latency: Seconds added to every response
+        :param float auth_latency: Seconds added to the requests
+            authenticated with credentials
+        :param float max_rate: Requests accepted per second, None for no
+            limit
+        :param int deploy_polls: Number of status reads for which a new
+            edge is reported as still deploying
+        :param int edge_page_size_max: Largest page of the edge listing
+        :param int virtualwire_page_size_max: Largest page of the logical
+            switch listing
+        :param str host: Address to listen on
+        :param int port: Port to listen on, a free one by default
+
+        """
+        self.latency = latency
+        self.auth_latency = auth_latency
+        self.max_rate = max_rate
+        self.deploy_polls = deploy_polls
+        self.edge_page_size_max = edge_page_size_max
+        self.virtualwire_page_size_max = virtualwire_page_size_max
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.manager = self
+        self._thread = None
+        self._window = (0, 0)
+        self._stats = None
+        self.reset_stats()
+
+        self._next_edge = 0
+        self._next_section = 1000
+        self._next_rule = 1
+        self._next_virtualwire = 5000
+        self._generation = 1
+        self.edges = {}
+        self.sections = {}
+        self.scopes = {}
+        self.virtualwires = {}
+        self.tokens = {}
+        for index in range(edges):
+            self._add_edge({'name': "esg-%d" % index,
+                            'type': "gatewayServices"}, deployed=True)
+        for index in range(sections):
+            section = self._add_section({'name': "section-%d" % index,
+                                         'rules': []})
+            for _ in range(rules_per_section):
+                section['rules'].append(
+                    _create_rule(self._next_rule, self._next_rule))
+                self._next_rule += 1
+        for index in range(scopes):
+            scope_id = "vdnscope-%d" % (index + 1)
+            self.scopes[scope_id] = {'objectId': scope_id, 'id': scope_id,
+                                     'name': "tz-%d" % index,
+                                     'controlPlaneMode': "UNICAST_MODE"}
+        scope_ids = sorted(self.scopes)
+        for index in range(virtualwires):
+            self._add_virtualwire(scope_ids[index % len(scope_ids)],
+                                  {'name': "ls-%d" % index,
+                                   'tenantId': "default"})
+
+    @property
+    def url(self):
+        """Base URL of the server"""
+        host, port = self._server.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    def client(self, login='admin', password='default', **kwargs):
+        """Create an HTTP client sending its requests to this server
+
+        :param str login: NSX Manager login, not checked
+        :param str password: NSX Manager password, not checked
+
+        Other keyword arguments are given to
+        :class:`nsxsdk.utils.HTTPClient`.
+
+        :return: HTTP client
+        :rtype: nsxsdk.utils.HTTPClient
+
+        """
+        http_client = HTTPClient('localhost', login, password, **kwargs)
+        http_client.base_url = self.url
+        return http_client
+
+    def start(self):
+        """Serve requests from a background thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever)
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests and close the listening socket"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset_stats(self):
+        """Reset the request counters"""
+        with self._lock:
+            self._stats = {'requests': 0, 'throttled': 0,
+                           'tokens_issued': 0, 'bytes_received': 0,
+                           'bytes_sent': 0, 'methods': {}}
+
+    def stats(self):
+        """Return the request counters
+
+        :return: number of requests, of throttled requests, of tokens
+            issued, of requests per method and bytes received and sent
+        :rtype: dict
+
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['methods'] = dict(self._stats['methods'])
+        return stats
+
+    def record_sent(self, size):
+        """Count bytes sent in a response body
+
+        :param int size: Size of the body
+
+        """
+        with self._lock:
+            self._stats['bytes_sent'] += size
+
+    def expire_tokens(self):
+        """Make all the authentication tokens issued so far invalid"""
+        with self._lock:
+            self.tokens.clear()
+
+    def _authenticated(self, headers):
+        """Check the credentials or the token of a request
+
+        Credentials are accepted after ``auth_latency`` seconds, tokens are
+        accepted until they expire.
+
+        """
+        authorization = headers.get('Authorization') or ''
+        if authorization.startswith('AUTHTOKEN '):
+            with self._lock:
+                expires_at = self.tokens.get(authorization[10:])
+            return expires_at is not None and expires_at > time.time()
+        if self.auth_latency:
+            time.sleep(self.auth_latency)
+        return True
+
+    def _throttled(self):
+        """Tell if the current request exceeds max_rate, over one second
+        windows"""
+        if self.max_rate is None:
+            return False
+        now = int(time.time())
+        with self._lock:
+            window, count = self._window
+            if window != now:
+                window, count = now, 0
+            self._window = (window, count + 1)
+            if count < self.max_rate:
+                return False
+            self._stats['throttled'] += 1
+        return True
+
+    def handle(self, method, path, body, headers):
+        """Answer a request
+
+        :param str method: HTTP method
+        :param str path: Path and query string of the request
+        :param bytes body: Request body
+        :param headers: Request headers
+
+        :return: status code, body (JSON serializable or plain text bytes)
+            and headers of the response
+        :rtype: tuple
+
+        """
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['bytes_received'] += len(body)
+            methods = self._stats['methods']
+            methods[method] = methods.get(method, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self._throttled():
+            return 429, {'errorCode': 429, 'details': "Too many requests"}, \
+                {'Retry-After': '1'}
+        if not self._authenticated(headers):
+            return 401, {'errorCode': 401, 'details': "Invalid token"}, None
+
+        url = urlparse(path)
+        query = dict((name.lower(), values[-1])
+                     for name, values in parse_qs(url.query).items())
+        allowed = False
+        for route_method, pattern, name in _ROUTES:
+            match = pattern.match(url.path)
+            if match is None:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            data = None
+            if body:
+                try:
+                    data = json.loads(body.decode('utf-8'))
+                except ValueError:
+                    return 400, {'errorCode': 400,
+                                 'details': "Invalid JSON"}, None
+            with self._lock:
+                return getattr(self, name)(query=query, body=data,
+                                           headers=headers,
+                                           **match.groupdict())
+        if allowed:
+            return 405, {'errorCode': 405, 'details': "Not allowed"}, None
+        return 404, {'errorCode': 404, 'details': "Not found"}, None
+
+    # Edges
+
+    def _add_edge(self, data, deployed=False):
+        edge_id = "edge-%d" % (self._next_edge + 1)
+        self._next_edge += 1
+        edge = dict(data)
+        edge['id'] = edge_id
+        edge.setdefault('type', "gatewayServices")
+        edge['features'] = json.loads(json.dumps(_FEATURES))
+        edge['pending_polls'] = 0 if deployed else self.deploy_polls
+        self.edges[edge_id] = edge
+        return edge
+
+    def _edge_summary(self, edge):
+        return {'objectId': edge['id'], 'id': edge['id'],
+                'name': edge.get('name'), 'edgeType': edge['type'],
+                'edgeStatus': "GREY" if edge['pending_polls'] else "GREEN",
+                'state': "undeployed" if edge['pending_polls']
+                else "deployed"}
+
+    def _list_edges(self, query, **kwargs):
+        start_index, page_size = _page_parameters(query,
+                                                  self.edge_page_size_max)
+        edges = [self.edges[edge_id] for edge_id in
+                 sorted(self.edges, key=lambda key: int(key.split('-')[1]))]
+        data = [self._edge_summary(edge)
+                for edge in edges[start_index:start_index + page_size]]
+        return 200, {'edgePage': {
+            'data': data,
+            'pagingInfo': {'startIndex': start_index, 'pageSize': page_size,
+                           'totalCount': len(edges)}}}, None
+
+    def _create_edge(self, body, **kwargs):
+        if not body or not body.get('name'):
+            return 400, {'errorCode': 400, 'details': "Missing name"}, None
+        edge = self._add_edge(body)
+        return 201, None, {'Location': "/api/4.0/edges/" + edge['id']}
+
+    def _get_edge(self, edge, **kwargs):
+        data = self.edges.get(edge)
+        if data is None:
+            return 404, {'errorCode': 404, 'details': "No such edge"}, None
+        data = dict((key, value) for key, value in data.items()
+                    if key not in ('features', 'pending_polls'))
+        return 200, data, None
+
+    def _delete_edge(self, edge, **kwargs):
+        if self.edges.pop(edge, None) is None:
+            return 404, {'errorCode': 404, 'details': "No such edge"}, None
+        return 204, None, None
+
+    def _get_edge_status(self, edge, **kwargs):
+        data = self.edges.get(edge)
+        if data is None:
+            return 404, {'errorCode': 404, 'details': "No such edge"}, None
+        if data['pending_polls']:
+            data['pending_polls'] -= 1
+            return 200, {'edgeStatus': "GREY"}, None
+        return 200, {'edgeStatus': "GREEN"}, None
+
+    def _patch_interfaces(self, edge, kind, query, body, **kwargs):
+        data = self.edges.get(edge)
+        if data is None:
+            return 404, {'errorCode': 404, 'details': "No such edge"}, None
+        if query.get('action') != 'patch' or not isinstance(body, dict):
+            return 400, {'errorCode': 400,
+                         'details': "Invalid interfaces"}, None
+        # A single interface may be sent without the enclosing list
+        added = body.get(kind, [body])
+        interfaces = data.setdefault(kind, [])
+        for interface in added:
+            interface = dict(interface)
+            interface['index'] = len(interfaces)
+            interfaces.append(interface)
+        return 200, {kind: interfaces[len(interfaces) - len(added):]}, None
+
+    def _get_feature(self, edge, feature, **kwargs):
+        data = self.edges.get(edge)
+        if data is None:
+            return 404, {'errorCode': 404, 'details': "No such edge"}, None
+        return 200, data['features'][feature], None
+
+    def _put_feature(self, edge, feature, body, **kwargs):
+        data = self.edges.get(edge)
+        if data is None:
+            return 404, {'errorCode': 404, 'details': "No such edge"}, None
+        if not isinstance(body, dict):
+            return 400, {'errorCode': 400,
+                         'details': "Invalid configuration"}, None
+        data['features'][feature] = body
+        return 204, None, None
+
+    # Distributed firewall
+
+    def _add_section(self, data):
+        section = dict(data)
+        section['id'] = self._next_section
+        section['generationNumber'] = self._generation
+        section.setdefault('rules', [])
+        self._next_section += 1
+        self.sections[section['id']] = section
+        return section
+
+    def _touch_section(self, section):
+        self._generation += 1
+        section['generationNumber'] = self._generation
+
+    def _section_etag(self, section):
+        return '"%d"' % section['generationNumber']
+
+    def _get_dfw_config(self, headers, **kwargs):
+        etag = '"%d"' % self._generation
+        if headers.get('If-None-Match') == etag:
+            return 304, None, {'ETag': etag}
+        sections = [self.sections[section_id]
+                    for section_id in sorted(self.sections)]
+        return 200, {'generationNumber': self._generation,
+                     'layer3Sections': {'layer3Sections': sections}}, \
+            {'ETag': etag}
+
+    def _create_section(self, body, **kwargs):
+        if not body or not body.get('name'):
+            return 400, {'errorCode': 400, 'details': "Missing name"}, None
+        self._generation += 1
+        section = self._add_section(body)
+        for rule in section['rules']:
+            rule['id'] = self._next_rule
+            self._next_rule += 1
+        return 201, section, {
+            'ETag': self._section_etag(section),
+            'Location': "/api/4.0/firewall/globalroot-0/config/"
+                        "layer3sections/%d" % section['id']}
+
+    def _check_section(self, section, headers):
+        """Return the section and an error response, if any"""
+        data = self.sections.get(int(section))
+        if data is None:
+            return None, (404, {'errorCode': 404,
+                                'details': "No such section"}, None)
+        etag = headers.get('If-Match')
+        if etag is not None and etag != self._section_etag(data):
+            return None, (412, {'errorCode': 412,
+                                'details': "Section modified"}, None)
+        return data, None
+
+    def _get_section(self, section, **kwargs):
+        data = self.sections.get(int(section))
+        if data is None:
+            return 404, {'errorCode': 404, 'details': "No such section"}, \
+                None
+        return 200, data, {'ETag': self._section_etag(data)}
+
+    def _put_section(self, section, body, headers, **kwargs):
+        data, error = self._check_section(section, headers)
+        if error:
+            return error
+        if not isinstance(body, dict):
+            return 400, {'errorCode': 400, 'details': "Invalid section"}, \
+                None
+        rules = body.get('rules') or []
+        for rule in rules:
+            if 'id' not in rule:
+                rule['id'] = self._next_rule
+                self._next_rule += 1
+        data['name'] = body.get('name', data['name'])
+        data['rules'] = rules
+        self._touch_section(data)
+        return 200, data, {'ETag': self._section_etag(data)}
+
+    def _delete_section(self, section, **kwargs):
+        if self.sections.pop(int(section), None) is None:
+            return 404, {'errorCode': 404, 'details': "No such section"}, \
+                None
+        self._generation += 1
+        return 204, None, None
+
+    def _create_rule(self, section, body, headers, **kwargs):
+        data, error = self._check_section(section, headers)
+        if error:
+            return error
+        if headers.get('If-Match') is None:
+            return 428, {'errorCode': 428,
+                         'details': "If-Match header required"}, None
+        if not isinstance(body, dict):
+            return 400, {'errorCode': 400, 'details': "Invalid rule"}, None
+        rule = dict(body)
+        rule['id'] = self._next_rule
+        self._next_rule += 1
+        data['rules'].append(rule)
+        self._touch_section(data)
+        return 201, rule, {'ETag': self._section_etag(data)}
+
+    # Logical switches
+
+    def _add_virtualwire(self, scope_id, data):
+        virtualwire_id = "virtualwire-%d" % self._next_virtualwire
+        self._next_virtualwire += 1
+        virtualwire = {'objectId': virtualwire_id,
+                       'name': data.get('name'),
+                       'tenantId': data.get('tenantId'),
+                       'vdnScopeId': scope_id,
+                       'controlPlaneMode': data.get(
+                           'controlPlaneMode',
+                           self.scopes[scope_id]['controlPlaneMode'])}
+        self.virtualwires[virtualwire_id] = virtualwire
+        return virtualwire
+
+    def _list_scopes(self, **kwargs):
+        scopes = [self.scopes[scope_id] for scope_id in sorted(self.scopes)]
+        return 200, {'allScopes': scopes}, None
+
+    def _list_virtualwires(self, query, scope=None, **kwargs):
+        if scope is not None and scope not in self.scopes:
+            return 404, {'errorCode': 404, 'details': "No such scope"}, None
+        start_index, page_size = _page_parameters(
+            query, self.virtualwire_page_size_max)
+        virtualwires = [
+            self.virtualwires[virtualwire_id] for virtualwire_id in
+            sorted(self.virtualwires, key=lambda key: int(key.split('-')[1]))
+            if scope is None or
+            self.virtualwires[virtualwire_id]['vdnScopeId'] == scope]
+        return 200, {'dataPage': {
+            'data': virtualwires[start_index:start_index + page_size],
+            'pagingInfo': {'startIndex': start_index, 'pageSize': page_size,
+                           'totalCount': len(virtualwires)}}}, None
+
+    def _create_virtualwire(self, scope, body, **kwargs):
+        if scope not in self.scopes:
+            return 404, {'errorCode': 404, 'details': "No such scope"}, None
+        if not body or not body.get('name'):
+            return 400, {'errorCode': 400, 'details': "Missing name"}, None
+        virtualwire = self._add_virtualwire(scope, body)
+        return 201, virtualwire['objectId'].encode('utf-8'), None
+
+    def _delete_virtualwire(self, virtualwire, **kwargs):
+        if self.virtualwires.pop(virtualwire, None) is None:
+            return 404, {'errorCode': 404,
+                         'details': "No such virtualwire"}, None
+        return 200, None, None
+
+    # Authentication
+
+    def _create_token(self, query, headers, **kwargs):
+        authorization = headers.get('Authorization') or ''
+        if not authorization.startswith('Basic '):
+            return 403, {'errorCode': 403,
+                         'details': "Credentials required"}, None
+        try:
+            minutes = int(query.get('expiresinminutes', 90))
+        except ValueError:
+            return 400, {'errorCode': 400,
+                         'details': "Invalid expiresInMinutes"}, None
+        token = uuid.uuid4().hex
+        expires_at = time.time() + minutes * 60
+        self.tokens[token] = expires_at
+        self._stats['tokens_issued'] += 1
+        return 200, {'value': token,
+                     'expiresOn': int(expires_at * 1000)}, None
@@ -3,79 +3,933 @@
 
 import requests
 import json
-import sys
+import logging
+import random
+import threading
+import time
+
+from multiprocessing.pool import ThreadPool
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.connectionpool import HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from urllib3.poolmanager import PoolManager
+
+from .codec import JSONCodec
+from .exceptions import ConnectionFailed
+from .exceptions import RequestTimeout
+from .exceptions import TransportError
+from .exceptions import UnexpectedResponse
+from .jsonstream import iter_response_items
+from .ratelimit import RateController
+from .ratelimit import method_class
+
+LOG = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 502, 503, 504)
+_TEXT_TYPES = (bytes, type(u''))
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+# Session settings shared with the sessions of the threads: the mutable ones
+# are shared by reference, the others are copied before each request
+SESSION_SHARED_ATTRS = ('headers', 'proxies', 'params', 'hooks', 'adapters')
+SESSION_COPIED_ATTRS = ('auth', 'verify', 'cert', 'stream', 'trust_env',
+                        'max_redirects')
+
+
+class Counters(object):
+
+    """Thread-safe named counters"""
+
+    def __init__(self, *names):
+        self._lock = threading.Lock()
+        self._names = names
+        for name in names:
+            setattr(self, name, 0)
+
+    def increment(self, name, value=1):
+        """Increment a counter
+
+        :param str name: Name of the counter to increment
+        :param int value: Value to add, defaults to 1
+
+        """
+        with self._lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self):
+        """Return a consistent copy of the counters
+
+        :return: Counters values indexed by their names
+        :rtype: dict
+
+        """
+        with self._lock:
+            return dict((name, getattr(self, name)) for name in self._names)
+
+
+class PoolCounters(Counters):
+
+    """Thread-safe connection pool usage counters
+
+    Attributes:
+        opened: Number of connections opened
+        requested: Number of connections taken from the pool
+        waited: Number of times a request waited for a free connection
+    """
+
+    def __init__(self):
+        Counters.__init__(self, 'opened', 'requested', 'waited')
+
+    def snapshot(self):
+        """Return a consistent copy of the counters
+
+        :return: opened, reused and waited connections counters
+        :rtype: dict
+
+        """
+        counters = Counters.snapshot(self)
+        return {'opened': counters['opened'],
+                'reused': counters['requested'] - counters['opened'],
+                'waited': counters['waited']}
+
+
+def backoff_delay(attempt, base, cap):
+    """Compute an exponential backoff delay with full jitter
+
+    :param int attempt: Number of attempts already made, starting at 1
+    :param float base: Delay of the first retry, in seconds
+    :param float cap: Maximum delay, in seconds
+
+    :return: Delay to wait before the next attempt, in seconds
+    :rtype: float
+
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def _not_sent(exception):
+    """Tell if a transport error occurred before the request was sent, while
+    the connection was being established
+
+    :param exception: Raised requests exception
+
+    :rtype: bool
+
+    """
+    if isinstance(exception, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(exception, requests.exceptions.ConnectionError):
+        return False
+    reason = exception.args[0] if exception.args else None
+    # urllib3 wraps the connection error in a MaxRetryError
+    reason = getattr(reason, 'reason', reason)
+    return isinstance(reason, NewConnectionError)
+
+
+class RetryPolicy(object):
+
+    """Policy deciding whether a failed request is sent again
+
+    Requests failing with a transport error or a retryable status code are
+    retried with an exponential backoff with full jitter, honoring the
+    Retry-After header. Only idempotent requests are retried, unless the
+    connection could not be established (connection refused, name
+    resolution failure or connection timeout), in which case the request
+    was not sent at all.
+
+    Attributes:
+        max_attempts: Maximum number of attempts, including the first one
+        backoff: Delay before the first retry, in seconds
+        backoff_max: Maximum delay between two attempts, in seconds
+        statuses: Status codes to retry
+        methods: HTTP methods considered idempotent
+    """
+
+    def __init__(self, max_attempts=3, backoff=0.5, backoff_max=30,
+                 statuses=RETRY_STATUSES, methods=IDEMPOTENT_METHODS):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.statuses = statuses
+        self.methods = methods
+
+    def is_idempotent(self, method, idempotent=None):
+        """Tell if a request can be sent again
+
+        :param str method: HTTP method
+        :param bool idempotent: Override of the method based decision, True
+            to mark a POST request as safe to retry
+
+        :rtype: bool
+
+        """
+        if idempotent is not None:
+            return idempotent
+        return method.upper() in self.methods
+
+    def retry_error(self, method, exception, attempt, idempotent=None):
+        """Tell if a request which raised a transport error is retried
+
+        :param str method: HTTP method
+        :param exception: Raised requests exception
+        :param int attempt: Number of attempts already made
+        :param bool idempotent: See :meth:`is_idempotent`
+
+        :rtype: bool
+
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if _not_sent(exception):
+            return True
+        return self.is_idempotent(method, idempotent)
+
+    def retry_response(self, method, response, attempt, idempotent=None):
+        """Tell if a request which got a response is retried
+
+        :param str method: HTTP method
+        :param requests.Response response: Response received
+        :param int attempt: Number of attempts already made
+        :param bool idempotent: See :meth:`is_idempotent`
+
+        :rtype: bool
+
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if response.status_code not in self.statuses:
+            return False
+        return self.is_idempotent(method, idempotent)
+
+    def delay(self, attempt, retry_after=None):
+        """Compute the delay before the next attempt
+
+        :param int attempt: Number of attempts already made
+        :param str retry_after: Retry-After header of the last response
+
+        :return: Delay in seconds
+        :rtype: float
+
+        """
+        delay = backoff_delay(attempt, self.backoff, self.backoff_max)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(int(retry_after), self.backoff_max))
+        return delay
+
+
+class _CountingPoolMixin(object):
+
+    """Connection pool mixin feeding a :class:`PoolCounters`"""
+
+    counters = None
+
+    def _get_conn(self, timeout=None):
+        if self.block and self.pool is not None and self.pool.empty():
+            self.counters.increment('waited')
+        self.counters.increment('requested')
+        return super(_CountingPoolMixin, self)._get_conn(timeout)
+
+    def _new_conn(self):
+        self.counters.increment('opened')
+        return super(_CountingPoolMixin, self)._new_conn()
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _CountingPoolManager(PoolManager):
+
+    """PoolManager creating connection pools that feed shared counters"""
+
+    def __init__(self, counters, *args, **kwargs):
+        PoolManager.__init__(self, *args, **kwargs)
+        self.counters = counters
+        self.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = PoolManager._new_pool(self, scheme, host, port,
+                                     request_context)
+        pool.counters = self.counters
+        return pool
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+
+    """HTTPAdapter whose connection pools report to a
+    :class:`PoolCounters`"""
+
+    def __init__(self, counters, **kwargs):
+        self.counters = counters
+        HTTPAdapter.__init__(self, **kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False,
+                         **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _CountingPoolManager(self.counters,
+                                                num_pools=connections,
+                                                maxsize=maxsize,
+                                                block=block,
+                                                **pool_kwargs)
+
+
+class BackgroundCall(threading.Thread):
+
+    """Run a function in a daemon thread and collect its result later, used
+    to prefetch the next page of a listing while the current one is
+    processed.
+    """
+
+    def __init__(self, function, *args):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.function = function
+        self.args = args
+        self._result = None
+        self._exception = None
+        self.start()
+
+    def run(self):
+        try:
+            self._result = self.function(*self.args)
+        except BaseException as exception:
+            self._exception = exception
+
+    def result(self):
+        """Wait for the call to complete
+
+        :return: Value returned by the function, the exception it raised
+            is raised again in the calling thread.
+
+        """
+        self.join()
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+
+def map_concurrently(function, items, concurrency, progress=None):
+    """Call a function on each item from a pool of up to ``concurrency``
+    worker threads
+
+    The workers usually share an :class:`HTTPClient`, whose
+    ``pool_maxsize`` should then be at least ``concurrency`` for
+    connections to be reused.
+
+    :param function: Callable receiving an item. An exception it raises
+        is raised again once the calls in flight returned, the calls
+        which were not started yet are cancelled.
+    :param list items: Items to call the function on
+    :param int concurrency: Maximum number of calls in flight
+    :param progress: Callable receiving the number of items done, the total
+        number of items and the value returned for the last one, called
+        from the calling thread.
+
+    :return: values returned by the function, in the order of items
+    :rtype: list
+
+    """
+    items = list(items)
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    def call(item):
+        index, value = item
+        return index, function(value)
+
+    pool = ThreadPool(min(concurrency, len(items)))
+    try:
+        done = 0
+        for index, result in pool.imap_unordered(call, enumerate(items)):
+            results[index] = result
+            done += 1
+            if progress is not None:
+                progress(done, len(items), result)
+    except BaseException:
+        # Drop the queued calls, the workers exit after their current one
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+    return results
+
+
+def _check_page(response):
+    """Ensure that a page of a paginated listing was returned
+
+    :raises UnexpectedResponse: if the page request failed
+
+    """
+    if response.status_code >= 300:
+        response.close()
+        raise UnexpectedResponse(response, "listing page not returned")
+
+
+def _get_page(http_client, path, item_path):
+    """Retrieve a page of a paginated listing
+
+    :return: Page, holding its items and pagingInfo
+    :rtype: dict
+
+    """
+    response = http_client.request("GET", path)
+    _check_page(response)
+    page = response.data
+    for key in item_path[:-1]:
+        page = page[key]
+    return page
+
+
+def page_items(page, item_key):
+    """Read the items of a page of a paginated NSX Manager listing and
+    locate the next page from its pagingInfo
+
+    :param dict page: Page, holding its items and pagingInfo
+    :param str item_key: Key of the items array in the page
+
+    :return: items of the page and start index of the next page, None on
+        the last page
+    :rtype: tuple
+
+    """
+    items = page[item_key]
+    paging = page.get('pagingInfo', {})
+    next_index = int(paging.get('startIndex', 0)) + len(items)
+    if not items or next_index >= int(paging.get('totalCount', 0)):
+        return items, None
+    return items, next_index
+
+
+def iter_pages(http_client, page_path, item_path, page_size, prefetch=False,
+               stream=False):
+    """Iterate lazily over the items of a paginated NSX Manager listing, one
+    page at a time
+
+    :param HTTPClient http_client: Client sending the requests
+    :param page_path: Callable receiving the start index and the size of a
+        page and returning its path
+    :param list item_path: Keys leading to the items array in a page
+        response, e.g. ``['edgePage', 'data']``. The pagingInfo of the page
+        is next to the items array.
+    :param int page_size: Number of items requested per page
+    :param bool prefetch: Fetch the next page in a background thread while
+        the current one is being consumed, defaults to False.
+    :param bool stream: Parse each page incrementally while it is being
+        downloaded, prefetch is ignored in this mode. The pagingInfo of the
+        page is read once its items are exhausted.
+
+    :return: Items of the listing, as returned by NSX Manager
+    :rtype: generator of dict
+
+    :raises UnexpectedResponse: if a page request failed
+
+    """
+    if stream:
+        start_index = 0
+        while True:
+            response = http_client.request(
+                "GET", page_path(start_index, page_size), stream=True)
+            _check_page(response)
+            siblings = {'pagingInfo': None}
+            count = 0
+            for item in iter_response_items(response, item_path, siblings):
+                count += 1
+                yield item
+            start_index += count
+            paging = siblings['pagingInfo']
+            if paging is None:
+                # Without pagingInfo, only a full page may have a next one
+                if count < page_size:
+                    return
+            elif not count or \
+                    start_index >= int(paging.get('totalCount', 0)):
+                return
+
+    page = _get_page(http_client, page_path(0, page_size), item_path)
+    while True:
+        items, next_index = page_items(page, item_path[-1])
+        has_next = next_index is not None
+
+        next_page = None
+        if prefetch and has_next:
+            next_page = BackgroundCall(_get_page, http_client,
+                                       page_path(next_index, page_size),
+                                       item_path)
+        for item in items:
+            yield item
+        if not has_next:
+            return
+        if next_page is not None:
+            page = next_page.result()
+        else:
+            page = _get_page(http_client, page_path(next_index, page_size),
+                             item_path)
+
+
+class NameIndex(object):
+
+    """Thread-safe in-memory index from object names to object ids, reloaded
+    once its TTL expired. A single thread reloads the index at a time, the
+    other ones wait for it and use the index it loaded.
+
+    Attributes:
+        loader: Callable returning a fresh {name: id} dict
+        ttl: Number of seconds the index is valid after a reload
+    """
+
+    def __init__(self, loader, ttl):
+        self.loader = loader
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._ids = {}
+        self._expires = 0
+        self._loaded_at = None
+        self._invalidations = 0
+
+    def get(self, name):
+        """Retrieve an object id from its name, reloading the index first
+        if it expired
+
+        :param str name: Name of the object
+
+        :return: Id of the object, None if unknown
+        :rtype: str
+
+        """
+        if time.time() >= self._expires:
+            self._reload(False)
+        return self._ids.get(name)
+
+    def refresh(self):
+        """Reload the whole index, unless another thread started reloading
+        it after this call"""
+        self._reload(True)
+
+    def _reload(self, force):
+        """Reload the index, once for all the threads waiting for it
+
+        :param bool force: Reload the index even if it did not expire
+
+        """
+        requested = time.time()
+        with self._reload_lock:
+            # Another thread may have reloaded it while this one waited
+            if self._loaded_at is not None and self._loaded_at >= requested:
+                return
+            if not force and time.time() < self._expires:
+                return
+            started = time.time()
+            invalidations = self._invalidations
+            ids = self.loader()
+            with self._lock:
+                self._ids = ids
+                self._loaded_at = started
+                # Stays expired if it was invalidated during the reload
+                if invalidations == self._invalidations:
+                    self._expires = time.time() + self.ttl
+
+    def invalidate(self):
+        """Force a reload on next lookup"""
+        with self._lock:
+            self._expires = 0
+            self._invalidations += 1
+
+    def set(self, name, object_id):
+        """Add or update an entry without reloading the index
+
+        :param str name: Name of the object
+        :param str object_id: Id of the object
+
+        """
+        with self._lock:
+            self._ids[name] = object_id
+
+    def discard_id(self, object_id):
+        """Remove the entries pointing to an object id
+
+        :param str object_id: Id of the removed object
+
+        """
+        with self._lock:
+            self._ids = dict((name, value)
+                             for name, value in self._ids.items()
+                             if value != object_id)
+
+
+class Response(requests.Response):
+
+    """Response returned by :class:`HTTPClient`, a ``requests.Response``
+    whose text and decoded JSON body are computed lazily and only once.
+    The same decoded object is returned on each access.
+
+    Attributes:
+        duration: Seconds between sending the request and receiving the
+            response, body included unless streamed. ``elapsed``, inherited
+            from ``requests.Response``, only measures the time until the
+            headers were received.
+        codec: JSON codec decoding the body, see :mod:`nsxsdk.codec`
+    """
+
+    def __init__(self, response=None, duration=None, codec=None):
+        requests.Response.__init__(self)
+        if response is not None:
+            self.__dict__.update(response.__dict__)
+        self.duration = duration
+        self.codec = codec or JSONCodec()
+        self._text = None
+        self._data = None
+        self._decoded = False
+
+    @property
+    def text(self):
+        """Response body decoded as a string"""
+        if self._text is None:
+            self._text = requests.Response.text.fget(self)
+        return self._text
+
+    @property
+    def data(self):
+        """Response body decoded as JSON, None if the body is empty
+
+        :raises ValueError: if the body is not valid JSON
+
+        """
+        if not self._decoded:
+            content = self.content
+            self._data = None
+            if content and content.strip():
+                self._data = self.codec.loads(content)
+            self._decoded = True
+        return self._data
+
+    def json(self, **kwargs):
+        """Response body decoded as JSON, the memoized :attr:`data` unless
+        decoding options are given"""
+        if kwargs:
+            return requests.Response.json(self, **kwargs)
+        return self.data
+
+    @property
+    def etag(self):
+        """ETag header of the response, None if it has none"""
+        return self.headers.get('ETag')
+
+    @property
+    def size(self):
+        """Size of the response body in bytes, from the Content-Length
+        header while a streamed body was not read, None if unknown"""
+        if self._content is False:
+            length = self.headers.get('Content-Length')
+            return int(length) if length is not None else None
+        return len(self.content or b'')
 
 
 class HTTPClient(object):
 
-    """HTTPClient have the following properties:
+    """HTTPClient has the following properties:
 
     Attributes:
         base_url: A string representing the base url.
         login: A string representing login.
         password: A string representing password
-        session: Session parameters for REST API calls
+        keep_alive: Reuse connections between requests if True
+        counters: Connection pool usage counters
+        hooks: Instrumentation hooks, see :meth:`add_hook`
+        rate_limits: Rate controllers indexed by method class
+        retry_policy: Policy retrying failed requests
+        codec: JSON codec serializing request bodies and decoding response
+            bodies
+        token_auth: Authentication token cache, None to send the
+            credentials with every request
+        session: Session parameters for REST API calls, changes made to it
+            or its replacement apply to the requests of all the threads
+
+    The client can be shared across threads: each thread sends its
+    requests through its own session, configured from ``session``, while
+    all of them share a single connection pool.
     """
 
-    def __init__(self, hostname, login, password):
+    def __init__(self, hostname, login, password, pool_connections=10,
+                 pool_maxsize=10, pool_block=False, keep_alive=True,
+                 rate_limits=None, retry_policy=None, codec=None,
+                 token_auth=None):
+        """
+        :param str hostname: NSX Manager hostname
+        :param str login: NSX Manager login
+        :param str password: NSX Manager password
+        :param int pool_connections: Number of hosts to keep connection
+            pools for, defaults to 10.
+        :param int pool_maxsize: Maximum number of connections kept per host,
+            defaults to 10. Size it to the number of threads sharing the
+            client.
+        :param bool pool_block: Wait for a free connection when the pool is
+            exhausted instead of opening (and then discarding) an extra one,
+            defaults to False.
+        :param bool keep_alive: Reuse connections between requests,
+            defaults to True.
+        :param rate_limits: :class:`nsxsdk.ratelimit.RateController` pacing
+            all the requests, or a dict of them indexed by method class
+            (read for GET, HEAD and OPTIONS, write for the others). Requests
+            are not paced by default.
+        :param RetryPolicy retry_policy: Policy retrying failed requests,
+            requests are sent only once by default.
+        :param codec: JSON codec, see :mod:`nsxsdk.codec`, defaults to the
+            standard library one.
+        :param token_auth: :class:`nsxsdk.auth.TokenAuth` authenticating
+            the requests with a token instead of the credentials, which are
+            then only sent to obtain tokens. Basic authentication is used by
+            default.
+
+        """
         self.base_url = "https://" + hostname
         self.login = login
         self.password = password
+        self.keep_alive = keep_alive
+        self.counters = PoolCounters()
+        self._adapter = _CountingHTTPAdapter(self.counters,
+                                             pool_connections=pool_connections,
+                                             pool_maxsize=pool_maxsize,
+                                             pool_block=pool_block)
+        self._local = threading.local()
+        self.hooks = {'before_request': [], 'after_response': []}
+        if isinstance(rate_limits, RateController):
+            rate_limits = {'read': rate_limits, 'write': rate_limits}
+        self.rate_limits = rate_limits or {}
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+        self.codec = codec or JSONCodec()
+        self.token_auth = token_auth
         self.session = self._initialize_session()
 
+    def local_session(self):
+        """Return the session of the current thread, created from
+        ``session`` on first use and kept in sync with it
+
+        :rtype: requests.Session
+
+        """
+        template = self.session
+        local = self._local
+        session = getattr(local, 'session', None)
+        if session is None or local.template is not template:
+            session = requests.Session()
+            for name in SESSION_SHARED_ATTRS:
+                setattr(session, name, getattr(template, name))
+            local.session = session
+            local.template = template
+        for name in SESSION_COPIED_ATTRS:
+            setattr(session, name, getattr(template, name))
+        return session
+
     def _initialize_session(self):
         """Initialize HTTP session with a basic configuration to consume
         JSON REST API:
             - Disable SSL verification
             - Set HTTP headers to application/json
-            - Set authorization header
+            - Set authorization header, unless token authentication is used
+            - Use the connection pool shared by the client
 
         Returns:
             Session: initiazed session
 
         """
         session = requests.Session()
-        session.auth = (self.login, self.password)
+        if self.token_auth is None:
+            session.auth = (self.login, self.password)
         session.verify = False
         session.headers.update({'Accept': 'application/json'})
         session.headers.update({'Content-type': 'application/json'})
+        if not self.keep_alive:
+            session.headers.update({'Connection': 'close'})
+        session.mount('https://', self._adapter)
+        session.mount('http://', self._adapter)
         return session
 
-    def request(self, method, path, body=None, headers=None):
+    def pool_stats(self):
+        """Return connection pool usage counters, useful to size
+        ``pool_maxsize``
+
+        :return: number of connections opened, reused and of requests
+            which waited for a free connection
+        :rtype: dict
+
+        """
+        return self.counters.snapshot()
+
+    def add_hook(self, event, hook):
+        """Register an instrumentation hook
+
+        Hooks are called synchronously from the thread sending the request:
+            - before_request(method, path, request_bytes)
+            - after_response(method, path, status_code, request_bytes,
+              response_bytes, elapsed)
+
+        :param str event: before_request or after_response
+        :param hook: Callable to register
+
+        """
+        self.hooks[event].append(hook)
+
+    def remove_hook(self, event, hook):
+        """Unregister an instrumentation hook
+
+        :param str event: before_request or after_response
+        :param hook: Callable to unregister
+
+        """
+        self.hooks[event].remove(hook)
+
+    def request(self, method, path, body=None, headers=None, stream=False,
+                idempotent=None):
         """Generic method to consume REST API Webservices
 
+        The method and URL are logged at INFO level, the request body is
+        only decoded and pretty-printed when DEBUG level is enabled. Failed
+        requests are sent again according to the retry policy. With token
+        authentication, a request rejected with 401 is sent once more with a
+        new token.
+
         :param method: HTTP method
         :param path: API resource path
-        :param body: HTTP request body
+        :param body: HTTP request body, a JSON document as text or bytes, or
+            an object serialized once by the client codec
         :param headers: Extra headers
+        :param stream: Do not download the response body until it is
+            accessed, the response must then be closed by the caller.
+        :param idempotent: True if the request can be safely sent again,
+            defaults to the retry policy decision based on the method.
+
+        :return: response to the HTTP request, the last one if the request
+            was retried too many times
+        :rtype: Response
 
-        :return: return description
-        :rtype: the return type description
+        :raises ConnectionFailed: if NSX Manager could not be reached
+        :raises RequestTimeout: if NSX Manager did not answer in time
+        :raises TransportError: on other transport errors
+        :raises AuthenticationFailed: if no token could be obtained
 
         """
         url = self.base_url + path
-        print "Method: " + method + ", URL: " + url
+        LOG.info("Method: %s, URL: %s", method, url)
 
-        if body is not None:
-            print json.dumps(
-                json.loads(body),
+        if body is not None and not isinstance(body, _TEXT_TYPES):
+            body = self.codec.dumps(body)
+        elif isinstance(body, type(u'')):
+            # Sent and measured as UTF-8, the encoding of JSON documents
+            body = body.encode('utf-8')
+        if body is not None and LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug(json.dumps(
+                self.codec.loads(body),
                 sort_keys=True,
                 indent=4,
                 separators=(
                     ',',
-                    ': '))
+                    ': ')))
 
+        policy = self.retry_policy
+        attempt = 0
+        reauthenticated = False
+        while True:
+            attempt += 1
+            try:
+                response = self._send(method, path, url, body, headers,
+                                      stream)
+            except requests.exceptions.RequestException as exception:
+                if not policy.retry_error(method, exception, attempt,
+                                          idempotent):
+                    LOG.debug("%s %s failed: %s", method, url, exception)
+                    raise _transport_error(method, path, exception, attempt)
+                delay = policy.delay(attempt)
+                LOG.warning("%s %s failed: %s, retrying in %.1fs", method,
+                            url, exception, delay)
+            else:
+                if response.status_code == 401 and \
+                        self.token_auth is not None and not reauthenticated:
+                    # The token was revoked or expired earlier than expected
+                    reauthenticated = True
+                    attempt -= 1
+                    self.token_auth.invalidate(
+                        response.request.headers.get('Authorization'))
+                    response.close()
+                    continue
+                if not policy.retry_response(method, response, attempt,
+                                             idempotent):
+                    return response
+                delay = policy.delay(attempt,
+                                     response.headers.get('Retry-After'))
+                LOG.warning("%s %s returned %s, retrying in %.1fs", method,
+                            url, response.status_code, delay)
+                response.close()
+            time.sleep(delay)
+
+    def _send(self, method, path, url, body, headers, stream):
+        """Send a request once, with pacing and instrumentation
+
+        :return: response to the HTTP request
+        :rtype: Response
+
+        :raises requests.exceptions.RequestException: on transport errors
+
+        """
+        # Hooks registered while the request is in flight apply to the next
+        # requests only
+        before_hooks = tuple(self.hooks['before_request'])
+        after_hooks = tuple(self.hooks['after_response'])
+        request_bytes = len(body) if body is not None else 0
+        for hook in before_hooks:
+            hook(method, path, request_bytes)
+        if self.token_auth is not None:
+            headers = dict(headers or {})
+            headers['Authorization'] = self.token_auth.authorization(self)
+
+        controller = self.rate_limits.get(method_class(method))
+        if controller is not None:
+            started = controller.acquire()
+        start = time.time()
+
+        status_code = retry_after = None
         try:
-            response = self.session.request(
+            response = self.local_session().request(
                 method,
                 url,
                 data=body,
-                headers=headers)
-            print "Status code: " + str(response.status_code)
-            return response
-        except requests.exceptions.HTTPError as exception:
-            print "HTTPError: " + exception
-            sys.exit(1)
-        except requests.exceptions.RequestException as exception:
-            print exception
-            sys.exit(1)
+                headers=headers,
+                stream=stream)
+            response = Response(response, time.time() - start, self.codec)
+            status_code = response.status_code
+            retry_after = response.headers.get('Retry-After')
+        finally:
+            if controller is not None:
+                controller.release(started, status_code, retry_after)
+
+        LOG.info("Status code: %s", response.status_code)
+        for hook in after_hooks:
+            hook(method, path, response.status_code, request_bytes,
+                 response.size or 0, response.duration)
+        return response
+
+
+def _transport_error(method, path, exception, attempts):
+    """Wrap a requests exception in the matching SDK exception
+
+    :return: SDK exception
+    :rtype: TransportError
+
+    """
+    if isinstance(exception, requests.exceptions.Timeout):
+        return RequestTimeout(method, path, exception, attempts)
+    if isinstance(exception, requests.exceptions.ConnectionError):
+        return ConnectionFailed(method, path, exception, attempts)
+    return TransportError(method, path, exception, attempts)
@@ -36,6 +36,9 @@ setup(
     include_package_data=True,
     install_requires=[
     ],
+    extras_require={
+        'aio': ['aiohttp'],
+    },
     license='MIT',
     zip_safe=False,
     keywords='nsxsdk',
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+"""Fixtures shared by the tests"""
+
+import sys
+
+import pytest
+
+from nsxsdk.testing import FakeNSXManager
+
+# nsxsdk.aio and its tests use the async syntax of Python 3.5
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append('test_aio.py')
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', "manager(**kwargs): arguments of the FakeNSXManager "
+        "given to the manager fixture")
+
+
+@pytest.fixture(name="manager")
+def manager_fixture(request):
+    """NSX Manager stand-in, created with the arguments of the manager
+    marker of the test or of its module"""
+    marker = request.node.get_closest_marker('manager')
+    kwargs = marker.kwargs if marker is not None else {}
+    with FakeNSXManager(**kwargs) as server:
+        yield server
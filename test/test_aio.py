@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""Tests of the asyncio variants of the SDK"""
+
+import asyncio
+
+import pytest
+
+from nsxsdk import aio
+
+pytestmark = pytest.mark.manager(edges=250, sections=1, virtualwires=3,
+                                 edge_page_size_max=100)
+
+
+def _run(coroutine):
+    """Run a coroutine to completion in a new event loop"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class StubClient(object):
+
+    """Asynchronous client sending the requests with a blocking
+    :class:`nsxsdk.utils.HTTPClient`, so that the asyncio SDK can be run
+    against FakeNSXManager without aiohttp"""
+
+    def __init__(self, http_client):
+        self.http_client = http_client
+
+    def request(self, method, path, body=None, headers=None):
+        future = asyncio.get_event_loop().create_future()
+        future.set_result(self.http_client.request(method, path, body,
+                                                   headers))
+        return future
+
+
+def test_get_edge_id_paginated(manager):
+    """Edges past the first page of the listing are found"""
+    edge = aio.Edge(StubClient(manager.client()))
+    assert _run(edge.get_edge_id("esg-0")) == "edge-1"
+    assert _run(edge.get_edge_id("esg-249")) == "edge-250"
+    assert _run(edge.get_edge_id("unknown")) is None
+    assert manager.stats()['methods'] == {'GET': 1 + 3 + 3}
+
+
+def test_configure_concurrently(manager):
+    """Edge configuration calls can be gathered"""
+    edge = aio.Edge(StubClient(manager.client()))
+
+    async def configure():
+        return await asyncio.gather(*[edge.configure_ha("edge-%d" % index)
+                                      for index in range(1, 11)])
+
+    responses = _run(configure())
+    assert [response.status_code for response in responses] == [204] * 10
+    assert manager.edges['edge-10']['features'][
+        'highavailability/config']['enabled'] == "true"
+
+
+def test_add_firewall_rule(manager):
+    """A rule is added with the ETag of its section"""
+    firewall = aio.FirewallSDK(StubClient(manager.client()))
+    section_id = _run(firewall.get_firewall_section_id("section-0"))
+    response = _run(firewall.add_firewall_rule(section_id, "10.0.0.1",
+                                               "10.0.0.2", "deny"))
+    assert response.status_code == 201
+    assert manager.sections[section_id]['rules'][-1]['action'] == "deny"
+
+
+def test_logical_switches(manager):
+    """Logical switches are created in a transport zone looked up by
+    name"""
+    switches = aio.LogicalSwitchesSDK(StubClient(manager.client()))
+    tz_id = _run(switches.get_transport_zone_id("tz-0"))
+    response = _run(switches.create_logical_switch(tz_id, "ls-new"))
+    assert response.status_code == 201
+    assert len(manager.virtualwires) == 4
+
+
+def test_response_memoized():
+    """The body of a response is decoded once"""
+    response = aio.Response(200, {'ETag': '"1"'}, b'{"a": [1, 2]}', None,
+                            0.1)
+    assert response.data is response.json()
+    assert response.data == {'a': [1, 2]}
+    assert response.text == '{"a": [1, 2]}'
+    assert response.etag == '"1"'
+    assert response.size == 13
+    assert aio.Response(204, {}, b'', None).data is None
+
+
+def test_http_client(manager):
+    """The aiohttp client sends requests to NSX Manager"""
+    pytest.importorskip('aiohttp')
+    http_client = aio.HTTPClient('localhost', 'admin', 'default')
+    http_client.base_url = manager.url
+
+    async def get_edges():
+        async with http_client:
+            return await http_client.request("GET", "/api/4.0/edges")
+
+    response = _run(get_edges())
+    assert response.status_code == 200
+    assert len(response.data['edgePage']['data']) == 100
+    assert http_client.session is None
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""Tests of the token based authentication"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from nsxsdk.auth import TokenAuth
+
+EDGES_PATH = "/api/4.0/edges"
+
+pytestmark = pytest.mark.manager(edges=1)
+
+
+def test_token_reused(manager):
+    """A single token is requested for many requests"""
+    http_client = manager.client(token_auth=TokenAuth())
+    for _ in range(5):
+        assert http_client.request("GET", EDGES_PATH).status_code == 200
+    assert manager.stats()['tokens_issued'] == 1
+
+
+def test_reauthenticated_on_401(manager):
+    """A request rejected with 401 is sent again with a new token"""
+    http_client = manager.client(token_auth=TokenAuth())
+    http_client.request("GET", EDGES_PATH)
+    manager.expire_tokens()
+    manager.reset_stats()
+    response = http_client.request("GET", EDGES_PATH)
+    assert response.status_code == 200
+    stats = manager.stats()
+    assert stats['tokens_issued'] == 1
+    assert stats['methods'] == {'GET': 2, 'POST': 1}
+
+
+class RevokedTokenAuth(TokenAuth):
+
+    """Token cache whose tokens are revoked as soon as they are used"""
+
+    def __init__(self, manager):
+        TokenAuth.__init__(self)
+        self.manager = manager
+
+    def authorization(self, http_client):
+        authorization = TokenAuth.authorization(self, http_client)
+        self.manager.expire_tokens()
+        return authorization
+
+
+def test_reauthenticated_once(manager):
+    """A request rejected again with a new token is not sent a third
+    time"""
+    http_client = manager.client(token_auth=RevokedTokenAuth(manager))
+    response = http_client.request("POST", EDGES_PATH, {})
+    assert response.status_code == 401
+    stats = manager.stats()
+    assert stats['tokens_issued'] == 2
+    # Two token requests and two attempts of the request
+    assert stats['methods'] == {'POST': 4}
+
+
+def test_token_cached_in_file(manager, tmpdir):
+    """A token stored in the cache file is used by the next client"""
+    cache_path = str(tmpdir.join('token.json'))
+    for _ in range(2):
+        http_client = manager.client(
+            token_auth=TokenAuth(cache_path=cache_path))
+        assert http_client.request("GET", EDGES_PATH).status_code == 200
+    assert manager.stats()['tokens_issued'] == 1
+    assert os.stat(cache_path).st_mode & 0o777 == 0o600
+    assert tmpdir.listdir() == [tmpdir.join('token.json')]
+
+
+class BlockingTokenAuth(TokenAuth):
+
+    """Token cache whose token requests wait for an event"""
+
+    def __init__(self, **kwargs):
+        TokenAuth.__init__(self, **kwargs)
+        self.requested = threading.Event()
+        self.release = threading.Event()
+        self.requests = 0
+
+    def _request_token(self, http_client):
+        self.requests += 1
+        self.requested.set()
+        self.release.wait(5)
+        return "token-%d" % self.requests, time.time() + 3600
+
+
+def test_token_requested_once(manager):
+    """Threads needing a token while one is requested wait for it"""
+    token_auth = BlockingTokenAuth()
+    http_client = manager.client(token_auth=token_auth)
+    headers = []
+
+    def authorize():
+        headers.append(token_auth.authorization(http_client))
+
+    threads = [threading.Thread(target=authorize) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    assert token_auth.requested.wait(5)
+    # The token request does not hold the lock of the token state
+    token_auth.invalidate()
+    assert token_auth.expires_at is None
+    token_auth.release.set()
+    for thread in threads:
+        thread.join()
+    assert headers == ["AUTHTOKEN token-1"] * 4
+    assert token_auth.requests == 1
+
+
+def test_refresh_does_not_block(manager):
+    """A valid token is used while its refresh is in flight"""
+    token_auth = BlockingTokenAuth(refresh_margin=3600)
+    http_client = manager.client(token_auth=token_auth)
+    token_auth.release.set()
+    assert token_auth.authorization(http_client) == "AUTHTOKEN token-1"
+    token_auth.release.clear()
+    token_auth.requested.clear()
+    token_auth._refresh_at = 0
+    assert token_auth.authorization(http_client) == "AUTHTOKEN token-1"
+    assert token_auth.requested.wait(5)
+    assert token_auth.authorization(http_client) == "AUTHTOKEN token-1"
+    token_auth.release.set()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Tests of the JSON codecs"""
+
+import pytest
+
+from nsxsdk import codec
+from nsxsdk.codec import JSONCodec
+from nsxsdk.codec import best_codec
+
+EDGES_PATH = "/api/4.0/edges"
+DOCUMENT = {'name': u"édge", 'size': 3, 'flags': [True, None]}
+
+
+class CountingCodec(JSONCodec):
+
+    """Standard library codec counting its calls"""
+
+    def __init__(self):
+        self.dumped = 0
+        self.loaded = 0
+
+    def dumps(self, obj):
+        self.dumped += 1
+        return JSONCodec.dumps(self, obj)
+
+    def loads(self, data):
+        self.loaded += 1
+        return JSONCodec.loads(self, data)
+
+
+def test_json_codec():
+    """Documents are serialized to UTF-8 bytes and decoded from bytes or
+    text"""
+    json_codec = JSONCodec()
+    data = json_codec.dumps(DOCUMENT)
+    assert isinstance(data, bytes)
+    assert json_codec.loads(data) == DOCUMENT
+    assert json_codec.loads(data.decode('utf-8')) == DOCUMENT
+    with pytest.raises(ValueError):
+        json_codec.loads(b'{')
+
+
+def test_orjson_codec():
+    """The orjson codec is interchangeable with the standard one"""
+    pytest.importorskip('orjson')
+    orjson_codec = codec.OrjsonCodec()
+    assert orjson_codec.loads(orjson_codec.dumps(DOCUMENT)) == DOCUMENT
+    assert JSONCodec().loads(orjson_codec.dumps(DOCUMENT)) == DOCUMENT
+    assert best_codec().name == 'orjson'
+
+
+def test_best_codec_fallback(monkeypatch):
+    """The standard library codec is used without orjson"""
+    monkeypatch.setattr(codec, 'orjson', None)
+    assert best_codec().name == 'json'
+    with pytest.raises(ImportError):
+        codec.OrjsonCodec()
+
+
+@pytest.mark.manager(edges=1)
+def test_client_codec(manager):
+    """The client codec serializes request bodies and decodes responses"""
+    client_codec = CountingCodec()
+    http_client = manager.client(codec=client_codec)
+    http_client.request("PUT", EDGES_PATH + "/edge-1/syslog/config",
+                        {'enabled': "true"})
+    http_client.request("PUT", EDGES_PATH + "/edge-1/syslog/config",
+                        b'{"enabled": "false"}')
+    response = http_client.request("GET", EDGES_PATH)
+    response.data
+    response.data
+    assert client_codec.dumped == 1
+    assert client_codec.loaded == 1
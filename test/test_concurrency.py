@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""Tests of the thread pool helper"""
+
+import threading
+import time
+
+import pytest
+
+from nsxsdk.utils import map_concurrently
+
+
+def test_results_in_order():
+    """Results are returned in the order of the items"""
+    def square(value):
+        time.sleep(0.001 * (10 - value))
+        return value * value
+
+    assert map_concurrently(square, range(10), 4) == \
+        [value * value for value in range(10)]
+    assert map_concurrently(square, [], 4) == []
+
+
+def test_progress():
+    """Progress is reported from the calling thread once per item"""
+    calls = []
+    caller = threading.current_thread()
+
+    def progress(done, total, result):
+        assert threading.current_thread() is caller
+        calls.append((done, total))
+
+    map_concurrently(lambda value: value, range(5), 2, progress)
+    assert calls == [(done, 5) for done in range(1, 6)]
+
+
+def test_error_cancels_remaining_calls():
+    """An exception is raised again and the queued calls are not run"""
+    calls = []
+
+    def function(value):
+        calls.append(value)
+        if value == 0:
+            raise ValueError("failed")
+        time.sleep(0.01)
+        return value
+
+    with pytest.raises(ValueError):
+        map_concurrently(function, range(40), 2)
+    time.sleep(0.05)
+    assert len(calls) < 40
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""Tests of the NSX Edge configuration"""
+
+import pytest
+
+from nsxsdk.edge import Edge
+from nsxsdk.edge import LogicalRouter
+from nsxsdk.edge import ServiceGateway
+
+pytestmark = pytest.mark.manager(edges=3)
+
+INTERFACES = [
+    {'interface_type': "internal", 'network_id': "virtualwire-1",
+     'name': "web", 'mtu': 9000,
+     'address_groups': [{'ip_addr': "10.0.0.1", 'netmask': "255.255.255.0",
+                         'secondary_addresses': ["10.0.0.2"]},
+                        {'ip_addr': "10.0.1.1",
+                         'netmask': "255.255.255.0"}]},
+    {'interface_type': "uplink", 'network_id': "dvportgroup-1",
+     'address_groups': [{'ip_addr': "192.168.0.1",
+                         'netmask': "255.255.255.0"}]},
+]
+
+
+@pytest.fixture(name="router_id")
+def router_id_fixture(manager):
+    """Id of a logical router added to the inventory"""
+    return manager._add_edge({'name': "dlr-0", 'type': "distributedRouter"},
+                             deployed=True)['id']
+
+
+def test_interface_edge_type_cached(manager, router_id):
+    """The type of an edge is read once for all its interfaces"""
+    edge = Edge(manager.client())
+    for index in range(3):
+        response = edge.add_interface(router_id, "internal",
+                                      "10.0.%d.1" % index, "255.255.255.0",
+                                      "virtualwire-%d" % index)
+        assert response.status_code == 200
+    assert manager.stats()['methods'] == {'GET': 1, 'POST': 3}
+    assert len(manager.edges[router_id]['interfaces']) == 3
+
+
+def test_interface_edge_type_listed(manager):
+    """The type of the edges listed is reused by add_interface"""
+    edge = Edge(manager.client())
+    list(edge.iter_edges())
+    assert edge.edge_types['edge-1'] == "gatewayServices"
+    manager.reset_stats()
+    edge.add_interface("edge-1", "uplink", "10.0.0.1", "255.255.255.0",
+                       "dvportgroup-1")
+    assert manager.stats()['methods'] == {'POST': 1}
+    assert len(manager.edges['edge-1']['vnics']) == 1
+
+
+def test_add_interfaces(manager, router_id):
+    """Many interfaces are attached with a single request"""
+    edge = Edge(manager.client())
+    response = edge.add_interfaces(router_id, INTERFACES)
+    assert response.status_code == 200
+    assert manager.stats()['methods'] == {'GET': 1, 'POST': 1}
+    web, uplink = manager.edges[router_id]['interfaces']
+    assert web['name'] == "web"
+    assert web['mtu'] == 9000
+    assert web['addressGroups']['addressGroups'] == [
+        {'primaryAddress': "10.0.0.1", 'netmask': "255.255.255.0",
+         'secondaryAddresses': {'ipAddress': ["10.0.0.2"]}},
+        {'primaryAddress': "10.0.1.1", 'netmask': "255.255.255.0"}]
+    assert uplink['type'] == "uplink"
+    assert uplink['mtu'] == 1500
+    assert 'name' not in uplink
+
+
+@pytest.mark.parametrize('sdk_class, kind', [
+    (LogicalRouter, 'interfaces'),
+    (ServiceGateway, 'vnics'),
+])
+def test_add_interfaces_known_type(manager, sdk_class, kind):
+    """Logical routers and service gateways attach interfaces without
+    reading the edge type"""
+    edge = sdk_class(manager.client())
+    edge.add_interfaces("edge-1", INTERFACES)
+    assert manager.stats()['methods'] == {'POST': 1}
+    assert len(manager.edges['edge-1'][kind]) == 2
+
+
+def _bgp_neighbours(manager, edge_id):
+    """BGP neighbours configured on an edge of the stand-in"""
+    bgp = manager.edges[edge_id]['features']['routing/config/bgp']
+    return bgp['bgpNeighbours']['bgpNeighbours']
+
+
+def test_add_bgp_peers(manager):
+    """Peers are added or updated with a single read and write"""
+    edge = Edge(manager.client())
+    edge.add_bgp_peer("edge-1", "10.0.0.1", 65001)
+    manager.reset_stats()
+    response = edge.add_bgp_peers("edge-1", [
+        {'peer_ip': "10.0.0.1", 'peer_as': 65001, 'weight': 10},
+        {'peer_ip': "10.0.0.2", 'peer_as': 65002}])
+    assert response.status_code == 204
+    assert manager.stats()['methods'] == {'GET': 1, 'PUT': 1}
+    assert _bgp_neighbours(manager, "edge-1") == [
+        {'ipAddress': "10.0.0.1", 'remoteAS': "65001", 'weight': "10"},
+        {'ipAddress': "10.0.0.2", 'remoteAS': "65002"}]
+
+
+def test_add_bgp_peers_unchanged(manager):
+    """Nothing is written when the peers are already configured"""
+    edge = Edge(manager.client())
+    peers = [{'peer_ip': "10.0.0.1", 'peer_as': 65001}]
+    edge.add_bgp_peers("edge-1", peers)
+    manager.reset_stats()
+    assert edge.add_bgp_peers("edge-1", peers) is None
+    assert manager.stats()['methods'] == {'GET': 1}
+
+
+def test_remove_bgp_peers(manager):
+    """Listed peers are removed, removing unknown peers writes nothing"""
+    edge = Edge(manager.client())
+    edge.add_bgp_peers("edge-1", [{'peer_ip': "10.0.0.1", 'peer_as': 1},
+                                  {'peer_ip': "10.0.0.2", 'peer_as': 2}])
+    assert edge.remove_bgp_peers("edge-1", ["10.0.0.1"]).status_code == 204
+    assert [neighbour['ipAddress'] for neighbour in
+            _bgp_neighbours(manager, "edge-1")] == ["10.0.0.2"]
+    assert edge.remove_bgp_peers("edge-1", ["10.0.0.9"]) is None
+
+
+def test_set_bgp_peers(manager):
+    """The peers converge to the requested ones, omitted weight and timers
+    are set back to their defaults and filters are kept"""
+    edge = Edge(manager.client())
+    edge.add_bgp_peers("edge-1", [
+        {'peer_ip': "10.0.0.1", 'peer_as': 1, 'weight': 10,
+         'keepalive_timer': 5},
+        {'peer_ip': "10.0.0.2", 'peer_as': 2}])
+    _bgp_neighbours(manager, "edge-1")[0]['bgpFilters'] = {
+        'bgpFilters': [{'direction': "in", 'action': "deny"}]}
+    peers = [{'peer_ip': "10.0.0.1", 'peer_as': 1},
+             {'peer_ip': "10.0.0.3", 'peer_as': 3, 'weight': 20}]
+    assert edge.set_bgp_peers("edge-1", peers).status_code == 204
+    assert _bgp_neighbours(manager, "edge-1") == [
+        {'ipAddress': "10.0.0.1", 'remoteAS': "1", 'weight': "60",
+         'holdDownTimer': "180", 'keepAliveTimer': "60",
+         'bgpFilters': {'bgpFilters': [{'direction': "in",
+                                        'action': "deny"}]}},
+        {'ipAddress': "10.0.0.3", 'remoteAS': "3", 'weight': "20",
+         'holdDownTimer': "180", 'keepAliveTimer': "60"}]
+    assert edge.set_bgp_peers("edge-1", peers) is None
+
+
+@pytest.mark.parametrize('method, argument', [
+    ('add_bgp_peers', [{'peer_ip': "10.0.0.1", 'peer_as': 65000}]),
+    ('remove_bgp_peers', ["10.0.0.1"]),
+    ('set_bgp_peers', []),
+])
+def test_bgp_peers_missing_edge(manager, method, argument):
+    """The failed read of the BGP configuration of a missing edge is
+    returned, nothing is written"""
+    edge = Edge(manager.client())
+    response = getattr(edge, method)("edge-nope", argument)
+    assert response.status_code == 404
+    assert manager.stats()['methods'] == {'GET': 1}
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Tests of the ensure mode of the edge features"""
+
+import pytest
+
+from nsxsdk.edge import Edge
+
+pytestmark = pytest.mark.manager(edges=1)
+
+# Method, arguments, feature written and one of the settings written
+ENSURE_CALLS = [
+    ('ensure_global_routing', ("10.0.0.1",), {'ecmp': True},
+     ('routing/config/global', 'routerId', "10.0.0.1")),
+    ('ensure_bgp', (65000,), {'graceful_restart': True},
+     ('routing/config/bgp', 'localAS', "65000")),
+    ('ensure_syslog', ("10.0.0.2", "udp"), {},
+     ('syslog/config', 'protocol', "udp")),
+    ('ensure_ha', (), {},
+     ('highavailability/config', 'enabled', "true")),
+]
+
+
+def _ensure(manager, edge_id, method, args, kwargs):
+    """Call an ensure method and return its result and the number of
+    configuration writes"""
+    edge = Edge(manager.client())
+    manager.reset_stats()
+    result = getattr(edge, method)(edge_id, *args, **kwargs)
+    return result, manager.stats()['methods'].get('PUT', 0)
+
+
+@pytest.mark.parametrize('method, args, kwargs, written', ENSURE_CALLS)
+def test_first_run(manager, method, args, kwargs, written):
+    """The configuration is written when it differs from the requested
+    one"""
+    result, writes = _ensure(manager, "edge-1", method, args, kwargs)
+    assert result['changes']
+    assert result['response'].status_code == 204
+    assert writes == 1
+    feature, key, value = written
+    assert manager.edges['edge-1']['features'][feature][key] == value
+
+
+@pytest.mark.parametrize('method, args, kwargs, written', ENSURE_CALLS)
+def test_second_run(manager, method, args, kwargs, written):
+    """Nothing is written once the configuration is the requested one"""
+    _ensure(manager, "edge-1", method, args, kwargs)
+    result, writes = _ensure(manager, "edge-1", method, args, kwargs)
+    assert result == {'changes': [], 'response': None}
+    assert writes == 0
+
+
+@pytest.mark.parametrize('method, args, kwargs, written', ENSURE_CALLS)
+def test_missing_edge(manager, method, args, kwargs, written):
+    """The failed read is returned and nothing is written"""
+    result, writes = _ensure(manager, "edge-99", method, args, kwargs)
+    assert result['changes'] is None
+    assert result['response'].status_code == 404
+    assert writes == 0
+
+
+def test_empty_configuration(manager):
+    """A configuration read with an empty body is not written"""
+    manager._get_feature = lambda **kwargs: (200, None, None)
+    result, writes = _ensure(manager, "edge-1", 'ensure_syslog',
+                             ("10.0.0.2", "udp"), {})
+    assert result['changes'] is None
+    assert writes == 0
+
+
+def test_unmanaged_settings_kept(manager):
+    """Settings which are not managed by the SDK are written back"""
+    edge = Edge(manager.client())
+    edge.add_bgp_peer("edge-1", "10.0.0.3", 65001)
+    result = edge.ensure_bgp("edge-1", 65000)
+    assert [change[0] for change in result['changes']] == ['enabled',
+                                                           'localAS']
+    bgp = manager.edges['edge-1']['features']['routing/config/bgp']
+    assert bgp['localAS'] == "65000"
+    assert len(bgp['bgpNeighbours']['bgpNeighbours']) == 1
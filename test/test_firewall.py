@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""Tests of the conditional reads and writes of the distributed firewall"""
+
+import pytest
+
+from nsxsdk.exceptions import UnexpectedResponse
+from nsxsdk.firewall import FirewallSDK
+
+SECTION_ID = 1000
+
+pytestmark = pytest.mark.manager(sections=1, rules_per_section=2)
+
+
+def _record_statuses(http_client):
+    """Collect the status codes of the responses received by a client"""
+    statuses = []
+    http_client.add_hook(
+        'after_response', lambda method, path, status_code, *args:
+        statuses.append((method, status_code)))
+    return statuses
+
+
+def test_config_revalidated(manager):
+    """The cached configuration is revalidated with If-None-Match"""
+    http_client = manager.client()
+    statuses = _record_statuses(http_client)
+    firewall = FirewallSDK(http_client, cache_config=True)
+    config = firewall.get_firewall_config()
+    assert firewall.get_firewall_config() == config
+    assert statuses == [("GET", 200), ("GET", 304)]
+
+
+def test_cached_config_copied(manager):
+    """Changes made to a returned configuration do not alter the cache"""
+    firewall = FirewallSDK(manager.client(), cache_config=True)
+    config = firewall.get_firewall_config()
+    config['layer3Sections']['layer3Sections'][0]['name'] = "renamed"
+    assert firewall.get_firewall_section_id("section-0") == SECTION_ID
+    config = firewall.get_firewall_config()
+    assert config['layer3Sections']['layer3Sections'][0]['name'] == \
+        "section-0"
+
+
+def test_config_modified(manager):
+    """A configuration modified on NSX Manager is downloaded again"""
+    firewall = FirewallSDK(manager.client(), cache_config=True)
+    firewall.get_firewall_config()
+    firewall.add_firewall_section("new-section")
+    assert firewall.get_firewall_section_id("new-section") is not None
+
+
+def test_config_not_cached(manager):
+    """Without cache_config, the configuration is always downloaded"""
+    http_client = manager.client()
+    statuses = _record_statuses(http_client)
+    firewall = FirewallSDK(http_client)
+    firewall.get_firewall_config()
+    firewall.get_firewall_config()
+    assert statuses == [("GET", 200), ("GET", 200)]
+
+
+def test_write_retried_on_conflict(manager):
+    """A write rejected with 412 is applied again on the fresh section"""
+    firewall = FirewallSDK(manager.client(), conflict_backoff=0)
+    other = FirewallSDK(manager.client())
+    calls = []
+
+    def mutation(section):
+        calls.append(len(section['rules']))
+        if len(calls) == 1:
+            # Another client modifies the section in between
+            other.add_firewall_rule(SECTION_ID, "10.0.0.1", "10.0.0.2",
+                                    "deny")
+        section['rules'].append({'name': "mine", 'action': "allow"})
+
+    response = firewall.update_firewall_section(SECTION_ID, mutation)
+    assert response.status_code == 200
+    assert calls == [2, 3]
+    rules = manager.sections[SECTION_ID]['rules']
+    assert len(rules) == 4
+    assert rules[-1]['name'] == "mine"
+    assert firewall.conflict_stats() == {'conflicts': 1, 'retries': 1}
+
+
+def test_write_gives_up(manager):
+    """The last 412 response is returned once the attempts are exhausted"""
+    firewall = FirewallSDK(manager.client(), conflict_attempts=3,
+                           conflict_backoff=0)
+    other = FirewallSDK(manager.client())
+
+    def mutation(section):
+        other.add_firewall_rule(SECTION_ID, "10.0.0.1", "10.0.0.2", "deny")
+        section['rules'] = []
+
+    response = firewall.update_firewall_section(SECTION_ID, mutation)
+    assert response.status_code == 412
+    assert firewall.conflict_stats() == {'conflicts': 3, 'retries': 2}
+    assert len(manager.sections[SECTION_ID]['rules']) == 5
+
+
+def test_add_rules_single_write(manager):
+    """Many rules are added with one read and one write of the section"""
+    firewall = FirewallSDK(manager.client())
+    rules = [{'source_ip': "10.0.0.%d" % index,
+              'destination_ip': "10.0.1.%d" % index,
+              'action': "allow"} for index in range(50)]
+    manager.reset_stats()
+    response = firewall.add_firewall_rules(SECTION_ID, rules)
+    assert response.status_code == 200
+    assert manager.stats()['methods'] == {'GET': 1, 'PUT': 1}
+    assert len(manager.sections[SECTION_ID]['rules']) == 52
+
+
+def test_replace_rules(manager):
+    """The rules of a section can be replaced as a whole"""
+    firewall = FirewallSDK(manager.client())
+    rules = [{'source_ip': "10.0.0.1", 'destination_ip': "10.0.0.2",
+              'action': "deny"}]
+    firewall.add_firewall_rules(SECTION_ID, rules, replace=True)
+    rules = manager.sections[SECTION_ID]['rules']
+    assert [rule['action'] for rule in rules] == ["deny"]
+
+
+def _fail(section):
+    """Mutation which must not be applied"""
+    raise AssertionError("mutation applied to %r" % section)
+
+
+@pytest.mark.parametrize('write', [
+    lambda firewall: firewall.update_firewall_section(99999, _fail),
+    lambda firewall: firewall.add_firewall_rule(99999, "10.0.0.1",
+                                                "10.0.0.2", "deny"),
+    lambda firewall: firewall.add_firewall_rules(99999, []),
+])
+def test_write_missing_section(manager, write):
+    """The failed read of a missing section is returned, nothing is
+    written"""
+    response = write(FirewallSDK(manager.client()))
+    assert response.status_code == 404
+    assert manager.stats()['methods'] == {'GET': 1}
+
+
+def test_write_without_etag(manager, monkeypatch):
+    """A section read without ETag raises UnexpectedResponse"""
+    get_section = manager._get_section
+    monkeypatch.setattr(manager, '_get_section', lambda *args, **kwargs:
+                        get_section(*args, **kwargs)[:2] + (None,))
+    firewall = FirewallSDK(manager.client())
+    with pytest.raises(UnexpectedResponse) as error:
+        firewall.update_firewall_section(SECTION_ID, _fail)
+    assert error.value.status_code == 200
+    assert manager.stats()['methods'] == {'GET': 1}
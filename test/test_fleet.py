@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Tests of the fleet executor"""
+
+import threading
+
+import pytest
+
+from nsxsdk.edge import Edge
+from nsxsdk.fleet import Fleet
+
+pytestmark = pytest.mark.manager(edges=20)
+
+EDGE_IDS = ["edge-%d" % index for index in range(1, 21)]
+
+
+def test_run_method(manager):
+    """An Edge method is run on every edge, with its extra arguments"""
+    fleet = Fleet(Edge(manager.client()), concurrency=5)
+    result = fleet.run(EDGE_IDS, 'configure_syslog', "10.0.0.1", "udp")
+    assert [item.edge_id for item in result.results] == EDGE_IDS
+    assert all(item.result.status_code == 204 for item in result.results)
+    stats = result.stats()
+    assert stats['total'] == stats['succeeded'] == 20
+    assert stats['failed'] == 0
+    assert manager.edges['edge-20']['features']['syslog/config'][
+        'protocol'] == "udp"
+
+
+def test_bounded_concurrency(manager):
+    """No more than concurrency operations are in flight"""
+    lock = threading.Lock()
+    state = {'in_flight': 0, 'peak': 0}
+
+    def operation(edge_id):
+        with lock:
+            state['in_flight'] += 1
+            state['peak'] = max(state['peak'], state['in_flight'])
+        threading.Event().wait(0.01)
+        with lock:
+            state['in_flight'] -= 1
+
+    Fleet(Edge(manager.client()), concurrency=4).run(EDGE_IDS, operation)
+    assert 1 < state['peak'] <= 4
+
+
+def test_failures_recorded(manager):
+    """Exceptions and error responses fail their edge only"""
+    def operation(edge_id):
+        if edge_id == "edge-3":
+            raise ValueError("broken")
+        return Edge(manager.client()).configure_ha(edge_id)
+
+    result = Fleet(Edge(manager.client())).run(EDGE_IDS + ["edge-99"],
+                                               operation)
+    failed = dict((item.edge, item) for item in result.failed)
+    assert sorted(failed) == ["edge-3", "edge-99"]
+    assert isinstance(failed["edge-3"].exception, ValueError)
+    assert failed["edge-99"].result.status_code == 404
+    assert len(result.succeeded) == 19
+
+
+def test_run_by_name(manager):
+    """Edge names are resolved with a single listing"""
+    fleet = Fleet(Edge(manager.client()))
+    result = fleet.run(["esg-0", "esg-19", "unknown"], 'configure_ha',
+                       by_name=True)
+    assert [item.edge_id for item in result.results] == \
+        ["edge-1", "edge-20", None]
+    assert isinstance(result.results[2].exception, LookupError)
+    assert manager.stats()['methods'] == {'GET': 1, 'PUT': 2}
+
+
+def test_progress(manager):
+    """Progress is reported once per edge"""
+    calls = []
+    Fleet(Edge(manager.client())).run(
+        EDGE_IDS, lambda edge_id: edge_id,
+        progress=lambda done, total, item: calls.append((done, total)))
+    assert calls == [(done, 20) for done in range(1, 21)]
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+"""Tests of the HTTP client"""
+
+import threading
+import time
+
+import pytest
+
+from nsxsdk.ratelimit import RateController
+
+EDGES_PATH = "/api/4.0/edges"
+
+pytestmark = pytest.mark.manager(edges=1)
+
+
+def _run_threads(count, target):
+    """Run a function from several threads and wait for them"""
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_session_per_thread(manager):
+    """Each thread uses its own session, configured from client.session"""
+    http_client = manager.client()
+    http_client.session.headers['X-Test'] = "1"
+    sessions = []
+
+    def request():
+        http_client.request("GET", EDGES_PATH)
+        sessions.append(http_client.local_session())
+
+    _run_threads(4, request)
+    assert len(set(id(session) for session in sessions)) == 4
+    assert all(session.headers['X-Test'] == "1" for session in sessions)
+    assert all(session.auth == ('admin', 'default') for session in sessions)
+
+
+def test_session_replaced(manager):
+    """A replacement of client.session applies to the next requests"""
+    http_client = manager.client()
+    http_client.request("GET", EDGES_PATH)
+    session = http_client.local_session()
+    http_client.session = http_client._initialize_session()
+    http_client.session.verify = True
+    assert http_client.local_session() is not session
+    assert http_client.local_session().verify is True
+
+
+def test_connections_reused(manager):
+    """Sequential requests reuse a single connection"""
+    http_client = manager.client()
+    for _ in range(5):
+        http_client.request("GET", EDGES_PATH)
+    assert http_client.pool_stats() == {'opened': 1, 'reused': 4,
+                                        'waited': 0}
+
+
+def test_pool_shared_by_threads(manager):
+    """Threads share the connection pool, up to pool_maxsize connections"""
+    manager.latency = 0.05
+    http_client = manager.client(pool_maxsize=2, pool_block=True)
+
+    def request():
+        for _ in range(3):
+            http_client.request("GET", EDGES_PATH)
+
+    _run_threads(4, request)
+    stats = http_client.pool_stats()
+    assert stats['opened'] == 2
+    assert stats['reused'] == 10
+    assert stats['waited'] > 0
+
+
+def test_hooks(manager):
+    """Hooks receive the request and response sizes and the duration"""
+    http_client = manager.client()
+    calls = []
+    http_client.add_hook('before_request',
+                         lambda *args: calls.append(('before',) + args))
+    http_client.add_hook('after_response',
+                         lambda *args: calls.append(('after',) + args))
+    http_client.request("POST", EDGES_PATH, b'{"name": "esg-new"}')
+    before, after = calls
+    assert before == ('before', "POST", EDGES_PATH, 19)
+    assert after[:5] == ('after', "POST", EDGES_PATH, 201, 19)
+    assert after[5] == 0
+    assert after[6] >= 0
+
+
+def test_hook_added_during_request(manager):
+    """A hook registered while a request is in flight is only called for
+    the next requests"""
+    http_client = manager.client()
+    calls = []
+
+    def after_response(*args):
+        calls.append(args)
+
+    def before_request(*args):
+        if not calls and after_response not in \
+                http_client.hooks['after_response']:
+            http_client.add_hook('after_response', after_response)
+
+    http_client.add_hook('before_request', before_request)
+    assert http_client.request("GET", EDGES_PATH).status_code == 200
+    assert not calls
+    http_client.request("GET", EDGES_PATH)
+    assert len(calls) == 1
+
+
+def test_duration_excludes_pacing(manager):
+    """The duration of a request does not include the rate limit wait"""
+    http_client = manager.client(rate_limits=RateController(rate=2,
+                                                            burst=1))
+    durations = []
+    http_client.add_hook('after_response',
+                         lambda *args: durations.append(args[-1]))
+    start = time.time()
+    for _ in range(2):
+        http_client.request("GET", EDGES_PATH)
+    assert time.time() - start >= 0.4
+    assert max(durations) < 0.3
+
+
+def test_slot_released_on_hook_error(manager):
+    """The concurrency slot of a request is given back when a hook
+    raises"""
+    controller = RateController(concurrency=1)
+    http_client = manager.client(rate_limits=controller)
+
+    def after_response(*args):
+        raise RuntimeError("hook failed")
+
+    http_client.add_hook('after_response', after_response)
+    with pytest.raises(RuntimeError):
+        http_client.request("GET", EDGES_PATH)
+    assert controller.stats()['in_flight'] == 0
+    http_client.remove_hook('after_response', after_response)
+    assert http_client.request("GET", EDGES_PATH).status_code == 200
+
+
+def test_response_memoized(manager):
+    """The body of a response is decoded once"""
+    response = manager.client().request("GET", EDGES_PATH)
+    assert response.data is response.data
+    assert response.json() is response.data
+    assert response.text is response.text
+    assert response.data['edgePage']['pagingInfo']['totalCount'] == 1
+    assert response.size == len(response.content)
+    assert response.duration > 0
+
+
+def test_response_empty_body(manager):
+    """An empty body is decoded as None"""
+    response = manager.client().request(
+        "PUT", EDGES_PATH + "/edge-1/highavailability/config",
+        {'enabled': "true"})
+    assert response.status_code == 204
+    assert response.data is None
+    assert response.size == 0
+
+
+def test_response_invalid_json(manager):
+    """A body which is not JSON raises ValueError when decoded"""
+    response = manager.client().request(
+        "POST", "/api/2.0/vdn/scopes/vdnscope-1/virtualwires",
+        {'name': "ls-new"})
+    assert response.text == "virtualwire-5000"
+    with pytest.raises(ValueError):
+        response.data
+
+
+def test_streamed_response_size(manager):
+    """The size of a streamed body is known before it is read"""
+    response = manager.client().request("GET", EDGES_PATH, stream=True)
+    size = int(response.headers['Content-Length'])
+    assert response.size == size
+    assert len(response.content) == size
+    assert response.size == size
+
+
+def test_text_body_bytes(manager):
+    """Text bodies are sent and measured as UTF-8"""
+    http_client = manager.client()
+    sizes = []
+    http_client.add_hook('before_request',
+                         lambda *args: sizes.append(args[-1]))
+    body = u'{"name": "esg-été"}'
+    response = http_client.request("POST", EDGES_PATH, body)
+    assert response.status_code == 201
+    assert sizes == [len(body.encode('utf-8'))]
+    assert sizes[0] > len(body)
+    assert manager.edges[response.headers['Location'].split('/')[-1]][
+        'name'] == u"esg-été"
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""Tests of the edge deployment tracking"""
+
+import time
+
+import pytest
+
+from nsxsdk.edge import ServiceGateway
+from nsxsdk.exceptions import DeploymentFailed
+from nsxsdk.exceptions import DeploymentTimeout
+from nsxsdk.jobs import DeploymentJob
+from nsxsdk.jobs import DeploymentPoller
+from nsxsdk.jobs import as_completed
+
+INTERVAL = 0.01
+
+
+class StubResponse(object):
+
+    """Status response whose body is decoded from a JSON value, or raises
+    ValueError if it is not valid JSON"""
+
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    @property
+    def data(self):
+        if isinstance(self._data, Exception):
+            raise self._data
+        return self._data
+
+
+class StubClient(object):
+
+    """HTTP client answering each status path with a list of responses,
+    the last one being repeated"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.polls = dict((path, 0) for path in responses)
+
+    def request(self, method, path):
+        responses = self.responses[path]
+        index = min(self.polls[path], len(responses) - 1)
+        self.polls[path] += 1
+        return StubResponse(*responses[index])
+
+
+def _job(name, edge_id=None, job_id=None):
+    """Deployment of an edge followed through its status path"""
+    job = DeploymentJob(name, None, edge_id, job_id)
+    job.status_path = name
+    return job
+
+
+def _wait_stopped(poller):
+    """Wait for the thread of a poller to exit"""
+    deadline = time.time() + 5
+    while poller._thread is not None and time.time() < deadline:
+        time.sleep(INTERVAL)
+    assert poller._thread is None
+
+
+@pytest.mark.manager(deploy_polls=2)
+def test_deployment_succeeded(manager):
+    """The id of a deployed edge is returned once it is ready"""
+    poller = DeploymentPoller(manager.client(), interval=INTERVAL)
+    edge = ServiceGateway(manager.client(), poller=poller)
+    job = edge.create_edge("esg-new", "compact", "datacenter-1",
+                           "resgroup-1", "datastore-1")
+    assert job.status_code == 201
+    assert job.result(timeout=5) == "edge-1"
+    assert job.status == "GREEN"
+    assert manager.stats()['methods']['GET'] == 3
+
+
+def test_deployment_failed():
+    """A job failing on NSX Manager raises DeploymentFailed"""
+    client = StubClient({'esg': [(200, {'status': "RUNNING"}),
+                                 (200, {'status': "FAILED"})]})
+    job = _job('esg', job_id="jobdata-1")
+    DeploymentPoller(client, interval=INTERVAL).add(job)
+    with pytest.raises(DeploymentFailed):
+        job.result(timeout=5)
+    assert job.status == "FAILED"
+
+
+def test_job_result():
+    """The edge id is read from the result of a completed job"""
+    client = StubClient({'esg': [(200, {
+        'status': "COMPLETED",
+        'result': [{'key': "edgeId", 'value': "edge-7"}]})]})
+    job = _job('esg', job_id="jobdata-1")
+    DeploymentPoller(client, interval=INTERVAL).add(job)
+    assert job.result(timeout=5) == "edge-7"
+
+
+@pytest.mark.parametrize('bad_response', [
+    (200, ValueError("No JSON object could be decoded")),
+    (200, None),
+    (200, ["GREEN"]),
+    (500, {'errorCode': 500}),
+])
+def test_bad_status_response(bad_response):
+    """A status response which can not be read only fails that poll"""
+    client = StubClient({'bad': [bad_response, bad_response,
+                                 (200, {'edgeStatus': "GREEN"})],
+                         'good': [(200, {'edgeStatus': "GREEN"})]})
+    poller = DeploymentPoller(client, interval=INTERVAL)
+    bad, good = _job('bad', "edge-1"), _job('good', "edge-2")
+    poller.add(bad)
+    poller.add(good)
+    assert good.result(timeout=5) == "edge-2"
+    assert bad.result(timeout=5) == "edge-1"
+    assert client.polls['bad'] == 3
+
+
+def test_added_after_thread_stopped():
+    """Jobs added once the polling thread exited are followed"""
+    client = StubClient({'first': [(200, {'edgeStatus': "GREEN"})],
+                         'second': [(200, {'edgeStatus': "GREY"}),
+                                    (200, {'edgeStatus': "GREEN"})]})
+    poller = DeploymentPoller(client, interval=INTERVAL)
+    first = _job('first', "edge-1")
+    poller.add(first)
+    first.wait(5)
+    _wait_stopped(poller)
+    second = _job('second', "edge-2")
+    poller.add(second)
+    assert second.result(timeout=5) == "edge-2"
+
+
+def test_callback_error():
+    """A done callback raising does not stop the polling thread"""
+    client = StubClient({'first': [(200, {'edgeStatus': "GREEN"})],
+                         'second': [(200, {'edgeStatus': "GREY"}),
+                                    (200, {'edgeStatus': "GREEN"})]})
+    poller = DeploymentPoller(client, interval=INTERVAL)
+    first, second = _job('first', "edge-1"), _job('second', "edge-2")
+
+    def callback(job):
+        raise RuntimeError("callback failed")
+
+    first.add_done_callback(callback)
+    poller.add(first)
+    poller.add(second)
+    assert second.result(timeout=5) == "edge-2"
+    assert first.done()
+
+
+def test_as_completed():
+    """Deployments are returned in completion order"""
+    client = StubClient({'slow': [(200, {'edgeStatus': "GREY"})] * 3 +
+                                 [(200, {'edgeStatus': "GREEN"})],
+                         'fast': [(200, {'edgeStatus': "GREEN"})]})
+    poller = DeploymentPoller(client, interval=INTERVAL)
+    slow, fast = _job('slow', "edge-1"), _job('fast', "edge-2")
+    poller.add(slow)
+    poller.add(fast)
+    assert list(as_completed([slow, fast], timeout=5)) == [fast, slow]
+
+
+def test_as_completed_timeout():
+    """DeploymentTimeout is raised when deployments do not complete"""
+    client = StubClient({'slow': [(200, {'edgeStatus': "GREY"})]})
+    job = _job('slow', "edge-1")
+    DeploymentPoller(client, interval=INTERVAL).add(job)
+    with pytest.raises(DeploymentTimeout):
+        list(as_completed([job], timeout=0.05))
+    job.finish()
+
+
+@pytest.mark.parametrize('response', [
+    (200, {'edgeStatus': "GREY"}),
+    (500, {'errorCode': 500}),
+])
+def test_deployment_given_up(response):
+    """A deployment still pending once the poller timeout expired fails
+    with DeploymentTimeout, and the polling thread stops"""
+    client = StubClient({'stuck': [response],
+                         'good': [(200, {'edgeStatus': "GREEN"})]})
+    poller = DeploymentPoller(client, interval=INTERVAL, max_interval=1,
+                              timeout=0.2)
+    stuck, good = _job('stuck', "edge-1"), _job('good', "edge-2")
+    poller.add(stuck)
+    poller.add(good)
+    assert good.result(timeout=5) == "edge-2"
+    start = time.time()
+    with pytest.raises(DeploymentTimeout):
+        stuck.result(timeout=5)
+    # The deadline does not wait for the next poll
+    assert time.time() - start < 0.5
+    assert list(as_completed([stuck, good], timeout=0)) == [stuck, good]
+    _wait_stopped(poller)
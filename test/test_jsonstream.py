@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Tests of the incremental JSON parser"""
+
+import json
+
+import pytest
+
+from nsxsdk.jsonstream import iter_json_items
+
+DOCUMENT = {
+    'generationNumber': 12,
+    'timestamp': 1234567890123,
+    'contextId': {'nested': [[1, 2], {'deep': {'deeper': [True, None]}}]},
+    'layer3Sections': {
+        'type': "LAYER3",
+        'layer3Sections': [
+            {'id': 1000, 'name': u"séction-0", 'rules': []},
+            {'id': 1001, 'name': "section-1",
+             'rules': [{'id': 1, 'value': -1.5e3}]},
+        ],
+    },
+    'tail': "ignored",
+}
+PATH = ['layer3Sections', 'layer3Sections']
+
+
+def _chunks(document, size):
+    """Split the UTF-8 encoded JSON document in chunks of size bytes"""
+    data = json.dumps(document, ensure_ascii=False).encode('utf-8')
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('size', [1, 3, 7, 64, 100000])
+def test_items_decoded(size):
+    """The items are decoded whatever the chunk boundaries"""
+    items = list(iter_json_items(_chunks(DOCUMENT, size), PATH))
+    assert items == DOCUMENT['layer3Sections']['layer3Sections']
+
+
+def test_text_chunks():
+    """Text chunks are parsed like bytes chunks"""
+    text = json.dumps(DOCUMENT)
+    items = list(iter_json_items([text[:10], text[10:]], PATH))
+    assert [item['id'] for item in items] == [1000, 1001]
+
+
+def test_number_split():
+    """A number split across chunks is decoded whole"""
+    items = list(iter_json_items([b'{"a": [12', b'34, 5', b'6]}'], ['a']))
+    assert items == [1234, 56]
+
+
+@pytest.mark.parametrize('document', [
+    {},
+    {'layer3Sections': {}},
+    {'layer3Sections': {'layer3Sections': []}},
+    {'layer3Sections': {'layer3Sections': None}},
+    {'other': 1},
+])
+def test_missing_path(document):
+    """Nothing is returned when the path leads to no array"""
+    assert not list(iter_json_items(_chunks(document, 5), PATH))
+
+
+def test_stops_reading():
+    """Chunks after the item found are not read"""
+    read = []
+
+    def chunks():
+        for chunk in _chunks(DOCUMENT, 8):
+            read.append(chunk)
+            yield chunk
+
+    items = iter_json_items(chunks(), PATH)
+    assert next(items)['id'] == 1000
+    items.close()
+    assert len(read) < len(_chunks(DOCUMENT, 8))
+
+
+@pytest.mark.parametrize('data, path', [
+    (b'{"layer3Sections": {"layer3Sections": [{"id": 1}', PATH),
+    (b'{"layer3Sections": [1 2]}', PATH[:1]),
+    (b'["layer3Sections"]', PATH),
+])
+def test_invalid_document(data, path):
+    """Invalid or truncated documents raise ValueError"""
+    with pytest.raises(ValueError):
+        list(iter_json_items([data], path))
+
+
+@pytest.mark.parametrize('size', [1, 5, 100000])
+def test_siblings(size):
+    """Keys next to the array are decoded, before and after it"""
+    document = {'page': {'before': {'a': [1]}, 'data': [1, 2],
+                         'skipped': [3], 'after': "x"}}
+    siblings = {'before': None, 'after': None, 'missing': None}
+    data = json.dumps(document).encode('utf-8')
+    chunks = [data[index:index + size] for index in range(0, len(data), size)]
+    assert list(iter_json_items(chunks, ['page', 'data'], siblings)) == [1, 2]
+    assert siblings == {'before': {'a': [1]}, 'after': "x", 'missing': None}
+
+
+def test_siblings_truncated():
+    """A document truncated after the array raises ValueError"""
+    with pytest.raises(ValueError):
+        list(iter_json_items([b'{"a": [1], "b": '], ['a'], {'b': None}))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Tests of the logical switches"""
+
+import pytest
+
+from nsxsdk.logicalswitches import LogicalSwitchesSDK
+
+pytestmark = pytest.mark.manager(scopes=2)
+
+
+def test_scope_index(manager):
+    """Transport zones are looked up from a single listing"""
+    switches = LogicalSwitchesSDK(manager.client(), cache_ttl=60)
+    assert switches.get_transport_zone_id("tz-0") == "vdnscope-1"
+    assert switches.get_transport_zone_id("tz-1") == "vdnscope-2"
+    assert switches.get_transport_zone_id("unknown") is None
+    assert manager.stats()['methods'] == {'GET': 1}
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_scope_lookup(manager, stream):
+    """Without the index, transport zones are looked up from a listing"""
+    switches = LogicalSwitchesSDK(manager.client())
+    assert switches.get_transport_zone_id("tz-1", stream) == "vdnscope-2"
+    assert switches.get_transport_zone_id("unknown", stream) is None
+
+
+def test_create_logical_switches(manager):
+    """Logical switches are created concurrently, in the order given"""
+    switches = LogicalSwitchesSDK(manager.client(pool_maxsize=5))
+    names = ["ls-%d" % index for index in range(20)]
+    results = switches.create_logical_switches("vdnscope-1", names,
+                                               concurrency=5)
+    assert [result.name for result in results] == names
+    assert all(result.succeeded for result in results)
+    created = dict((result.ls_id, result.name) for result in results)
+    assert dict((ls_id, manager.virtualwires[ls_id]['name'])
+                for ls_id in created) == created
+
+
+def test_create_failures_recorded(manager):
+    """A failed creation is recorded in its result"""
+    switches = LogicalSwitchesSDK(manager.client())
+    results = switches.create_logical_switches("vdnscope-9", ["ls-0"])
+    assert not results[0].succeeded
+    assert results[0].response.status_code == 404
+    assert not manager.virtualwires
+
+
+@pytest.mark.manager(scopes=2, virtualwires=10)
+@pytest.mark.parametrize('cache_ttl', [None, 60])
+def test_logical_switch_lookup(manager, cache_ttl):
+    """Logical switches are looked up by name and tenant"""
+    switches = LogicalSwitchesSDK(manager.client(), cache_ttl=cache_ttl)
+    assert switches.get_logical_switch_id("ls-9") == "virtualwire-5009"
+    assert switches.get_logical_switch_id("ls-9", "other") is None
+    assert switches.get_logical_switch_id("unknown") is None
+
+
+@pytest.mark.manager(scopes=2, virtualwires=10)
+def test_logical_switch_index(manager):
+    """The index is loaded once and kept up to date by creations and
+    deletions"""
+    switches = LogicalSwitchesSDK(manager.client(), cache_ttl=60)
+    switches.get_logical_switch_id("ls-0")
+    response = switches.create_logical_switch("vdnscope-1", "ls-new")
+    assert switches.get_logical_switch_id("ls-new") == response.text
+    switches.delete_logical_switch("virtualwire-5000")
+    assert switches.get_logical_switch_id("ls-0") is None
+    assert manager.stats()['methods'] == {'GET': 1, 'POST': 1,
+                                          'DELETE': 1}
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""Tests of the compact model objects"""
+
+import pytest
+
+from nsxsdk import models
+from nsxsdk.firewall import FirewallSDK
+from nsxsdk.testing import _create_rule
+
+INTERFACE = {
+    'index': 2, 'name': "web", 'type': "internal", 'mtu': 1500,
+    'connectedToId': "virtualwire-1", 'isConnected': "true",
+    'addressGroups': {'addressGroups': [
+        {'primaryAddress': "10.0.0.1", 'netmask': "255.255.255.0",
+         'secondaryAddresses': {'ipAddress': ["10.0.0.2"]}},
+        {'primaryAddress': "10.0.1.1", 'netmask': "255.255.255.0"}]},
+}
+VIRTUALWIRE = {'objectId': "virtualwire-1", 'name': "ls-0",
+               'tenantId': "default", 'vdnScopeId': "vdnscope-1",
+               'controlPlaneMode': "UNICAST_MODE"}
+
+
+def test_slots_only():
+    """Models only hold the attributes of their slots"""
+    edge = models.Edge(id="edge-1", name="esg-0")
+    assert not hasattr(edge, '__dict__')
+    assert edge.type is None
+    with pytest.raises(AttributeError):
+        edge.other = 1
+    with pytest.raises(TypeError):
+        models.Edge(other=1)
+
+
+def test_equality():
+    """Models compare by value"""
+    assert models.Edge(id="edge-1") == models.Edge(id="edge-1")
+    assert models.Edge(id="edge-1") != models.Edge(id="edge-2")
+    assert models.Edge(id="edge-1") != models.VirtualWire(id="edge-1")
+    assert repr(models.Edge(id="edge-1")) == "Edge(id='edge-1')"
+
+
+def test_edge_summary():
+    """Edges are read from the listing summary"""
+    edge = models.Edge.from_nsx({
+        'objectId': "edge-1", 'name': "esg-0", 'edgeType': "gatewayServices",
+        'edgeStatus': "GREEN", 'state': "deployed",
+        'appliancesSummary': {'applianceSize': "compact"}})
+    assert edge == models.Edge(id="edge-1", name="esg-0",
+                               type="gatewayServices", status="GREEN",
+                               state="deployed", appliance_size="compact")
+    assert edge.to_nsx() == {'id': "edge-1", 'name': "esg-0",
+                             'type': "gatewayServices",
+                             'appliances': {'applianceSize': "compact"}}
+
+
+@pytest.mark.parametrize('model_class, data', [
+    (models.Interface, INTERFACE),
+    (models.VirtualWire, VIRTUALWIRE),
+    (models.BgpNeighbour, {'ipAddress': "10.0.0.1", 'remoteAS': "65001",
+                           'weight': "60", 'holdDownTimer': "180",
+                           'keepAliveTimer': "60"}),
+])
+def test_round_trip(model_class, data):
+    """Models are converted back to the NSX representation they were read
+    from"""
+    assert model_class.from_nsx(data).to_nsx() == data
+
+
+def test_interface():
+    """Address groups are kept as tuples"""
+    interface = models.Interface.from_nsx(INTERFACE)
+    assert interface.address_groups == (
+        ("10.0.0.1", "255.255.255.0", ("10.0.0.2",)),
+        ("10.0.1.1", "255.255.255.0", None))
+    assert interface.is_connected is True
+
+
+def test_rule_round_trip():
+    """Rules keep the keys which are not modelled and encode their flags
+    as NSX does"""
+    data = _create_rule(7, 7)
+    data.update({'direction': "inout", 'packetType': "any",
+                 'disabled': False, 'logged': "true"})
+    rule = models.FirewallRule.from_nsx(data)
+    assert rule.extra == {'direction': "inout", 'packetType': "any"}
+    assert rule.sources == (("Ipv4Address", "10.0.7.1", None),)
+    assert rule.logged is True
+    expected = dict(data, disabled="false")
+    assert rule.to_nsx() == expected
+
+
+@pytest.mark.manager(sections=2, rules_per_section=3)
+def test_firewall_sections(manager):
+    """Firewall sections are read as models"""
+    sections = FirewallSDK(manager.client()).get_firewall_sections()
+    assert [section.name for section in sections] == ["section-0",
+                                                      "section-1"]
+    assert all(isinstance(rule, models.FirewallRule)
+               for rule in sections[1].rules)
+    assert sections[1].to_nsx()['rules'] == manager.sections[1001]['rules']
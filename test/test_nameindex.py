@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""Tests of the name to id index"""
+
+import threading
+import time
+
+import pytest
+
+from nsxsdk.edge import Edge
+from nsxsdk.utils import NameIndex
+
+
+class Loader(object):
+
+    """Index loader counting its calls"""
+
+    def __init__(self, ids=None, delay=0):
+        self.ids = ids if ids is not None else {'a': "id-a"}
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return dict(self.ids)
+
+
+def test_loaded_once_within_ttl():
+    """The index is loaded on first lookup and kept until its TTL"""
+    loader = Loader()
+    index = NameIndex(loader, ttl=60)
+    assert index.get('a') == "id-a"
+    assert index.get('b') is None
+    assert loader.calls == 1
+
+
+def test_reloaded_once_expired():
+    """An expired index is reloaded on next lookup"""
+    loader = Loader()
+    index = NameIndex(loader, ttl=0)
+    index.get('a')
+    loader.ids['b'] = "id-b"
+    assert index.get('b') == "id-b"
+    assert loader.calls == 2
+
+
+def test_invalidate_and_refresh():
+    """invalidate reloads on next lookup, refresh reloads immediately"""
+    loader = Loader()
+    index = NameIndex(loader, ttl=60)
+    index.get('a')
+    index.invalidate()
+    assert loader.calls == 1
+    index.get('a')
+    assert loader.calls == 2
+    index.refresh()
+    assert loader.calls == 3
+
+
+def test_set_and_discard_id():
+    """Entries are updated in place without reloading the index"""
+    loader = Loader()
+    index = NameIndex(loader, ttl=60)
+    index.get('a')
+    index.set('b', "id-b")
+    assert index.get('b') == "id-b"
+    index.discard_id("id-a")
+    assert index.get('a') is None
+    assert loader.calls == 1
+
+
+def test_single_flight_reload():
+    """Threads looking up an expired index wait for a single reload"""
+    loader = Loader(delay=0.2)
+    index = NameIndex(loader, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(index.get('a')))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["id-a"] * 10
+    assert loader.calls == 1
+
+
+def test_invalidated_during_reload():
+    """An index invalidated while it was reloaded stays expired"""
+    loader = Loader(delay=0.2)
+    index = NameIndex(loader, ttl=60)
+    thread = threading.Thread(target=index.get, args=('a',))
+    thread.start()
+    time.sleep(0.1)
+    index.invalidate()
+    thread.join()
+    index.get('a')
+    assert loader.calls == 2
+
+
+@pytest.mark.manager(edges=20)
+def test_edge_index(manager):
+    """Edge lookups are served from the index once it is loaded"""
+    edge = Edge(manager.client(), cache_ttl=60)
+    assert edge.get_edge_id("esg-3") == "edge-4"
+    assert edge.get_edge_id("esg-7") == "edge-8"
+    assert edge.get_edge_id("unknown") is None
+    assert manager.stats()['methods'] == {'GET': 1}
+
+
+@pytest.mark.manager(edges=3)
+def test_edge_index_write_through(manager):
+    """Created and deleted edges are indexed without reloading it"""
+    edge = Edge(manager.client(), cache_ttl=60)
+    edge.get_edge_id("esg-0")
+    edge.delete_edge("edge-1")
+    assert edge.get_edge_id("esg-0") is None
+    assert manager.stats()['methods'] == {'GET': 1, 'DELETE': 1}
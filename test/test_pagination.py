@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""Tests of the paginated listings, buffered, prefetched and streamed"""
+
+import pytest
+
+from nsxsdk.edge import Edge
+from nsxsdk.exceptions import UnexpectedResponse
+from nsxsdk.logicalswitches import LogicalSwitchesSDK
+from nsxsdk.utils import iter_pages
+
+PAGE_CAP = 100
+EDGES_PAGE_PATH = "/api/4.0/edges?startIndex=0&pageSize=%d" % PAGE_CAP
+
+# Pages are capped to PAGE_CAP items
+pytestmark = pytest.mark.manager(edges=250, virtualwires=250, scopes=2,
+                                 edge_page_size_max=PAGE_CAP,
+                                 virtualwire_page_size_max=PAGE_CAP)
+
+
+def _gets(manager):
+    """Number of GET requests received by the server"""
+    return manager.stats()['methods'].get('GET', 0)
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_iter_edges(manager, prefetch):
+    """All the edges are listed once, in order, one page at a time"""
+    edge = Edge(manager.client())
+    names = [item['name'] for item in
+             edge.iter_edges(page_size=PAGE_CAP, prefetch=prefetch)]
+    assert names == ["esg-%d" % index for index in range(250)]
+    assert _gets(manager) == 3
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_iter_edges_over_cap(manager, prefetch):
+    """Pages smaller than requested do not truncate the listing"""
+    edge = Edge(manager.client())
+    edges = list(edge.iter_edges(page_size=1000, prefetch=prefetch))
+    assert len(edges) == 250
+
+
+def test_iter_edges_stream(manager):
+    """A streamed listing ends on the last page given by its pagingInfo"""
+    edge = Edge(manager.client())
+    names = [item['name'] for item in
+             edge.iter_edges(page_size=PAGE_CAP, stream=True)]
+    assert names == ["esg-%d" % index for index in range(250)]
+    assert _gets(manager) == 3
+
+
+def test_stream_start_index_ignored(manager):
+    """A streamed listing whose pages all start at the first item ends
+    once totalCount items were read"""
+    http_client = manager.client()
+    items = list(iter_pages(
+        http_client, lambda start_index, page_size: EDGES_PAGE_PATH,
+        ['edgePage', 'data'], PAGE_CAP, stream=True))
+    assert len(items) == 300
+    assert _gets(manager) == 3
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_page_error(manager, stream):
+    """A failed page request raises UnexpectedResponse"""
+    pages = iter_pages(manager.client(),
+                       lambda start_index, page_size: "/api/4.0/nowhere",
+                       ['edgePage', 'data'], PAGE_CAP, stream=stream)
+    with pytest.raises(UnexpectedResponse) as error:
+        list(pages)
+    assert error.value.status_code == 404
+
+
+def test_stream_edges_over_cap(manager):
+    """A streamed listing asking for more items per page than the server
+    returns is not truncated to the first page"""
+    edge = Edge(manager.client())
+    names = [item['name'] for item in
+             edge.iter_edges(page_size=1000, stream=True)]
+    assert names == ["esg-%d" % index for index in range(250)]
+
+
+def test_iter_edges_records_types(manager):
+    """The type of the edges listed is remembered"""
+    edge = Edge(manager.client())
+    for _ in edge.iter_edges(stream=True):
+        pass
+    assert len(edge.edge_types) == 250
+    assert edge.edge_types['edge-1'] == "gatewayServices"
+
+
+def test_get_edge_id_stops_listing(manager):
+    """Looking an edge up stops listing once it is found"""
+    edge = Edge(manager.client())
+    assert edge.get_edge_id("esg-5", stream=True) == "edge-6"
+    assert _gets(manager) == 1
+    assert edge.get_edge_id("esg-1000") is None
+
+
+@pytest.mark.manager()
+def test_empty_listing(manager):
+    """An empty inventory is listed with a single request"""
+    edge = Edge(manager.client())
+    assert not list(edge.iter_edges())
+    assert not list(edge.iter_edges(stream=True))
+    assert _gets(manager) == 2
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_iter_logical_switches(manager, stream):
+    """All the logical switches are listed, even with pages over the cap"""
+    switches = LogicalSwitchesSDK(manager.client())
+    names = [item['name'] for item in
+             switches.iter_logical_switches(page_size=1000, stream=stream)]
+    assert sorted(names) == sorted("ls-%d" % index for index in range(250))
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_iter_switches_of_scope(manager, stream):
+    """The logical switches of a transport zone only are listed"""
+    switches = LogicalSwitchesSDK(manager.client())
+    items = list(switches.iter_logical_switches(
+        tz_id="vdnscope-1", page_size=PAGE_CAP, stream=stream))
+    assert items
+    assert len(items) < 250
+    assert set(item['vdnScopeId'] for item in items) == set(["vdnscope-1"])
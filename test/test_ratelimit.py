@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Tests of the client side pacing of the requests"""
+
+import time
+
+import pytest
+
+from nsxsdk.ratelimit import AIMDLimiter
+from nsxsdk.ratelimit import RateController
+from nsxsdk.ratelimit import TokenBucket
+from nsxsdk.ratelimit import method_class
+
+EDGES_PATH = "/api/4.0/edges"
+
+
+def test_token_bucket_burst():
+    """A burst is served at once, then tokens come at the rate"""
+    bucket = TokenBucket(rate=20, burst=5)
+    start = time.time()
+    for _ in range(5):
+        bucket.take()
+    assert time.time() - start < 0.05
+    for _ in range(4):
+        bucket.take()
+    assert time.time() - start >= 0.15
+
+
+def test_token_bucket_pause():
+    """No token is handed out during a pause"""
+    bucket = TokenBucket(rate=100, burst=10)
+    bucket.pause(0.1)
+    start = time.time()
+    bucket.take()
+    assert time.time() - start >= 0.1
+
+
+def test_aimd_increase_and_decrease():
+    """The limit grows while requests succeed and is cut on congestion"""
+    limiter = AIMDLimiter(4, minimum=1, maximum=5)
+    for _ in range(8):
+        limiter.release(limiter.acquire(), False)
+    assert 4 < limiter.limit <= 5
+    limit = limiter.limit
+    limiter.release(limiter.acquire(), True)
+    assert limiter.limit == limit / 2
+    assert limiter.in_flight == 0
+
+
+def test_aimd_decreased_once():
+    """Requests started before a decrease do not decrease it again"""
+    limiter = AIMDLimiter(8)
+    starts = [limiter.acquire() for _ in range(3)]
+    for start in starts:
+        limiter.release(start, True)
+    assert limiter.limit == 4
+
+
+def test_controller_throttled():
+    """429, 503 and transport errors are counted as throttled and back
+    off the concurrency limit"""
+    controller = RateController(concurrency=8)
+    for status_code in (200, 429, None, 503, 404):
+        controller.release(controller.acquire(), status_code)
+    stats = controller.stats()
+    assert stats['throttled'] == 3
+    assert stats['concurrency_limit'] < 8
+
+
+def test_method_class():
+    """GET, HEAD and OPTIONS are reads, the other methods writes"""
+    assert method_class("get") == 'read'
+    assert method_class("HEAD") == 'read'
+    assert method_class("POST") == 'write'
+    assert method_class("DELETE") == 'write'
+
+
+@pytest.mark.manager(edges=1)
+def test_client_paced_by_class(manager):
+    """Reads and writes are paced by their own controller"""
+    read = RateController(rate=1000)
+    write = RateController(rate=1000, concurrency=2)
+    http_client = manager.client(rate_limits={'read': read,
+                                              'write': write})
+    http_client.request("GET", EDGES_PATH)
+    http_client.request("PUT", EDGES_PATH + "/edge-1/highavailability/config",
+                        {'enabled': "true"})
+    assert write.limiter.limit > 2
+    assert read.stats() == {'throttled': 0}
+
+
+@pytest.mark.manager(max_rate=0)
+def test_client_backs_off(manager):
+    """Requests answered with 429 back off the concurrency limit"""
+    controller = RateController(concurrency=4)
+    http_client = manager.client(rate_limits=controller)
+    assert http_client.request("GET", EDGES_PATH).status_code == 429
+    assert controller.stats()['throttled'] == 1
+    assert controller.limiter.limit == 2
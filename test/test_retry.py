@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""Tests of the retry policy of the HTTP client"""
+
+import socket
+
+import pytest
+import requests
+
+from urllib3.exceptions import MaxRetryError
+from urllib3.exceptions import NewConnectionError
+
+from nsxsdk.exceptions import ConnectionFailed
+from nsxsdk.utils import HTTPClient
+from nsxsdk.utils import RetryPolicy
+
+EDGES_PATH = "/api/4.0/edges"
+
+
+def _refused():
+    """Connection error raised when the connection is refused"""
+    reason = NewConnectionError(None, "Connection refused")
+    return requests.exceptions.ConnectionError(
+        MaxRetryError(None, "/", reason))
+
+
+def _unused_port():
+    """Return a local port no server listens on"""
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_idempotent_methods():
+    """Only the idempotent methods are retried, unless overridden"""
+    policy = RetryPolicy()
+    assert policy.is_idempotent("get")
+    assert policy.is_idempotent("PUT")
+    assert not policy.is_idempotent("POST")
+    assert policy.is_idempotent("POST", idempotent=True)
+    assert not policy.is_idempotent("GET", idempotent=False)
+
+
+@pytest.mark.parametrize('exception', [
+    requests.exceptions.ConnectTimeout(),
+    _refused(),
+])
+def test_unsent_request_retried(exception):
+    """A request which could not be sent is retried whatever its method"""
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.retry_error("POST", exception, 1)
+    assert not policy.retry_error("POST", exception, 3)
+
+
+@pytest.mark.parametrize('exception', [
+    requests.exceptions.ReadTimeout(),
+    requests.exceptions.ConnectionError("Connection reset by peer"),
+])
+def test_sent_request_retried(exception):
+    """A request which may have been processed is only retried if it is
+    idempotent"""
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.retry_error("GET", exception, 1)
+    assert not policy.retry_error("POST", exception, 1)
+    assert policy.retry_error("POST", exception, 1, idempotent=True)
+
+
+def test_retry_statuses():
+    """Only the retryable status codes are retried"""
+    policy = RetryPolicy(max_attempts=3)
+    response = requests.Response()
+    response.status_code = 503
+    assert policy.retry_response("GET", response, 1)
+    assert not policy.retry_response("GET", response, 3)
+    assert not policy.retry_response("POST", response, 1)
+    response.status_code = 404
+    assert not policy.retry_response("GET", response, 1)
+
+
+def test_delay_honors_retry_after():
+    """The delay is at least Retry-After, up to backoff_max"""
+    policy = RetryPolicy(backoff=0.5, backoff_max=30)
+    for attempt in range(1, 10):
+        assert 0 <= policy.delay(attempt) <= 30
+    assert policy.delay(1, "10") >= 10
+    assert policy.delay(1, "60") == 30
+    assert policy.delay(1, "soon") <= 0.5
+
+
+@pytest.mark.parametrize('method, idempotent, requests_sent', [
+    ("GET", None, 3),
+    ("POST", None, 1),
+    ("POST", True, 3),
+])
+@pytest.mark.manager(max_rate=0)
+def test_throttled_request_retried(manager, method, idempotent,
+                                   requests_sent):
+    """Requests answered with 429 are retried up to max_attempts"""
+    http_client = manager.client(
+        retry_policy=RetryPolicy(max_attempts=3, backoff=0, backoff_max=0))
+    response = http_client.request(method, EDGES_PATH, {},
+                                   idempotent=idempotent)
+    assert response.status_code == 429
+    assert manager.stats()['requests'] == requests_sent
+
+
+@pytest.mark.manager(max_rate=0)
+def test_not_retried_by_default(manager):
+    """Requests are sent once without a retry policy"""
+    response = manager.client().request("GET", EDGES_PATH)
+    assert response.status_code == 429
+    assert manager.stats()['requests'] == 1
+
+
+def test_connection_refused():
+    """A refused POST is retried, then raised as ConnectionFailed"""
+    http_client = HTTPClient('localhost', 'admin', 'default',
+                             retry_policy=RetryPolicy(max_attempts=3,
+                                                      backoff=0))
+    http_client.base_url = "http://127.0.0.1:%d" % _unused_port()
+    with pytest.raises(ConnectionFailed) as excinfo:
+        http_client.request("POST", EDGES_PATH, {})
+    assert excinfo.value.attempts == 3
+    assert excinfo.value.method == "POST"